@@ -0,0 +1,227 @@
+"""Admission control for Snowflake work on a shared server.
+
+Every Snowflake connection is taken through :func:`admit`, which enforces a
+global concurrency cap and a per-client cap (clients are MCP sessions).
+Callers that cannot start immediately wait in a priority queue where
+metadata lookups go before small queries and small queries before heavy
+scans. When the queue is full, or a client already has too much work
+waiting, the call is rejected at once with :class:`Overloaded` instead of
+piling up behind the warehouse.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.config import (
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_MAX_PER_CLIENT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+ROUTE_PRIORITIES: Dict[str, int] = {"metadata": 0, "small": 1, "heavy": 2}
+
+# Recent queue waits kept for the latency percentiles
+WAIT_SAMPLES = 1000
+
+LOCAL_CLIENT = "local"
+
+
+class Overloaded(RuntimeError):
+    """Raised when a request is rejected or times out waiting for admission."""
+
+
+def current_client() -> str:
+    """Identify the MCP session making the current tool call."""
+    try:
+        from fastmcp.server.dependencies import get_context
+
+        return get_context().session_id
+    except Exception:
+        # Outside a tool call (CLI helpers, tests) all work is one client
+        return LOCAL_CLIENT
+
+
+class AdmissionSlot:
+    """A granted place to run; release it when the work is done."""
+
+    def __init__(self, controller: "AdmissionController", client: str):
+        self._controller = controller
+        self.client = client
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self.client)
+
+
+class _Waiter:
+    def __init__(self, client: str):
+        self.client = client
+        self.granted = False
+        self.event = threading.Event()
+
+
+class AdmissionController:
+    """Global and per-client concurrency limits with a priority queue."""
+
+    def __init__(
+        self,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        max_per_client: int = ADMISSION_MAX_PER_CLIENT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_client = max_per_client
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._running: Dict[str, int] = {}
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def acquire(
+        self, route: str, client: Optional[str] = None, timeout: Optional[float] = None
+    ) -> AdmissionSlot:
+        """
+        Wait for permission to run work on a warehouse route.
+
+        Args:
+            route: Warehouse route, which sets the queue priority
+            client: Client identifier (default: the current MCP session)
+            timeout: Maximum seconds to wait (default: queue_timeout)
+
+        Returns:
+            The granted slot
+
+        Raises:
+            Overloaded: If the queue is full or the wait times out
+        """
+        client = client or current_client()
+        priority = ROUTE_PRIORITIES.get(route, ROUTE_PRIORITIES["small"])
+        timeout = self.queue_timeout if timeout is None else timeout
+        started = time.perf_counter()
+
+        with self._lock:
+            if not self._queue and self._can_run(client):
+                self._grant(client)
+                self._waits.append(0.0)
+                return AdmissionSlot(self, client)
+
+            client_waiting = sum(1 for _, _, w in self._queue if w.client == client)
+            if len(self._queue) >= self.max_queue or client_waiting >= self.max_per_client:
+                self._rejected += 1
+                raise Overloaded(
+                    f"Server busy: {self.running} queries running and "
+                    f"{len(self._queue)} queued; retry shortly"
+                )
+            waiter = _Waiter(client)
+            heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+            self._dispatch()
+
+        waiter.event.wait(timeout)
+        with self._lock:
+            if not waiter.granted:
+                self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+                heapq.heapify(self._queue)
+                self._timed_out += 1
+                raise Overloaded(f"Timed out after {timeout}s waiting for a query slot")
+            self._waits.append(time.perf_counter() - started)
+        return AdmissionSlot(self, client)
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Concurrency, queue and queue-time metrics."""
+        with self._lock:
+            waits = sorted(self._waits)
+            queued_by_priority = {route: 0 for route in ROUTE_PRIORITIES}
+            names = {p: route for route, p in ROUTE_PRIORITIES.items()}
+            for priority, _, _ in self._queue:
+                queued_by_priority[names.get(priority, "small")] += 1
+            return {
+                "running": self.running,
+                "queued": len(self._queue),
+                "queued_by_route": queued_by_priority,
+                "clients": len(self._running),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_ms_mean": round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+                "wait_ms_p95": round(1000 * waits[int(0.95 * (len(waits) - 1))], 1)
+                if waits
+                else 0.0,
+                "wait_ms_max": round(1000 * waits[-1], 1) if waits else 0.0,
+                "max_concurrent": self.max_concurrent,
+                "max_per_client": self.max_per_client,
+                "max_queue": self.max_queue,
+            }
+
+    def _can_run(self, client: str) -> bool:
+        return (
+            self.running < self.max_concurrent
+            and self._running.get(client, 0) < self.max_per_client
+        )
+
+    def _grant(self, client: str) -> None:
+        self._running[client] = self._running.get(client, 0) + 1
+        self._admitted += 1
+
+    def _release(self, client: str) -> None:
+        with self._lock:
+            remaining = self._running.get(client, 0) - 1
+            if remaining > 0:
+                self._running[client] = remaining
+            else:
+                self._running.pop(client, None)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        # Highest priority first; a waiter whose client is at its cap is
+        # skipped so it does not hold up other clients behind it
+        skipped = []
+        while self._queue and self.running < self.max_concurrent:
+            entry = heapq.heappop(self._queue)
+            waiter = entry[2]
+            if self._can_run(waiter.client):
+                waiter.granted = True
+                self._grant(waiter.client)
+                waiter.event.set()
+            else:
+                skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
+
+
+def admit(route: str) -> AdmissionSlot:
+    """Wait for permission to run work on ``route`` for the current client."""
+    return get_admission_controller().acquire(route)
@@ -0,0 +1,233 @@
+"""Materialization advisor for repeated aggregate queries.
+
+Reads the per-fingerprint workload statistics and proposes a dynamic table
+(or materialized view) for each hot aggregate shape over a single view, e.g.
+the recurring "sales by category and date" rollups of DAILY_SALES_SUMMARY.
+When creation is enabled the object is built in Snowflake and registered
+locally; from then on :func:`rewrite_query` sends matching queries to it,
+keeping their ORDER BY / LIMIT tail.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from src import config
+from src.config import (
+    MATERIALIZATION_AUTO_CREATE,
+    MATERIALIZATION_KIND,
+    MATERIALIZATION_REWRITE_ENABLED,
+    MATERIALIZATION_SCHEMA,
+    MATERIALIZATION_TARGET_LAG,
+)
+from src.sql_utils import is_single_source_aggregate, normalize_sql, split_tail
+from src.workload import WorkloadStore, get_workload_store
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("dynamic_table", "materialized_view")
+
+# Workload rows scanned when looking for candidates
+CANDIDATE_SCAN_LIMIT = 100
+
+# normalized query core -> fully qualified materialized object name
+_registry: Optional[Dict[str, str]] = None
+_registry_lock = threading.Lock()
+
+
+def object_name(fingerprint: str) -> str:
+    """Fully qualified name of the object materializing a fingerprint."""
+    name = f"MCP_AGG_{fingerprint.upper()}"
+    parts = [p for p in (config.get_settings().database, MATERIALIZATION_SCHEMA) if p]
+    return ".".join(parts + [name])
+
+
+def build_ddl(name: str, core_sql: str, kind: str = MATERIALIZATION_KIND) -> str:
+    """CREATE statement materializing ``core_sql`` as ``name``."""
+    if kind == "dynamic_table":
+        return (
+            f"CREATE DYNAMIC TABLE IF NOT EXISTS {name} "
+            f"TARGET_LAG = '{MATERIALIZATION_TARGET_LAG}' "
+            f"WAREHOUSE = {config.get_settings().warehouse} AS {core_sql}"
+        )
+    if kind == "materialized_view":
+        return f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {core_sql}"
+    raise ValueError(f"Unknown materialization kind '{kind}', expected one of {KINDS}")
+
+
+def _candidate(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe one workload fingerprint as a materialization candidate."""
+    core, tail = split_tail(stats["sample_sql"])
+    normalized = normalize_sql(core)
+    candidate = {
+        "fingerprint": stats["fingerprint"],
+        "calls": stats["calls"],
+        "mean_ms": round(stats["mean_ms"], 1),
+        "total_ms": round(stats["total_ms"], 1),
+        "query": core,
+        "tail": tail,
+        "eligible": False,
+    }
+    if not is_single_source_aggregate(core):
+        candidate["reason"] = "Not an aggregate over a single table or view"
+    elif "?" in normalized:
+        # A shape whose literals vary between calls cannot be served by one
+        # precomputed object built from a single sample of those literals
+        candidate["reason"] = "Query filters on literal values; aggregate without them"
+    else:
+        candidate["eligible"] = True
+        candidate["normalized_sql"] = normalized
+        candidate["object_name"] = object_name(stats["fingerprint"])
+        candidate["ddl"] = build_ddl(candidate["object_name"], core)
+        # Upper bound: the time spent so far would have been (mostly) avoided
+        candidate["estimated_savings_ms"] = candidate["total_ms"]
+    return candidate
+
+
+def find_candidates(
+    min_calls: int = 3, limit: int = 5, store: Optional[WorkloadStore] = None
+) -> List[Dict[str, Any]]:
+    """
+    Rank hot aggregate query shapes by total time spent on them.
+
+    Args:
+        min_calls: Minimum calls (cache hits included) before a shape is considered
+        limit: Maximum number of candidates returned
+        store: Workload store to read (default: the process-wide store)
+
+    Returns:
+        Candidate descriptions, eligible ones first
+    """
+    store = store or get_workload_store()
+    registered = store.materializations()
+    candidates = []
+    for stats in store.top(CANDIDATE_SCAN_LIMIT, order_by="total_ms"):
+        if stats["calls"] < min_calls or stats["errors"] == stats["calls"]:
+            continue
+        candidate = _candidate(stats)
+        if candidate.get("normalized_sql") in registered:
+            continue
+        candidates.append(candidate)
+    candidates.sort(key=lambda c: not c["eligible"])
+    return candidates[:limit]
+
+
+def _load_registry(store: WorkloadStore) -> Dict[str, str]:
+    return {key: row["object_name"] for key, row in store.materializations().items()}
+
+
+def _get_registry() -> Dict[str, str]:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            # Do not create the workload database just to find it empty
+            if config.WORKLOAD_DB_PATH.exists():
+                _registry = _load_registry(get_workload_store())
+            else:
+                _registry = {}
+        return _registry
+
+
+def create_materialization(
+    candidate: Dict[str, Any], store: Optional[WorkloadStore] = None
+) -> None:
+    """Run a candidate's DDL in Snowflake and register it for rewriting."""
+    global _registry
+    from src.tools.snowflake_tools import get_snowflake_connection
+
+    conn = get_snowflake_connection("metadata", "metadata")
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(candidate["ddl"])
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+
+    store = store or get_workload_store()
+    store.register_materialization(
+        candidate["normalized_sql"],
+        candidate["object_name"],
+        MATERIALIZATION_KIND,
+        candidate["ddl"],
+    )
+    with _registry_lock:
+        _registry = _load_registry(store)
+    logger.info(f"Created {MATERIALIZATION_KIND} {candidate['object_name']}")
+
+
+def rewrite_query(sql: str) -> Optional[str]:
+    """
+    Rewrite a query to read from a registered materialization.
+
+    Only the query core (everything before a trailing ORDER BY / LIMIT) has
+    to match; a simple tail is re-applied on top of the materialized object.
+
+    Args:
+        sql: Query text
+
+    Returns:
+        The rewritten query, or None when no materialization matches
+    """
+    if not MATERIALIZATION_REWRITE_ENABLED:
+        return None
+    registry = _get_registry()
+    if not registry:
+        return None
+    core, tail = split_tail(sql)
+    name = registry.get(normalize_sql(core))
+    if name is None:
+        return None
+    # Expressions or qualified names in the tail refer to the original FROM
+    if re.search(r"[().]", tail):
+        return None
+    return f"SELECT * FROM {name} {tail}".strip()
+
+
+def advise(min_calls: int = 3, limit: int = 5, create: bool = False) -> Dict[str, Any]:
+    """
+    Suggest (and optionally create) materializations for hot aggregate queries.
+
+    Args:
+        min_calls: Minimum calls (cache hits included) before a shape is considered
+        limit: Maximum number of candidates returned
+        create: Create eligible objects (requires MATERIALIZATION_AUTO_CREATE)
+
+    Returns:
+        Dictionary with success status, candidates and created objects
+    """
+    try:
+        candidates = find_candidates(max(1, min_calls), min(max(1, limit), 50))
+    except Exception as e:
+        logger.error(f"Error reading workload for materialization advice: {e}")
+        return {"success": False, "error": f"Failed to read workload: {str(e)}"}
+
+    created: List[str] = []
+    notes: List[str] = []
+    if create:
+        if not MATERIALIZATION_AUTO_CREATE:
+            notes.append("Creation disabled; set MATERIALIZATION_AUTO_CREATE=true")
+        elif config.MOCK_MODE:
+            notes.append("Creation skipped in mock mode")
+        else:
+            for candidate in candidates:
+                if not candidate["eligible"]:
+                    continue
+                try:
+                    create_materialization(candidate)
+                    created.append(candidate["object_name"])
+                except Exception as e:
+                    logger.error(f"Failed to create {candidate['object_name']}: {e}")
+                    candidate["error"] = str(e)
+
+    return {
+        "success": True,
+        "data": {
+            "candidates": candidates,
+            "created": created,
+            "kind": MATERIALIZATION_KIND,
+            "notes": notes,
+        },
+    }
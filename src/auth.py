@@ -0,0 +1,217 @@
+"""Per-connection credentials for passwordless Snowflake authentication.
+
+- ``snowflake_jwt``: the private key is read and decrypted once per process
+  (decrypting an encrypted PKCS#8 key is deliberately slow) and handed to the
+  connector as DER bytes, which signs a fresh JWT for each login.
+- ``oauth``: access tokens are cached in memory and in a private file under
+  the cache directory (one per account, client id, user and refresh token),
+  so every server process reuses one token until it is about to expire, then
+  a single process refreshes it with the refresh token, keeping any rotated
+  refresh token the identity provider returns.
+- ``externalbrowser``: the connector's ID-token cache is enabled, so the SSO
+  browser round trip happens once instead of on every new connection.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src import config
+from src.config import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: refreshes are still atomic, just not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Refresh OAuth tokens this long before they expire
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+_key_cache: Dict[Tuple[str, float], bytes] = {}
+_key_lock = threading.Lock()
+
+
+def load_private_key(path: str, passphrase: Optional[str] = None) -> bytes:
+    """Return the private key at ``path`` as unencrypted DER, cached per version."""
+    from cryptography.hazmat.primitives import serialization
+
+    cache_key = (path, os.path.getmtime(path))
+    with _key_lock:
+        if cache_key not in _key_cache:
+            with open(path, "rb") as f:
+                key = serialization.load_pem_private_key(
+                    f.read(), password=passphrase.encode() if passphrase else None
+                )
+            _key_cache.clear()
+            _key_cache[cache_key] = key.private_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+        return _key_cache[cache_key]
+
+
+def _fingerprint(secret: str) -> str:
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+def _issued_for(settings: config.Settings) -> str:
+    """Fingerprint of the user and configured refresh token a token belongs to."""
+    return _fingerprint(f"{settings.user or ''}|{settings.oauth_refresh_token or ''}")
+
+
+def token_cache_path(settings: config.Settings) -> Path:
+    """OAuth token cache file for the configured account, client and identity."""
+    identity = (
+        f"{settings.account or ''}|{settings.oauth_client_id or ''}|"
+        f"{_issued_for(settings)}"
+    )
+    return CACHE_DIR / "auth" / f"oauth_token_{_fingerprint(identity)}.json"
+
+
+class OAuthTokenCache:
+    """OAuth access token shared by all server processes through a cache file.
+
+    Identity providers that rotate refresh tokens return a new one with each
+    access token; it is kept in the cache file and used for the next refresh.
+    The configured refresh token is used again once it is changed. Tokens
+    are only reused for the user and configured refresh token they were
+    issued for.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        # None: one file per account, client id and identity, see token_cache_path()
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._token: Optional[Dict[str, Any]] = None
+        self._token_path: Optional[Path] = None
+
+    def get_token(self) -> str:
+        """Return a valid access token, refreshing it when close to expiry."""
+        with self._lock:
+            settings = config.get_settings()
+            path = self.path or token_cache_path(settings)
+            issued_for = _issued_for(settings)
+            if self._token_path == path and self._is_valid(self._token, issued_for):
+                return self._token["access_token"]
+
+            if not settings.oauth_refresh_token:
+                if not settings.oauth_token:
+                    raise RuntimeError(
+                        "OAuth needs SNOWFLAKE_OAUTH_TOKEN or "
+                        "SNOWFLAKE_OAUTH_REFRESH_TOKEN"
+                    )
+                return settings.oauth_token
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path.with_suffix(".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                # Another process may have refreshed while we waited
+                token = self._read(path)
+                if not self._is_valid(token, issued_for):
+                    token = self._refresh(settings, token)
+                    self._write(path, token)
+            self._token, self._token_path = token, path
+            return token["access_token"]
+
+    @staticmethod
+    def _is_valid(token: Optional[Dict[str, Any]], issued_for: str) -> bool:
+        return (
+            token is not None
+            and token.get("issued_for") == issued_for
+            and token.get("expires_at", 0) - TOKEN_EXPIRY_MARGIN_SECONDS > time.time()
+        )
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(path: Path, token: Dict[str, Any]) -> None:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(token, f)
+        os.replace(tmp_path, path)
+
+    def _refresh(
+        self, settings: config.Settings, cached: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        if not settings.oauth_token_url:
+            raise RuntimeError(
+                "Refreshing OAuth tokens needs SNOWFLAKE_OAUTH_TOKEN_URL"
+            )
+        # A rotated refresh token replaces the configured one it was issued for
+        configured = _issued_for(settings)
+        refresh_token = settings.oauth_refresh_token
+        if cached and cached.get("issued_for") == configured:
+            refresh_token = cached.get("refresh_token") or refresh_token
+        form = {
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        }
+        if settings.oauth_client_id:
+            form["client_id"] = settings.oauth_client_id
+        if settings.oauth_client_secret:
+            form["client_secret"] = settings.oauth_client_secret
+        request = urllib.request.Request(
+            settings.oauth_token_url,
+            data=urllib.parse.urlencode(form).encode(),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        timeout = settings.login_timeout
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.load(response)
+        logger.info("Refreshed Snowflake OAuth access token")
+        return {
+            "access_token": payload["access_token"],
+            "expires_at": time.time() + int(payload.get("expires_in", 600)),
+            "refresh_token": payload.get("refresh_token") or refresh_token,
+            "issued_for": configured,
+        }
+
+
+_oauth_cache: Optional[OAuthTokenCache] = None
+_oauth_lock = threading.Lock()
+
+
+def get_oauth_cache() -> OAuthTokenCache:
+    """Return the process-wide OAuth token cache."""
+    global _oauth_cache
+    with _oauth_lock:
+        if _oauth_cache is None:
+            _oauth_cache = OAuthTokenCache()
+        return _oauth_cache
+
+
+def connection_auth_params() -> Dict[str, Any]:
+    """Connector arguments carrying the credentials for the configured authenticator."""
+    settings = config.get_settings()
+    authenticator = settings.authenticator.lower()
+    if authenticator == "snowflake_jwt":
+        return {
+            "authenticator": "SNOWFLAKE_JWT",
+            "private_key": load_private_key(
+                settings.private_key_path, settings.private_key_passphrase
+            ),
+        }
+    if authenticator == "oauth":
+        return {"authenticator": "oauth", "token": get_oauth_cache().get_token()}
+    if authenticator == "externalbrowser":
+        # Needs ALLOW_ID_TOKEN on the account; harmless when it is off
+        return {"client_store_temporary_credential": True}
+    return {}
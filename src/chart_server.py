@@ -0,0 +1,333 @@
+"""Embedded HTTP server for generated charts.
+
+Serves files from ``CHARTS_DIR`` and chart metadata from the chart index on a
+background asyncio loop, so chart URLs work without a separate web app.
+Supports HTTP/1.1 keep-alive, ETag/304 revalidation and gzip encoding.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from src import visualize
+from src.config import CHART_SERVER_HOST, CHART_SERVER_PORT
+
+logger = logging.getLogger(__name__)
+
+# Connections idle for longer than this are closed
+KEEP_ALIVE_TIMEOUT = 15.0
+MAX_HEADER_BYTES = 16 * 1024
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 512
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript")
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+class ChartServer:
+    """Minimal asyncio HTTP/1.1 server running on a daemon thread."""
+
+    def __init__(self, host: str = CHART_SERVER_HOST, port: int = CHART_SERVER_PORT):
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._connections: "set[asyncio.Task]" = set()
+        # Compressed bodies keyed by ETag, so repeat hits skip gzip
+        self._gzip_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._gzip_cache_size = 64
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """Start the server thread and wait until the socket is bound."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="chart-server", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        if self._error is not None:
+            self._thread = None
+            raise RuntimeError(f"Chart server failed to start: {self._error}")
+
+    def stop(self) -> None:
+        """Stop the server and its event loop."""
+        if self._loop is None or self._thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        future.result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            logger.info(f"Chart server listening on {self.base_url}")
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT
+                    )
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 400, b"Bad Request", "text/plain", {})
+                    break
+
+                if len(head) > MAX_HEADER_BYTES:
+                    await self._send(writer, 400, b"Bad Request", "text/plain", {})
+                    break
+
+                parsed = self._parse_request(head)
+                if parsed is None:
+                    await self._send(writer, 400, b"Bad Request", "text/plain", {})
+                    break
+
+                method, target, version, headers = parsed
+                keep_alive = self._wants_keep_alive(version, headers)
+                status, body, content_type, extra = self._route(method, target)
+                await self._send(
+                    writer,
+                    status,
+                    body,
+                    content_type,
+                    extra,
+                    headers=headers,
+                    head_only=method == "HEAD",
+                    keep_alive=keep_alive,
+                )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    @staticmethod
+    def _parse_request(
+        head: bytes,
+    ) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            return None
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version.upper(), headers
+
+    @staticmethod
+    def _wants_keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+    def _route(
+        self, method: str, target: str
+    ) -> Tuple[int, bytes, str, Dict[str, str]]:
+        """Map a request to (status, body, content type, extra headers)."""
+        if method not in ("GET", "HEAD"):
+            return 405, b"Method Not Allowed", "text/plain", {"Allow": "GET, HEAD"}
+
+        parts = [unquote(p) for p in urlsplit(target).path.split("/") if p]
+
+        if parts == ["health"]:
+            return self._json({"status": "healthy", "service": "chart-server"})
+
+        if len(parts) == 3 and parts[0] == "charts" and parts[2] == "data":
+            chart = visualize.get_chart(parts[1])
+            if chart is None:
+                return self._json({"success": False, "error": "Chart not found"}, 404)
+            return self._json({"success": True, "chart": chart})
+
+        if len(parts) == 2 and parts[0] == "charts":
+            path = self._resolve_file(parts[1])
+            if path is None:
+                chart = visualize.get_chart(parts[1])
+                path = Path(chart["file_path"]) if chart else None
+            if path is None or not path.is_file():
+                return 404, b"Not Found", "text/plain", {}
+            return self._file(path)
+
+        return 404, b"Not Found", "text/plain", {}
+
+    @staticmethod
+    def _resolve_file(name: str) -> Optional[Path]:
+        # Only plain file names directly inside CHARTS_DIR are served
+        if "/" in name or "\\" in name or name.startswith("."):
+            return None
+        path = visualize.CHARTS_DIR / name
+        return path if path.is_file() else None
+
+    @staticmethod
+    def _file(path: Path) -> Tuple[int, bytes, str, Dict[str, str]]:
+        stat = path.stat()
+        content_type, encoding = mimetypes.guess_type(path.name)
+        # Pre-compressed sidecars are served as opaque bytes for the page to decode
+        if encoding is not None or content_type is None:
+            content_type = "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        return (
+            200,
+            path.read_bytes(),
+            content_type,
+            {
+                "ETag": f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+                "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+                "Cache-Control": "no-cache",
+            },
+        )
+
+    @staticmethod
+    def _json(
+        payload: dict, status: int = 200
+    ) -> Tuple[int, bytes, str, Dict[str, str]]:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        return status, body, "application/json", headers
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: bytes,
+        content_type: str,
+        extra: Dict[str, str],
+        headers: Optional[Dict[str, str]] = None,
+        head_only: bool = False,
+        keep_alive: bool = False,
+    ) -> None:
+        headers = headers or {}
+        response_headers = {"Content-Type": content_type, **extra}
+        etag = extra.get("ETag")
+        compressible = (
+            status == 200
+            and len(body) >= GZIP_MIN_BYTES
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+        use_gzip = compressible and "gzip" in headers.get("accept-encoding", "")
+        if compressible:
+            # The encoding depends on the request, so caches must key on it
+            response_headers["Vary"] = "Accept-Encoding"
+        if use_gzip and etag:
+            # The gzip body is a different representation with its own validator
+            response_headers["ETag"] = etag[:-1] + '-gz"'
+
+        if (
+            status == 200
+            and etag
+            and response_headers["ETag"]
+            in _split_etags(headers.get("if-none-match", ""))
+        ):
+            status, body = 304, b""
+            response_headers.pop("Content-Type")
+        elif use_gzip:
+            body = self._gzip(body, etag)
+            response_headers["Content-Encoding"] = "gzip"
+
+        response_headers["Content-Length"] = str(len(body))
+        response_headers["Date"] = formatdate(usegmt=True)
+        response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+        if keep_alive:
+            response_headers["Keep-Alive"] = f"timeout={int(KEEP_ALIVE_TIMEOUT)}"
+
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}"]
+        lines += [f"{name}: {value}" for name, value in response_headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+    def _gzip(self, body: bytes, etag: Optional[str]) -> bytes:
+        if etag is None:
+            return gzip.compress(body, compresslevel=6)
+        cached = self._gzip_cache.get(etag)
+        if cached is None:
+            cached = gzip.compress(body, compresslevel=6)
+            self._gzip_cache[etag] = cached
+            if len(self._gzip_cache) > self._gzip_cache_size:
+                self._gzip_cache.popitem(last=False)
+        else:
+            self._gzip_cache.move_to_end(etag)
+        return cached
+
+
+def _split_etags(value: str) -> list:
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+
+_server: Optional[ChartServer] = None
+_server_lock = threading.Lock()
+
+
+def ensure_chart_server() -> ChartServer:
+    """Return the process-wide chart server, starting it on first use."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            server = ChartServer()
+            server.start()
+            _server = server
+        return _server
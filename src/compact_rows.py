@@ -0,0 +1,157 @@
+"""Compact column-oriented storage for query results held server-side.
+
+A ``DictCursor`` result is a list of dicts, one per row, each repeating the
+column names and a hash table: several hundred bytes of overhead per row
+before any value is stored. ``CompactRows`` keeps one array per column
+instead, with a column index shared by all rows:
+
+- integer and float columns without NULLs are packed into ``array`` buffers
+  (8 bytes per value, no per-value objects)
+- other columns are plain lists, with repeated strings stored once
+
+Indexing returns ``RowView`` objects, ``__slots__``-based read-only mappings
+that look values up in the column arrays on access, so code written for row
+dicts (``row[name]``, ``row.get(name)``, ``dict(row)``) works unchanged.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+
+def _pack(values: List[Any]) -> Union[array, List[Any]]:
+    """Store a column as a typed array when every value fits, else a list."""
+    kinds = {type(value) for value in values}
+    if kinds == {int} and INT64_MIN <= min(values) and max(values) <= INT64_MAX:
+        return array("q", values)
+    if kinds == {float}:
+        return array("d", values)
+    if str in kinds:
+        strings: Dict[str, str] = {}
+        return [
+            strings.setdefault(value, value) if type(value) is str else value
+            for value in values
+        ]
+    return values
+
+
+class RowView(Mapping):
+    """Read-only mapping view of one row of a :class:`CompactRows`."""
+
+    __slots__ = ("_rows", "_position")
+
+    def __init__(self, rows: "CompactRows", position: int):
+        self._rows = rows
+        self._position = position
+
+    def __getitem__(self, column: str) -> Any:
+        return self._rows._data[self._rows._index[column]][self._position]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows.columns)
+
+    def __len__(self) -> int:
+        return len(self._rows.columns)
+
+    def __repr__(self) -> str:
+        return f"RowView({dict(self)!r})"
+
+
+class CompactRows(Sequence):
+    """Immutable result rows stored column by column."""
+
+    __slots__ = ("columns", "_index", "_data", "_length")
+
+    def __init__(self, columns: List[str], data: List[Union[array, List[Any]]]):
+        self.columns = list(columns)
+        self._index = {column: i for i, column in enumerate(self.columns)}
+        self._data = data
+        self._length = len(data[0]) if data else 0
+
+    @classmethod
+    def from_rows(
+        cls, rows: Sequence[Dict[str, Any]], columns: Optional[List[str]] = None
+    ) -> "CompactRows":
+        """
+        Pack row dicts into columns.
+
+        Args:
+            rows: Rows as returned by ``DictCursor``
+            columns: Column order; keys missing from it are appended in the
+                order first seen
+
+        Returns:
+            The packed rows (``rows`` itself when already packed)
+        """
+        if isinstance(rows, CompactRows):
+            return rows
+        names = list(columns or [])
+        known = set(names)
+        for row in rows:
+            for name in row:
+                if name not in known:
+                    known.add(name)
+                    names.append(name)
+        return cls(names, [_pack([row.get(name) for row in rows]) for name in names])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RowView(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        return (RowView(self, i) for i in range(self._length))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (list, tuple, CompactRows)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"CompactRows({self._length} rows x {len(self.columns)} columns)"
+
+    def column(self, name: str) -> List[Any]:
+        """Return a copy of one column's values."""
+        return list(self._data[self._index[name]])
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize the rows as plain dicts."""
+        return [dict(zip(self.columns, values)) for values in zip(*self._data)]
+
+    def nbytes(self) -> int:
+        """
+        Measure the memory held by the container.
+
+        Counts the containers, the column buffers and every distinct value
+        object once, so shared strings and cached small ints are not counted
+        per row.
+        """
+        size = (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.columns)
+            + sys.getsizeof(self._index)
+            + sys.getsizeof(self._data)
+            + sum(sys.getsizeof(name) for name in self.columns)
+        )
+        seen = set()
+        for values in self._data:
+            size += sys.getsizeof(values)
+            if isinstance(values, array):
+                continue
+            for value in values:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        return size
@@ -1,102 +1,475 @@
-"""Configuration management for Snowflake MCP Server."""
+"""Configuration management for Snowflake MCP Server.
 
+Connection, credential and mode settings are parsed and validated once into
+an immutable :class:`Settings` object. ``get_settings()`` is a plain read of
+the current object; ``reload_settings()`` builds a new one and swaps it in,
+which ``watch_settings()`` triggers on SIGHUP or when the .env file changes.
+The old module-level names (``SNOWFLAKE_ACCOUNT``, ``MOCK_MODE``, ...) still
+work and read the current settings. The tuning constants further down are
+read once at import.
+"""
+
+import json
+import logging
 import os
-from typing import Optional
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+
+logger = logging.getLogger(__name__)
 
-from dotenv import load_dotenv
+ENV_FILE: Path = Path(find_dotenv() or Path(__file__).parent.parent / ".env")
 
 # Load environment variables from .env file
-load_dotenv()
-
-# Required Snowflake connection parameters
-SNOWFLAKE_ACCOUNT: Optional[str] = os.getenv("SNOWFLAKE_ACCOUNT")
-SNOWFLAKE_USER: Optional[str] = os.getenv("SNOWFLAKE_USER")
-SNOWFLAKE_PASSWORD: Optional[str] = os.getenv("SNOWFLAKE_PASSWORD")
-SNOWFLAKE_WAREHOUSE: Optional[str] = os.getenv("SNOWFLAKE_WAREHOUSE")
-SNOWFLAKE_DATABASE: Optional[str] = os.getenv("SNOWFLAKE_DATABASE")
-SNOWFLAKE_SCHEMA: Optional[str] = os.getenv("SNOWFLAKE_SCHEMA", "GOLD")
-SNOWFLAKE_ROLE: Optional[str] = os.getenv("SNOWFLAKE_ROLE")
-
-# Optional connection settings
-SNOWFLAKE_TIMEOUT: int = int(os.getenv("SNOWFLAKE_TIMEOUT", "30"))
-SNOWFLAKE_CLIENT_SESSION_KEEP_ALIVE: bool = (
-    os.getenv("SNOWFLAKE_CLIENT_SESSION_KEEP_ALIVE", "true").lower() == "true"
-)
-SNOWFLAKE_AUTHENTICATOR: str = os.getenv("SNOWFLAKE_AUTHENTICATOR", "snowflake")
+_process_keys = set(os.environ)
+load_dotenv(ENV_FILE)
+# Names that came from .env rather than the launching client; on reload their
+# values are taken from the file again, while client-set variables still win
+_DOTENV_KEYS = frozenset(set(os.environ) - _process_keys)
+
+PASSWORDLESS_AUTHENTICATORS = ("externalbrowser", "snowflake_jwt", "oauth")
+WAREHOUSE_ROUTE_NAMES = ("metadata", "small", "heavy")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Snowflake connection, credential and mode settings."""
+
+    account: Optional[str] = None
+    user: Optional[str] = None
+    password: Optional[str] = None
+    warehouse: Optional[str] = None
+    database: Optional[str] = None
+    schema: Optional[str] = "GOLD"
+    role: Optional[str] = None
+    authenticator: str = "snowflake"
+    timeout: int = 30
+    client_session_keep_alive: bool = True
+    login_timeout: int = 120
+    # Key-pair authentication (authenticator=snowflake_jwt)
+    private_key_path: Optional[str] = None
+    private_key_passphrase: Optional[str] = None
+    # OAuth authentication (authenticator=oauth): either a fixed access
+    # token, or a refresh token plus client credentials to mint new ones
+    oauth_token: Optional[str] = None
+    oauth_token_url: Optional[str] = None
+    oauth_client_id: Optional[str] = None
+    oauth_client_secret: Optional[str] = None
+    oauth_refresh_token: Optional[str] = None
+    # Warehouse per route (metadata, small, heavy); unset routes use ``warehouse``
+    warehouse_routes: Mapping[str, Optional[str]] = field(default_factory=dict)
+    mock_mode: bool = False
+    missing: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "Settings":
+        """Parse and validate settings from an environment mapping."""
+        warehouse = env.get("SNOWFLAKE_WAREHOUSE")
+        values: Dict[str, Any] = dict(
+            account=env.get("SNOWFLAKE_ACCOUNT"),
+            user=env.get("SNOWFLAKE_USER"),
+            password=env.get("SNOWFLAKE_PASSWORD"),
+            warehouse=warehouse,
+            database=env.get("SNOWFLAKE_DATABASE"),
+            schema=env.get("SNOWFLAKE_SCHEMA", "GOLD"),
+            role=env.get("SNOWFLAKE_ROLE"),
+            authenticator=env.get("SNOWFLAKE_AUTHENTICATOR", "snowflake"),
+            timeout=int(env.get("SNOWFLAKE_TIMEOUT", "30")),
+            client_session_keep_alive=(
+                env.get("SNOWFLAKE_CLIENT_SESSION_KEEP_ALIVE", "true").lower() == "true"
+            ),
+            login_timeout=int(env.get("SNOWFLAKE_LOGIN_TIMEOUT", "120")),
+            private_key_path=env.get("SNOWFLAKE_PRIVATE_KEY_PATH"),
+            private_key_passphrase=env.get("SNOWFLAKE_PRIVATE_KEY_PASSPHRASE"),
+            oauth_token=env.get("SNOWFLAKE_OAUTH_TOKEN"),
+            oauth_token_url=env.get("SNOWFLAKE_OAUTH_TOKEN_URL"),
+            oauth_client_id=env.get("SNOWFLAKE_OAUTH_CLIENT_ID"),
+            oauth_client_secret=env.get("SNOWFLAKE_OAUTH_CLIENT_SECRET"),
+            oauth_refresh_token=env.get("SNOWFLAKE_OAUTH_REFRESH_TOKEN"),
+            warehouse_routes={
+                route: env.get(f"SNOWFLAKE_WAREHOUSE_{route.upper()}", warehouse)
+                for route in WAREHOUSE_ROUTE_NAMES
+            },
+        )
+
+        # Allow forcing mock mode via environment variable (for testing)
+        if env.get("FORCE_MOCK_MODE", "").lower() == "true":
+            logger.info("FORCE_MOCK_MODE enabled - using simulated data")
+            return cls(**values, mock_mode=True)
+
+        required_vars = [
+            ("SNOWFLAKE_ACCOUNT", values["account"]),
+            ("SNOWFLAKE_USER", values["user"]),
+            ("SNOWFLAKE_WAREHOUSE", values["warehouse"]),
+            ("SNOWFLAKE_DATABASE", values["database"]),
+            ("SNOWFLAKE_ROLE", values["role"]),
+        ]
+
+        # Each authenticator needs its own credential
+        authenticator = values["authenticator"].lower()
+        if authenticator == "snowflake_jwt":
+            required_vars.append(("SNOWFLAKE_PRIVATE_KEY_PATH", values["private_key_path"]))
+        elif authenticator == "oauth":
+            required_vars.append(
+                (
+                    "SNOWFLAKE_OAUTH_TOKEN or SNOWFLAKE_OAUTH_REFRESH_TOKEN",
+                    values["oauth_token"] or values["oauth_refresh_token"],
+                )
+            )
+        elif authenticator not in PASSWORDLESS_AUTHENTICATORS:
+            required_vars.append(("SNOWFLAKE_PASSWORD", values["password"]))
+
+        missing = tuple(name for name, value in required_vars if not value)
+        if missing:
+            logger.warning(
+                f"Missing required environment variables: {', '.join(missing)}. "
+                "Server will run in MOCK MODE (Simulated Data)."
+            )
+        return cls(**values, mock_mode=bool(missing), missing=missing)
+
+    def connection_params(self) -> Dict[str, Any]:
+        """Snowflake connector arguments, or an empty dict in mock mode."""
+        if self.mock_mode:
+            return {}
+
+        params = {
+            "account": self.account,
+            "user": self.user,
+            "warehouse": self.warehouse,
+            "database": self.database,
+            "schema": self.schema,
+            "role": self.role,
+            "authenticator": self.authenticator,
+            "client_session_keep_alive": self.client_session_keep_alive,
+            "network_timeout": self.timeout,
+            "login_timeout": self.login_timeout,
+        }
+
+        # Key-pair, OAuth and browser credentials are added per connection by
+        # src.auth; every other authenticator uses the password
+        if self.authenticator.lower() not in PASSWORDLESS_AUTHENTICATORS and self.password:
+            params["password"] = self.password
+
+        return params
+
+
+def _read_env() -> Dict[str, str]:
+    file_values = {k: v for k, v in dotenv_values(ENV_FILE).items() if v is not None}
+    process_values = {k: v for k, v in os.environ.items() if k not in _DOTENV_KEYS}
+    return {**file_values, **process_values}
+
+
+_settings: Settings = Settings.from_env(os.environ)
+_reload_lock = threading.Lock()
+_reload_callbacks: List[Callable[[Settings], None]] = []
+
+# Kept in sync with the current settings; only reload_settings() rebinds it
+MOCK_MODE: bool = _settings.mock_mode
+
+
+def get_settings() -> Settings:
+    """Return the current settings."""
+    return _settings
+
+
+def on_reload(callback: Callable[[Settings], None]) -> None:
+    """Register a callback run with the new settings after every reload."""
+    _reload_callbacks.append(callback)
+
+
+def reload_settings() -> Settings:
+    """
+    Re-read the environment and .env file and swap in new settings.
+
+    Invalid values (e.g. a non-numeric timeout) are logged and the previous
+    settings are kept.
+    """
+    global _settings, MOCK_MODE
+    with _reload_lock:
+        try:
+            new_settings = Settings.from_env(_read_env())
+        except Exception as e:
+            logger.error(f"Invalid configuration, keeping the previous settings: {e}")
+            return _settings
+        changed = new_settings != _settings
+        _settings = new_settings
+        MOCK_MODE = new_settings.mock_mode
+    if changed:
+        logger.info("Configuration reloaded")
+        for callback in list(_reload_callbacks):
+            try:
+                callback(new_settings)
+            except Exception as e:
+                logger.error(f"Error applying reloaded configuration: {e}")
+    return new_settings
+
+
+def watch_settings(interval: float = 2.0) -> None:
+    """Reload settings on SIGHUP and whenever the .env file changes."""
+    if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_settings())
+
+    def _mtime() -> Optional[float]:
+        try:
+            return ENV_FILE.stat().st_mtime
+        except OSError:
+            return None
+
+    def _poll() -> None:
+        last_mtime = _mtime()
+        while True:
+            time.sleep(interval)
+            mtime = _mtime()
+            if mtime != last_mtime:
+                last_mtime = mtime
+                reload_settings()
+
+    threading.Thread(target=_poll, name="settings-watcher", daemon=True).start()
+
+
+# Old module-level names, resolved against the current settings
+_SETTINGS_ALIASES = {
+    "SNOWFLAKE_ACCOUNT": "account",
+    "SNOWFLAKE_USER": "user",
+    "SNOWFLAKE_PASSWORD": "password",
+    "SNOWFLAKE_WAREHOUSE": "warehouse",
+    "SNOWFLAKE_DATABASE": "database",
+    "SNOWFLAKE_SCHEMA": "schema",
+    "SNOWFLAKE_ROLE": "role",
+    "SNOWFLAKE_AUTHENTICATOR": "authenticator",
+    "SNOWFLAKE_TIMEOUT": "timeout",
+    "SNOWFLAKE_CLIENT_SESSION_KEEP_ALIVE": "client_session_keep_alive",
+    "SNOWFLAKE_LOGIN_TIMEOUT": "login_timeout",
+    "SNOWFLAKE_PRIVATE_KEY_PATH": "private_key_path",
+    "SNOWFLAKE_PRIVATE_KEY_PASSPHRASE": "private_key_passphrase",
+    "SNOWFLAKE_OAUTH_TOKEN": "oauth_token",
+    "SNOWFLAKE_OAUTH_TOKEN_URL": "oauth_token_url",
+    "SNOWFLAKE_OAUTH_CLIENT_ID": "oauth_client_id",
+    "SNOWFLAKE_OAUTH_CLIENT_SECRET": "oauth_client_secret",
+    "SNOWFLAKE_OAUTH_REFRESH_TOKEN": "oauth_refresh_token",
+    "WAREHOUSE_ROUTES": "warehouse_routes",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SETTINGS_ALIASES:
+        return getattr(_settings, _SETTINGS_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Connection retry settings
 MAX_CON_RETRY_ATTEMPTS: int = int(os.getenv("MAX_CON_RETRY_ATTEMPTS", "3"))
-SNOWFLAKE_LOGIN_TIMEOUT: int = int(os.getenv("SNOWFLAKE_LOGIN_TIMEOUT", "120"))
-
-# Flask configuration
-FLASK_HOST: str = os.getenv("FLASK_HOST", "127.0.0.1")
-FLASK_PORT: int = int(os.getenv("FLASK_PORT", "5000"))
-FLASK_DEBUG: bool = os.getenv("FLASK_DEBUG", "false").lower() == "true"
-
-
-
-MOCK_MODE = False
-
-def validate_config() -> None:
-    """Validate that all required configuration is present."""
-    global MOCK_MODE
-    
-    # Allow forcing mock mode via environment variable (for testing)
-    if os.getenv("FORCE_MOCK_MODE", "").lower() == "true":
-        import logging
-        logging.getLogger(__name__).info("FORCE_MOCK_MODE enabled - using simulated data")
-        MOCK_MODE = True
-        return
-    
-    required_vars = [
-        ("SNOWFLAKE_ACCOUNT", SNOWFLAKE_ACCOUNT),
-        ("SNOWFLAKE_USER", SNOWFLAKE_USER),
-        ("SNOWFLAKE_WAREHOUSE", SNOWFLAKE_WAREHOUSE),
-        ("SNOWFLAKE_DATABASE", SNOWFLAKE_DATABASE),
-        ("SNOWFLAKE_ROLE", SNOWFLAKE_ROLE),
-    ]
-    
-    # Password is only required if not using external browser auth
-    if SNOWFLAKE_AUTHENTICATOR != "externalbrowser":
-        required_vars.append(("SNOWFLAKE_PASSWORD", SNOWFLAKE_PASSWORD))
-
-    missing_vars = [name for name, value in required_vars if not value]
-
-    if missing_vars:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(
-            f"Missing required environment variables: {', '.join(missing_vars)}. "
-            "Server will run in MOCK MODE (Simulated Data)."
-        )
-        MOCK_MODE = True
-        return
 
-    MOCK_MODE = False
+# Warehouse routing: metadata lookups and small queries go to a small
+# warehouse, heavy scans to a larger one (warehouses: Settings.warehouse_routes).
+# Default route per tool
+TOOL_ROUTES: Dict[str, str] = {
+    "list_views": "metadata",
+    "describe_view": "metadata",
+    "query": "small",
+    "chart": "heavy",
+    "export": "heavy",
+    "profile": "heavy",
+}
+# Queries whose observed mean latency exceeds this are sent to the heavy route
+ROUTE_HEAVY_MEAN_MS: float = float(os.getenv("ROUTE_HEAVY_MEAN_MS", "10000"))
+
+
+def _parse_route_fingerprints(raw: str) -> Tuple[Dict[str, str], Tuple[str, ...]]:
+    """Parse fingerprint -> route overrides, returning the valid ones and errors."""
+    try:
+        overrides = json.loads(raw)
+    except ValueError as e:
+        return {}, (f"ROUTE_FINGERPRINTS is not valid JSON: {e}",)
+    if not isinstance(overrides, dict):
+        return {}, ("ROUTE_FINGERPRINTS must be a JSON object",)
+    routes: Dict[str, str] = {}
+    errors: List[str] = []
+    for key, route in overrides.items():
+        if route in WAREHOUSE_ROUTE_NAMES:
+            routes[key] = route
+        else:
+            errors.append(
+                f"ROUTE_FINGERPRINTS entry {key!r} has unknown route {route!r} "
+                f"(expected one of {', '.join(WAREHOUSE_ROUTE_NAMES)})"
+            )
+    return routes, tuple(errors)
+
+
+# Explicit fingerprint -> route overrides, as a JSON object; entries naming an
+# unknown route are ignored and reported by validate_config()
+ROUTE_FINGERPRINTS, ROUTE_FINGERPRINT_ERRORS = _parse_route_fingerprints(
+    os.getenv("ROUTE_FINGERPRINTS", "{}")
+)
+for _error in ROUTE_FINGERPRINT_ERRORS:
+    logger.warning(f"Ignoring invalid route override: {_error}")
+
+# Connection pool per warehouse route
+POOL_MAX_SIZE: int = int(os.getenv("POOL_MAX_SIZE", "4"))
+POOL_IDLE_SECONDS: int = int(os.getenv("POOL_IDLE_SECONDS", "600"))
+POOL_ACQUIRE_TIMEOUT: int = int(os.getenv("POOL_ACQUIRE_TIMEOUT", "60"))
+
+# Admission control in front of Snowflake: concurrent queries server-wide and
+# per client session, queue length before new requests are rejected, and the
+# longest a queued request waits
+ADMISSION_MAX_CONCURRENT: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+ADMISSION_MAX_PER_CLIENT: int = int(os.getenv("ADMISSION_MAX_PER_CLIENT", "3"))
+ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+
+# Embedded chart server configuration (FLASK_* kept as fallbacks for old .env files)
+CHART_SERVER_HOST: str = os.getenv(
+    "CHART_SERVER_HOST", os.getenv("FLASK_HOST", "127.0.0.1")
+)
+# Port 0 lets the OS pick a free port, so several server processes can coexist
+CHART_SERVER_PORT: int = int(os.getenv("CHART_SERVER_PORT", os.getenv("FLASK_PORT", "0")))
+
+# Local cache directory for spilled results and other server-side state
+CACHE_DIR: Path = Path(
+    os.getenv("MCP_CACHE_DIR", str(Path(__file__).parent.parent / ".cache"))
+)
+
+# Server-side result handles
+RESULT_STORE_TTL_SECONDS: int = int(os.getenv("RESULT_STORE_TTL_SECONDS", "3600"))
+RESULT_STORE_MAX_MEMORY_MB: int = int(os.getenv("RESULT_STORE_MAX_MEMORY_MB", "256"))
+# Per server process; spill files of exited processes are removed on startup
+RESULT_STORE_MAX_DISK_MB: int = int(os.getenv("RESULT_STORE_MAX_DISK_MB", "2048"))
+# Snowflake keeps query results for 24 hours; results dropped from the store
+# within that window are re-read with RESULT_SCAN(query_id) instead of re-run
+RESULT_SCAN_TTL_SECONDS: int = int(os.getenv("RESULT_SCAN_TTL_SECONDS", str(24 * 3600)))
+
+# Rows fetched for queries without their own LIMIT. A fixed value (rather than
+# the caller's limit) keeps the query text, and so Snowflake's result cache
+# key, the same for every caller
+QUERY_FETCH_ROWS: int = int(os.getenv("QUERY_FETCH_ROWS", "1000"))
+
+# Persistent query result cache shared across restarts and processes
+QUERY_CACHE_ENABLED: bool = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+QUERY_CACHE_DIR: Path = Path(os.getenv("QUERY_CACHE_DIR", str(CACHE_DIR / "queries")))
+QUERY_CACHE_TTL_SECONDS: int = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "900"))
+QUERY_CACHE_MAX_MB: int = int(os.getenv("QUERY_CACHE_MAX_MB", "512"))
+
+# Per-fingerprint query statistics (SQLite)
+WORKLOAD_TRACKING_ENABLED: bool = (
+    os.getenv("WORKLOAD_TRACKING_ENABLED", "true").lower() == "true"
+)
+WORKLOAD_DB_PATH: Path = Path(
+    os.getenv("WORKLOAD_DB_PATH", str(CACHE_DIR / "workload.sqlite3"))
+)
+
+# Materialization advisor: hot aggregate shapes become dynamic tables or
+# materialized views; creation only happens when explicitly enabled
+MATERIALIZATION_AUTO_CREATE: bool = (
+    os.getenv("MATERIALIZATION_AUTO_CREATE", "false").lower() == "true"
+)
+MATERIALIZATION_REWRITE_ENABLED: bool = (
+    os.getenv("MATERIALIZATION_REWRITE_ENABLED", "true").lower() == "true"
+)
+MATERIALIZATION_KIND: str = os.getenv("MATERIALIZATION_KIND", "dynamic_table")
+MATERIALIZATION_TARGET_LAG: str = os.getenv("MATERIALIZATION_TARGET_LAG", "1 hour")
+MATERIALIZATION_SCHEMA: Optional[str] = os.getenv(
+    "MATERIALIZATION_SCHEMA", _settings.schema
+)
+
+# Schema search index: re-synced from INFORMATION_SCHEMA when older than this
+SCHEMA_INDEX_TTL_SECONDS: int = int(os.getenv("SCHEMA_INDEX_TTL_SECONDS", "300"))
+
+# Column profiles (snowflake_profile_view): cache lifetime and widest view profiled
+PROFILE_CACHE_TTL_SECONDS: int = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "3600"))
+PROFILE_MAX_COLUMNS: int = int(os.getenv("PROFILE_MAX_COLUMNS", "50"))
+
+# Results larger than these budgets are returned as a summary plus sample rows
+RESPONSE_MAX_ROWS: int = int(os.getenv("RESPONSE_MAX_ROWS", "200"))
+RESPONSE_MAX_BYTES: int = int(os.getenv("RESPONSE_MAX_BYTES", str(64 * 1024)))
+RESPONSE_SAMPLE_ROWS: int = int(os.getenv("RESPONSE_SAMPLE_ROWS", "10"))
+
+# Default row sampling percentage for approximate queries
+APPROX_SAMPLE_PERCENT: float = float(os.getenv("APPROX_SAMPLE_PERCENT", "10"))
+
+# Pre-flight EXPLAIN cost check: queries estimated to scan more than these
+# budgets (0 = no limit) are rejected, sampled or routed to the heavy warehouse
+COST_PREFLIGHT_ENABLED: bool = os.getenv("COST_PREFLIGHT_ENABLED", "false").lower() == "true"
+COST_MAX_BYTES: int = int(os.getenv("COST_MAX_BYTES", str(10 * 1024 ** 3)))
+COST_MAX_PARTITIONS: int = int(os.getenv("COST_MAX_PARTITIONS", "0"))
+COST_OVER_BUDGET_ACTION: str = os.getenv("COST_OVER_BUDGET_ACTION", "reject").lower()
+
+# Bulk exports
+EXPORTS_DIR: Path = Path(
+    os.getenv("EXPORTS_DIR", str(Path(__file__).parent.parent / "exports"))
+)
+EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "50000"))
+
+# Query-to-chart pipeline settings
+CHART_MAX_ROWS: int = int(os.getenv("CHART_MAX_ROWS", "500000"))
+# Charts with more points than this ship their data in a gzip JSON sidecar
+CHART_SIDECAR_THRESHOLD: int = int(os.getenv("CHART_SIDECAR_THRESHOLD", "5000"))
+
+# Snowflake session parameters per workload profile, set at login on the
+# pooled sessions of each profile. Interactive sessions download small chunks
+# so the first rows arrive quickly; export sessions download large chunks on
+# more threads; metadata sessions stay light. ROWS_PER_RESULTSET stays 0 (no
+# cap): the tools bound results with an injected LIMIT, and a server-side cap
+# would silently cut short any larger LIMIT the query asked for.
+SESSION_QUERY_TAG: str = os.getenv("SESSION_QUERY_TAG", "snowflake-mcp-server")
+SESSION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "interactive": {
+        "USE_CACHED_RESULT": True,
+        "QUERY_TAG": f"{SESSION_QUERY_TAG}:interactive",
+        "ROWS_PER_RESULTSET": 0,
+        "CLIENT_PREFETCH_THREADS": 4,
+        "CLIENT_RESULT_CHUNK_SIZE": 48,
+    },
+    "export": {
+        "USE_CACHED_RESULT": True,
+        "QUERY_TAG": f"{SESSION_QUERY_TAG}:export",
+        "ROWS_PER_RESULTSET": 0,
+        "CLIENT_PREFETCH_THREADS": 10,
+        "CLIENT_RESULT_CHUNK_SIZE": 160,
+    },
+    "metadata": {
+        "USE_CACHED_RESULT": True,
+        "QUERY_TAG": f"{SESSION_QUERY_TAG}:metadata",
+        "ROWS_PER_RESULTSET": 0,
+        "CLIENT_PREFETCH_THREADS": 1,
+        "CLIENT_RESULT_CHUNK_SIZE": 48,
+    },
+}
+# Per-profile parameter overrides, as a JSON object of objects
+_profile_overrides = json.loads(os.getenv("SESSION_PROFILE_OVERRIDES", "{}"))
+for _profile, _overrides in _profile_overrides.items():
+    SESSION_PROFILES.setdefault(_profile, {}).update(_overrides)
+# Default session profile per tool
+TOOL_PROFILES: Dict[str, str] = {
+    "list_views": "metadata",
+    "describe_view": "metadata",
+    "query": "interactive",
+    "chart": "interactive",
+    "export": "export",
+    "profile": "interactive",
+}
+
+
+def validate_config() -> List[str]:
+    """
+    Re-read and validate the configuration (sets MOCK_MODE when incomplete).
+
+    Returns:
+        Problems found: missing connection settings and invalid
+        ROUTE_FINGERPRINTS entries (empty when the configuration is complete)
+    """
+    settings = reload_settings()
+    for error in ROUTE_FINGERPRINT_ERRORS:
+        logger.error(error)
+    return [f"Missing {name}" for name in settings.missing] + list(
+        ROUTE_FINGERPRINT_ERRORS
+    )
 
 
 def get_snowflake_config() -> dict:
     """Get Snowflake connection configuration as a dictionary."""
-    validate_config()
-    
-    if MOCK_MODE:
-        return {}
-
-    config = {
-        "account": SNOWFLAKE_ACCOUNT,
-        "user": SNOWFLAKE_USER,
-        "warehouse": SNOWFLAKE_WAREHOUSE,
-        "database": SNOWFLAKE_DATABASE,
-        "schema": SNOWFLAKE_SCHEMA,
-        "role": SNOWFLAKE_ROLE,
-        "authenticator": SNOWFLAKE_AUTHENTICATOR,
-        "client_session_keep_alive": SNOWFLAKE_CLIENT_SESSION_KEEP_ALIVE,
-        "network_timeout": SNOWFLAKE_TIMEOUT,
-        "login_timeout": SNOWFLAKE_LOGIN_TIMEOUT,
-    }
-    
-    # Only add password if not using external browser auth
-    if SNOWFLAKE_AUTHENTICATOR != "externalbrowser" and SNOWFLAKE_PASSWORD:
-        config["password"] = SNOWFLAKE_PASSWORD
-        
-    return config
+    return _settings.connection_params()
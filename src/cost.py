@@ -0,0 +1,133 @@
+"""Pre-flight cost estimates for queries using ``EXPLAIN USING JSON``.
+
+EXPLAIN only compiles the query, so it returns in well under a second with
+the partitions and bytes the plan would scan. Queries estimated above the
+configured budget are rejected, sampled or sent to the heavy warehouse
+(``COST_OVER_BUDGET_ACTION``), and the estimate is returned to the agent so
+it can narrow the query before spending minutes of warehouse time.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from src.config import (
+    APPROX_SAMPLE_PERCENT,
+    COST_MAX_BYTES,
+    COST_MAX_PARTITIONS,
+    COST_OVER_BUDGET_ACTION,
+)
+from src.sql_utils import rewrite_approximate
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("reject", "sample", "route")
+
+
+def parse_plan(content: Any) -> Dict[str, Any]:
+    """
+    Extract the scan estimate from an ``EXPLAIN USING JSON`` plan.
+
+    Args:
+        content: The plan, as the JSON text returned by Snowflake or parsed
+
+    Returns:
+        Dictionary with partitions_total, partitions_assigned and
+        bytes_assigned
+    """
+    plan = json.loads(content) if isinstance(content, (str, bytes)) else content
+    stats = plan.get("GlobalStats", {})
+    return {
+        "partitions_total": int(stats.get("partitionsTotal", 0)),
+        "partitions_assigned": int(stats.get("partitionsAssigned", 0)),
+        "bytes_assigned": int(stats.get("bytesAssigned", 0)),
+    }
+
+
+def estimate_cost(query: str) -> Dict[str, Any]:
+    """Compile a query with EXPLAIN and return its scan estimate."""
+    from src.tools.snowflake_tools import get_snowflake_connection
+
+    conn = get_snowflake_connection("metadata", "metadata")
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"EXPLAIN USING JSON {query}")
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+    return parse_plan(row[0])
+
+
+def over_budget(
+    estimate: Dict[str, Any],
+    max_bytes: int = COST_MAX_BYTES,
+    max_partitions: int = COST_MAX_PARTITIONS,
+) -> Optional[str]:
+    """Explain why an estimate exceeds the budget, or None if it fits (0 = no limit)."""
+    if max_bytes and estimate["bytes_assigned"] > max_bytes:
+        return (
+            f"Query would scan about {estimate['bytes_assigned'] / 1024 ** 3:.1f} GB, "
+            f"over the {max_bytes / 1024 ** 3:.1f} GB budget"
+        )
+    if max_partitions and estimate["partitions_assigned"] > max_partitions:
+        return (
+            f"Query would scan {estimate['partitions_assigned']} of "
+            f"{estimate['partitions_total']} partitions, over the "
+            f"{max_partitions} partition budget"
+        )
+    return None
+
+
+def preflight(
+    query: str, action: str = COST_OVER_BUDGET_ACTION, allow_sample: bool = True
+) -> Dict[str, Any]:
+    """
+    Estimate a query's cost and decide how to run it.
+
+    Args:
+        query: Query text
+        action: What to do over budget: reject, sample or route
+        allow_sample: False when the query was already rewritten and must
+            not be sampled again (sampling then falls back to rejecting)
+
+    Returns:
+        Dictionary with the ``estimate`` (None if EXPLAIN failed) and, when
+        over budget, either ``rejected`` (error message), a sampled
+        ``query`` with its ``approximation``, or the ``route`` to use
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown over-budget action '{action}', expected one of {ACTIONS}")
+    try:
+        estimate = estimate_cost(query)
+    except Exception as e:
+        # The query itself will report a real error; never block on EXPLAIN
+        logger.warning(f"Cost estimate failed, running query without it: {e}")
+        return {"estimate": None}
+
+    reason = over_budget(estimate)
+    if reason is None:
+        return {"estimate": estimate}
+    estimate = {**estimate, "over_budget": reason}
+
+    if action == "route":
+        logger.info(f"{reason}; sending it to the heavy warehouse")
+        return {"estimate": {**estimate, "action": "route"}, "route": "heavy"}
+
+    if action == "sample" and allow_sample:
+        rewrite = rewrite_approximate(query, APPROX_SAMPLE_PERCENT)
+        if rewrite["approximation"]["sampled"]:
+            logger.info(f"{reason}; running it on a {APPROX_SAMPLE_PERCENT:g}% sample")
+            return {
+                "estimate": {**estimate, "action": "sample"},
+                "query": rewrite["query"],
+                "approximation": rewrite["approximation"],
+            }
+
+    return {
+        "estimate": {**estimate, "action": "reject"},
+        "rejected": f"{reason}. Add filters on clustered columns, select fewer "
+        "columns or use approximate=true.",
+    }
@@ -2,13 +2,20 @@
 
 import asyncio
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-import requests
 from fastmcp import Context, FastMCP
 
-from src.config import FLASK_HOST, FLASK_PORT
-from src.tools.snowflake_tools import describe_view, list_views, query_snowflake
+from src.serialization import json_response
+from src.tools.snowflake_tools import (
+    chart_query,
+    describe_view,
+    describe_views,
+    fetch_result_rows,
+    get_stored_result,
+    list_views,
+    query_snowflake,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,27 +27,75 @@ mcp = FastMCP("snowflake-mcp-server")
 
 @mcp.tool(
     name="snowflake_query",
-    description="Execute a SQL query against Snowflake database.",
+    description=(
+        "Execute a SQL query against Snowflake database. The result includes a "
+        "result_id that other tools accept in place of resending the rows."
+    ),
 )
-def snowflake_query(query: str, limit: int = 100) -> Dict[str, Any]:
+@json_response
+def snowflake_query(
+    query: str,
+    limit: int = 100,
+    summarize: Optional[bool] = None,
+    approximate: bool = False,
+    sample_percent: Optional[float] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
     """
     Execute a SQL query against Snowflake database.
 
     Args:
         query: SQL query to execute against Snowflake
         limit: Maximum number of rows to return (1-1000, default: 100)
+        summarize: true to return column statistics and sample rows instead
+            of all rows; false to always return rows; omit to summarize only
+            large results
+        approximate: true for a faster approximate answer using row sampling
+            and APPROX_COUNT_DISTINCT/APPROX_PERCENTILE (exploration only)
+        sample_percent: Percentage of rows to sample in approximate mode
+        use_cache: false to bypass the server's query result cache and get
+            fresh rows
 
     Returns:
-        Query results with success status, data rows, columns, and metadata
+        Query results with success status, data rows, columns, result_id,
+        and metadata (truncated is true when the server's row cap cut the
+        result short; cached results include cache_age_seconds); with cost
+        pre-flight enabled, the EXPLAIN scan estimate (also returned when a
+        query is rejected as over budget)
     """
     logger.info(f"Executing Snowflake query with limit {limit}")
-    return query_snowflake(query, limit)
+    return query_snowflake(
+        query, limit, summarize, approximate, sample_percent, use_cache
+    )
+
+
+@mcp.tool(
+    name="result_fetch",
+    description="Fetch a page of rows from a previous query result by result_id. "
+    "Results dropped from the server are re-read from Snowflake's result cache.",
+)
+@json_response
+def result_fetch(result_id: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """
+    Fetch rows from a stored query result.
+
+    Args:
+        result_id: Handle returned by snowflake_query or result_transform
+        offset: Index of the first row to return (default: 0)
+        limit: Maximum number of rows to return (1-1000, default: 100)
+
+    Returns:
+        The requested rows with paging information
+    """
+    logger.info(f"Fetching rows {offset}+{limit} of result {result_id}")
+    return fetch_result_rows(result_id, offset, limit)
 
 
 @mcp.tool(
     name="snowflake_list_views",
     description="List all available views in the specified Snowflake schema.",
 )
+@json_response
 def snowflake_list_views(schema: Optional[str] = None) -> Dict[str, Any]:
     """
     List all available views in the specified Snowflake schema.
@@ -59,6 +114,7 @@ def snowflake_list_views(schema: Optional[str] = None) -> Dict[str, Any]:
     name="snowflake_describe_view",
     description="Get detailed information about a specific Snowflake view.",
 )
+@json_response
 def snowflake_describe_view(
     view_name: str, schema: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -76,16 +132,214 @@ def snowflake_describe_view(
     return describe_view(view_name, schema)
 
 
+@mcp.tool(
+    name="snowflake_describe_views",
+    description="Describe many (or all) views of a schema in one call: columns, "
+    "types and metadata keyed by view name. Prefer this over repeated "
+    "snowflake_describe_view calls.",
+)
+@json_response
+def snowflake_describe_views(
+    view_names: Optional[List[str]] = None, schema: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Describe several Snowflake views at once.
+
+    Args:
+        view_names: Views to describe (omit to describe every view)
+        schema: Schema name (optional, uses configured schema if not provided)
+
+    Returns:
+        Columns and metadata for each view, plus any names not found
+    """
+    logger.info(f"Describing {len(view_names) if view_names else 'all'} views")
+    return describe_views(view_names, schema)
+
+
+@mcp.tool(
+    name="snowflake_profile_view",
+    description="Profile every column of a view in one query: approximate distinct "
+    "count, null fraction, min/max and most frequent values. Use it instead of "
+    "exploratory SELECT DISTINCT queries before writing filters.",
+)
+@json_response
+def snowflake_profile_view(
+    view_name: str, schema: Optional[str] = None, top_k: int = 5, refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Profile the columns of a Snowflake view.
+
+    Args:
+        view_name: Name of the view to profile
+        schema: Schema name (optional, uses configured schema if not provided)
+        top_k: Most frequent values returned per column (1-20, default: 5)
+        refresh: Recompute instead of using a cached profile
+
+    Returns:
+        Row count and per-column statistics
+    """
+    from src.profiling import profile_view
+
+    logger.info(f"Profiling view: {view_name} in schema: {schema or 'default'}")
+    return profile_view(view_name, schema, top_k, refresh)
+
+
+@mcp.tool(
+    name="snowflake_search_schema",
+    description="Search views and columns by name, type or comment (typos and partial "
+    "words allowed). Use it to find the right view and columns before writing a query.",
+)
+@json_response
+def snowflake_search_schema(
+    query: str, limit: int = 10, kind: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Search the schema catalog.
+
+    Args:
+        query: Words to look for, e.g. "revenue category"
+        limit: Maximum number of matches (1-100, default: 10)
+        kind: "view" or "column" to restrict the matches
+
+    Returns:
+        Ranked view and column matches with their types and comments
+    """
+    from src.schema_index import search_schema
+
+    logger.info(f"Searching schema for: {query}")
+    return search_schema(query, limit, kind)
+
+
+@mcp.tool(
+    name="snowflake_export",
+    description=(
+        "Export a query's full result set to a local CSV, NDJSON or Parquet file. "
+        "Rows are streamed to disk and not returned; use for large extracts."
+    ),
+)
+@json_response
+def snowflake_export(
+    query: str,
+    format: str = "csv",
+    file_name: Optional[str] = None,
+    max_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a query's full result set to a local file.
+
+    Args:
+        query: SQL query to export
+        format: Output format (csv, ndjson, parquet)
+        file_name: Optional file name (written inside the exports directory)
+        max_rows: Optional cap on the number of rows written
+
+    Returns:
+        File path, rows written and bytes written
+    """
+    from src.tools.export_tools import export_query
+
+    logger.info(f"Exporting Snowflake query as {format}")
+    return export_query(query, format, file_name, max_rows)
+
+
+@mcp.tool(
+    name="result_transform",
+    description=(
+        "Filter, sort, group, take top-N or pivot a previous query result locally, "
+        "without querying Snowflake again. Use for follow-up questions on a result_id."
+    ),
+)
+@json_response
+def result_transform(
+    result_id: str, operations: list, limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Transform a stored query result with a pipeline of local operations.
+
+    Args:
+        result_id: Handle returned by snowflake_query or a previous transform
+        operations: Steps applied in order, each with an "op" key, e.g.
+            {"op": "filter", "column": "REVENUE", "operator": ">", "value": 100},
+            {"op": "group_by", "by": ["CATEGORY"], "aggregates": {"REVENUE": "sum"}},
+            {"op": "sort", "by": "REVENUE", "descending": true},
+            {"op": "top_n", "n": 5, "by": "REVENUE"},
+            {"op": "pivot", "index": "DATE", "columns": "CATEGORY", "values": "REVENUE"}
+        limit: Maximum number of rows to return (1-1000, default: 100)
+
+    Returns:
+        Transformed rows, columns, total_rows/has_more and a new result_id;
+        results dropped from the server are re-read from Snowflake first
+    """
+    from src.transform import transform_result
+
+    logger.info(f"Transforming result {result_id} with {len(operations)} operations")
+    return transform_result(result_id, operations, limit)
+
+
+@mcp.tool(
+    name="snowflake_workload_stats",
+    description="Report the most frequent or most expensive query shapes run by this server, "
+    "plus current query concurrency and queue times.",
+)
+@json_response
+def snowflake_workload_stats(limit: int = 10, order_by: str = "total_ms") -> Dict[str, Any]:
+    """
+    Report per-fingerprint query statistics.
+
+    Args:
+        limit: Number of query shapes to return (default: 10)
+        order_by: Statistic to rank by (total_ms, mean_ms, max_ms, calls, rows,
+            bytes, errors)
+
+    Returns:
+        Query fingerprints with call counts, latency, rows and bytes, and
+        admission-control metrics
+    """
+    from src.workload import workload_stats
+
+    logger.info(f"Reporting top {limit} query fingerprints by {order_by}")
+    return workload_stats(limit, order_by)
+
+
+@mcp.tool(
+    name="snowflake_materialization_advisor",
+    description="Suggest dynamic tables or materialized views for hot aggregate queries; "
+    "matching queries are then rewritten to read them.",
+)
+@json_response
+def snowflake_materialization_advisor(
+    min_calls: int = 3, limit: int = 5, create: bool = False
+) -> Dict[str, Any]:
+    """
+    Suggest materializations for repeated aggregate query shapes.
+
+    Args:
+        min_calls: Minimum calls before a query shape is considered (default: 3)
+        limit: Maximum number of candidates (default: 5)
+        create: Create eligible objects in Snowflake (requires
+            MATERIALIZATION_AUTO_CREATE=true)
+
+    Returns:
+        Candidates with their DDL, estimated savings and created objects
+    """
+    from src.advisor import advise
+
+    logger.info(f"Running materialization advisor (min_calls={min_calls}, create={create})")
+    return advise(min_calls, limit, create)
+
+
 @mcp.tool(
     name="create_chart",
     description="Generates a browser-based chart. USE ONLY WHEN EXPLICITLY REQUESTED BY USER. Do not call this automatically after a query.",
 )
+@json_response
 def create_chart(
-    data: list,
+    data: Optional[list] = None,
     chart_type: str = "bar",
     x_column: str = "",
     y_column: str = "",
     title: str = "Data Visualization",
+    result_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Create an interactive chart from query results and open it in the browser.
@@ -96,11 +350,19 @@ def create_chart(
         x_column: Column name for X-axis/labels
         y_column: Column name for Y-axis/values
         title: Chart title
+        result_id: Handle of a previous query result to chart instead of data
 
     Returns:
         Chart creation result with file path
     """
     try:
+        if result_id:
+            stored = get_stored_result(result_id)
+            if not stored["success"]:
+                return stored
+            data = stored["data"]["rows"]
+
+        data = data or []
         logger.info(f"Creating {chart_type} chart with {len(data)} data points")
 
         # Validate inputs
@@ -138,10 +400,63 @@ def create_chart(
         return {"success": False, "error": error_msg}
 
 
+@mcp.tool(
+    name="snowflake_chart",
+    description=(
+        "Run a SQL query and chart its result server-side; rows are not returned. "
+        "USE ONLY WHEN EXPLICITLY REQUESTED BY USER. Prefer this over "
+        "snowflake_query + create_chart when the user only wants the chart."
+    ),
+)
+@json_response
+def snowflake_chart(
+    x_column: str,
+    y_column: str,
+    query: str = "",
+    chart_type: str = "bar",
+    title: str = "Data Visualization",
+    aggregate: str = "sum",
+    result_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run a SQL query and render the result as a chart without returning rows.
+
+    Args:
+        x_column: Result column for X-axis/labels
+        y_column: Result column for Y-axis/values
+        query: SQL query producing the chart data
+        chart_type: Type of chart (bar, line, pie, scatter, doughnut)
+        title: Chart title
+        aggregate: How rows sharing a label are combined (sum, avg, min, max,
+            count, none)
+        result_id: Chart a previous query result instead of running a query
+
+    Returns:
+        Chart id, file path, a chart-server url for charts whose data is
+        in a sidecar file, and a small summary of the charted data
+    """
+    logger.info(f"Charting Snowflake query as {chart_type} ({aggregate})")
+    result = chart_query(
+        query,
+        x_column=x_column,
+        y_column=y_column,
+        chart_type=chart_type,
+        title=title,
+        aggregate=aggregate,
+        result_id=result_id,
+    )
+    if result.get("success"):
+        logger.info(f"Chart created: {result.get('file_path')}")
+    else:
+        logger.error(f"Chart pipeline failed: {result.get('error')}")
+    return result
+
+
 @mcp.tool(
     name="get_chart_url",
-    description="Get the URL for a previously created chart (Flask mode only).",
+    description="Get the local HTTP URL for a previously created chart.",
 )
+@json_response
 def get_chart_url(chart_id: str) -> Dict[str, Any]:
     """
     Get the URL for a previously created chart.
@@ -155,32 +470,23 @@ def get_chart_url(chart_id: str) -> Dict[str, Any]:
     try:
         logger.info(f"Getting URL for chart: {chart_id}")
 
-        # Check if chart exists
-        flask_url = f"http://{FLASK_HOST}:{FLASK_PORT}/charts/{chart_id}/data"
-        response = requests.get(flask_url, timeout=5)
-
-        if response.status_code == 200:
-            chart_data = response.json()
-            chart_url = f"http://{FLASK_HOST}:{FLASK_PORT}/charts/{chart_id}"
+        from src.chart_server import ensure_chart_server
+        from src.visualize import get_chart
 
-            return {
-                "success": True,
-                "chart_id": chart_id,
-                "url": chart_url,
-                "chart": chart_data.get("chart", {}),
-            }
-        elif response.status_code == 404:
+        # Resolve in-process from the chart index; no HTTP round trip needed
+        chart = get_chart(chart_id)
+        if chart is None:
             return {"success": False, "error": f"Chart {chart_id} not found"}
-        else:
-            return {
-                "success": False,
-                "error": f"Error accessing chart: {response.status_code}",
-            }
 
-    except requests.exceptions.ConnectionError:
-        error_msg = "Cannot connect to Flask visualization server"
-        logger.error(error_msg)
-        return {"success": False, "error": error_msg}
+        server = ensure_chart_server()
+        return {
+            "success": True,
+            "chart_id": chart_id,
+            "url": f"{server.base_url}/charts/{chart_id}",
+            "data_url": f"{server.base_url}/charts/{chart_id}/data",
+            "chart": chart,
+        }
+
     except Exception as e:
         error_msg = f"Error getting chart URL: {str(e)}"
         logger.error(error_msg)
@@ -191,17 +497,15 @@ def main() -> None:
     """Main entry point for the MCP server."""
     logger.info("Starting Snowflake MCP Server...")
 
-    # Validate configuration on startup
-    try:
-        from src.config import validate_config
+    # Configuration is validated once at import; reload it on SIGHUP or .env edits
+    from src.config import get_settings, watch_settings
 
-        validate_config()
+    settings = get_settings()
+    if settings.mock_mode:
+        logger.warning("Server will start in MOCK MODE without Snowflake credentials")
+    else:
         logger.info("Configuration validated successfully")
-    except ValueError as e:
-        logger.warning(f"Configuration validation failed: {e}")
-        logger.warning(
-            "Server will start but Snowflake operations may fail without proper configuration"
-        )
+    watch_settings()
 
     # Start the MCP server
     mcp.run()
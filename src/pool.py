@@ -0,0 +1,321 @@
+"""Warehouse routing and per-route Snowflake connection pools.
+
+Every tool call used to open (and log in) a new connection on the single
+configured warehouse, so metadata lookups, tiny aggregates and heavy scans
+all queued on the same compute. Work is now routed to a named warehouse
+route (``metadata``, ``small`` or ``heavy``, see ``Settings.warehouse_routes``)
+and each route keeps its own bounded pools of logged-in connections, one per
+session profile (``interactive``, ``export`` or ``metadata``, see
+``SESSION_PROFILES``) whose Snowflake session parameters are set at login.
+Pools are rebuilt when the configuration is reloaded.
+
+Pooled connections are handed out as :class:`PooledConnection` proxies whose
+``close()`` returns the session to its pool, so callers keep the usual
+open/use/close pattern. A session whose database, schema, role or warehouse
+no longer matches the pool's configuration (after a ``USE`` statement) is
+closed instead of pooled, so every checkout starts in the configured context
+that query cache keys are built from. Callers discard sessions they ran
+``ALTER SESSION`` on, which the connector does not track.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import snowflake.connector
+
+from src import config
+from src.auth import connection_auth_params
+from src.config import (
+    POOL_ACQUIRE_TIMEOUT,
+    POOL_IDLE_SECONDS,
+    POOL_MAX_SIZE,
+    ROUTE_FINGERPRINTS,
+    ROUTE_HEAVY_MEAN_MS,
+    SESSION_PROFILES,
+    TOOL_PROFILES,
+    TOOL_ROUTES,
+    WAREHOUSE_ROUTE_NAMES,
+)
+from src.sql_utils import fingerprint
+from src.workload import get_workload_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTE = "small"
+DEFAULT_PROFILE = "interactive"
+
+# Connection attributes that must still match the pool's parameters on release
+SESSION_CONTEXT = ("database", "schema", "role", "warehouse")
+
+
+def choose_route(tool: str, query: Optional[str] = None) -> str:
+    """
+    Pick the warehouse route for a unit of work.
+
+    Rules, in order: an explicit ``ROUTE_FINGERPRINTS`` entry for the query's
+    fingerprint, the heavy route for query shapes whose observed mean
+    latency exceeds ``ROUTE_HEAVY_MEAN_MS``, then the tool's default route.
+
+    Args:
+        tool: Tool name as listed in ``TOOL_ROUTES``
+        query: Optional SQL text
+
+    Returns:
+        Route name
+    """
+    route = TOOL_ROUTES.get(tool, DEFAULT_ROUTE)
+    if query is None:
+        return route
+
+    key = fingerprint(query)
+    if key in ROUTE_FINGERPRINTS:
+        return ROUTE_FINGERPRINTS[key]
+
+    if route != "heavy" and config.WORKLOAD_DB_PATH.exists():
+        try:
+            stats = get_workload_store().get(key)
+        except Exception as e:
+            logger.warning(f"Could not read workload stats for routing: {e}")
+            stats = None
+        if stats and stats["mean_ms"] >= ROUTE_HEAVY_MEAN_MS:
+            return "heavy"
+    return route
+
+
+def choose_profile(tool: str) -> str:
+    """Session profile for a tool, as listed in ``TOOL_PROFILES``."""
+    return TOOL_PROFILES.get(tool, DEFAULT_PROFILE)
+
+
+class PooledConnection:
+    """Connection proxy whose ``close()`` hands the session back to its pool."""
+
+    def __init__(
+        self,
+        pool: "ConnectionPool",
+        conn: Any,
+        on_release: Optional[Callable[[], None]] = None,
+    ):
+        self._pool = pool
+        self._conn = conn
+        self._on_release = on_release
+        self._released = False
+
+    @property
+    def route(self) -> str:
+        return self._pool.route
+
+    def close(self) -> None:
+        """Return the connection to the pool."""
+        self._release(discard=False)
+
+    def discard(self) -> None:
+        """Close the underlying connection instead of reusing it."""
+        self._release(discard=True)
+
+    def _release(self, discard: bool) -> None:
+        if self._released:
+            return
+        self._released = True
+        try:
+            self._pool.release(self._conn, discard=discard)
+        finally:
+            if self._on_release is not None:
+                self._on_release()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded pool of logged-in connections to one warehouse route."""
+
+    def __init__(
+        self,
+        route: str,
+        params: Dict[str, Any],
+        max_size: int = POOL_MAX_SIZE,
+        idle_seconds: float = POOL_IDLE_SECONDS,
+        connect: Optional[Callable[..., Any]] = None,
+        profile: str = DEFAULT_PROFILE,
+    ):
+        self.route = route
+        self.profile = profile
+        self.params = params
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._connect = connect or connect_with_auth
+        self._lock = threading.Lock()
+        # Callers beyond max_size wait for a slot instead of piling more
+        # sessions onto the warehouse
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: List[Tuple[Any, float]] = []
+        self._created = 0
+        self._reused = 0
+        self._closed = False
+
+    def acquire(
+        self,
+        timeout: float = POOL_ACQUIRE_TIMEOUT,
+        on_release: Optional[Callable[[], None]] = None,
+    ) -> PooledConnection:
+        """
+        Take an idle connection or open a new one, waiting for a free slot.
+
+        ``on_release`` is called once the connection is handed back.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(
+                f"No free connection on route '{self.route}' after {timeout}s"
+            )
+        try:
+            conn = self._take_idle()
+            if conn is None:
+                conn = self._connect(**self.params)
+                with self._lock:
+                    self._created += 1
+                logger.info(
+                    f"Opened Snowflake connection on route '{self.route}' "
+                    f"(warehouse {self.params.get('warehouse')}, "
+                    f"profile {self.profile})"
+                )
+        except BaseException:
+            self._slots.release()
+            raise
+        return PooledConnection(self, conn, on_release)
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        try:
+            if discard or self._closed or conn.is_closed():
+                self._close_quietly(conn)
+            elif self._context_changed(conn):
+                logger.info(
+                    f"Closing connection on route '{self.route}' whose session "
+                    "context was changed"
+                )
+                self._close_quietly(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        """Close idle connections; connections in use are closed on release."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "route": self.route,
+                "profile": self.profile,
+                "warehouse": self.params.get("warehouse"),
+                "idle": len(self._idle),
+                "created": self._created,
+                "reused": self._reused,
+                "max_size": self.max_size,
+            }
+
+    def _context_changed(self, conn: Any) -> bool:
+        """Whether a USE statement moved the session off the configured context."""
+        for name in SESSION_CONTEXT:
+            expected, current = self.params.get(name), getattr(conn, name, None)
+            if not isinstance(expected, str) or not isinstance(current, str):
+                continue
+            # Unquoted identifiers resolve upper-cased, quoted ones verbatim
+            if expected.startswith('"') and expected.endswith('"'):
+                expected = expected[1:-1]
+            else:
+                expected = expected.upper()
+            if current != expected:
+                return True
+        return False
+
+    def _take_idle(self) -> Optional[Any]:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                # Most recently used first: its session is the least likely
+                # to have timed out on the server
+                conn, released_at = self._idle.pop()
+            if now - released_at > self.idle_seconds or conn.is_closed():
+                self._close_quietly(conn)
+                continue
+            with self._lock:
+                self._reused += 1
+            return conn
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+
+def connect_with_auth(**params: Any) -> Any:
+    """Open a connection with freshly resolved credentials (e.g. OAuth tokens)."""
+    return snowflake.connector.connect(**{**params, **connection_auth_params()})
+
+
+_pools: Dict[Tuple[str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(route: str, profile: str = DEFAULT_PROFILE) -> ConnectionPool:
+    """Return the pool for a route and session profile, creating it on first use."""
+    if route not in WAREHOUSE_ROUTE_NAMES:
+        raise ValueError(
+            f"Unknown warehouse route '{route}', expected one of {WAREHOUSE_ROUTE_NAMES}"
+        )
+    if profile not in SESSION_PROFILES:
+        raise ValueError(
+            f"Unknown session profile '{profile}', expected one of "
+            f"{tuple(SESSION_PROFILES)}"
+        )
+    with _pools_lock:
+        pool = _pools.get((route, profile))
+        if pool is None:
+            settings = config.get_settings()
+            params = settings.connection_params()
+            params["warehouse"] = settings.warehouse_routes.get(route) or settings.warehouse
+            params["session_parameters"] = dict(SESSION_PROFILES[profile])
+            pool = _pools[(route, profile)] = ConnectionPool(
+                route, params, profile=profile
+            )
+        return pool
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    """Usage statistics of every pool created so far."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+@atexit.register
+def close_pools(*_: Any) -> None:
+    """Close every pool; new ones are created with the current settings."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+config.on_reload(close_pools)
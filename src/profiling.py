@@ -0,0 +1,203 @@
+"""Column profiles of a view computed in one approximate query.
+
+Instead of a series of exploratory ``SELECT DISTINCT`` queries, a profile
+reads every column's approximate distinct count, null fraction, min/max and
+most frequent values with a single scan using APPROX_COUNT_DISTINCT and
+APPROX_TOP_K. Profiles are cached in memory for PROFILE_CACHE_TTL_SECONDS.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src import config, mock_data
+from src.config import PROFILE_CACHE_TTL_SECONDS, PROFILE_MAX_COLUMNS
+from src.pool import choose_profile, choose_route
+from src.schema_index import fetch_catalog_columns
+
+logger = logging.getLogger(__name__)
+
+# Semi-structured and spatial columns only get their null fraction
+UNPROFILED_TYPES = ("VARIANT", "OBJECT", "ARRAY", "GEOGRAPHY", "GEOMETRY", "VECTOR")
+
+_cache: Dict[Tuple[str, str, int], Tuple[float, Dict[str, Any]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _profiled(column: Dict[str, Any]) -> bool:
+    return not str(column.get("type") or "").upper().startswith(UNPROFILED_TYPES)
+
+
+def build_profile_query(
+    view: str, columns: Sequence[Dict[str, Any]], top_k: int
+) -> str:
+    """
+    Single SELECT computing the statistics of every column.
+
+    Column ``i`` gets the aliases N_i (non-null count) and, for profiled
+    types, D_i (distinct count), MIN_i, MAX_i and TOP_i (top-K values).
+    """
+    parts = ["COUNT(*) AS ROW_COUNT"]
+    for i, column in enumerate(columns):
+        name = _quote_identifier(column["name"])
+        parts.append(f"COUNT({name}) AS N_{i}")
+        if _profiled(column):
+            parts += [
+                f"APPROX_COUNT_DISTINCT({name}) AS D_{i}",
+                f"MIN({name}) AS MIN_{i}",
+                f"MAX({name}) AS MAX_{i}",
+                f"APPROX_TOP_K({name}, {top_k}) AS TOP_{i}",
+            ]
+    return f"SELECT {', '.join(parts)} FROM {view}"
+
+
+def _top_values(raw: Any) -> List[Dict[str, Any]]:
+    # APPROX_TOP_K returns [[value, count], ...], as JSON text from the connector
+    pairs = json.loads(raw) if isinstance(raw, str) else raw or []
+    return [{"value": value, "count": count} for value, count in pairs]
+
+
+def parse_profile_row(
+    row: Dict[str, Any], columns: Sequence[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Turn the result row of :func:`build_profile_query` into a profile."""
+    row_count = row["ROW_COUNT"] or 0
+    profiles = []
+    for i, column in enumerate(columns):
+        non_null = row[f"N_{i}"] or 0
+        profile = {
+            "name": column["name"],
+            "type": column.get("type"),
+            "null_fraction": round(1 - non_null / row_count, 4) if row_count else None,
+        }
+        if _profiled(column):
+            profile.update(
+                distinct_count=row[f"D_{i}"],
+                min=row[f"MIN_{i}"],
+                max=row[f"MAX_{i}"],
+                top_values=_top_values(row[f"TOP_{i}"]),
+            )
+        profiles.append(profile)
+    return {"row_count": row_count, "columns": profiles}
+
+
+def profile_rows(
+    rows: Sequence[Dict[str, Any]], columns: Sequence[Dict[str, Any]], top_k: int
+) -> Dict[str, Any]:
+    """Exact profile of in-memory rows, in the same shape (used in mock mode)."""
+    profiles = []
+    for column in columns:
+        values = [row.get(column["name"]) for row in rows]
+        present = [value for value in values if value is not None]
+        profiles.append(
+            {
+                "name": column["name"],
+                "type": column.get("type"),
+                "null_fraction": (
+                    round(1 - len(present) / len(rows), 4) if rows else None
+                ),
+                "distinct_count": len(set(present)),
+                "min": min(present) if present else None,
+                "max": max(present) if present else None,
+                "top_values": [
+                    {"value": value, "count": count}
+                    for value, count in Counter(present).most_common(top_k)
+                ],
+            }
+        )
+    return {"row_count": len(rows), "columns": profiles}
+
+
+def _mock_profile(view: str, top_k: int) -> Optional[Dict[str, Any]]:
+    sample = mock_data.SAMPLE_CATEGORY_SALES["data"]
+    if view != mock_data.DESCRIBE_DAILY_SALES["data"]["view"]:
+        return None
+    columns = [{"name": name} for name in sample["columns"]]
+    return profile_rows(sample["rows"], columns, top_k)
+
+
+def _fetch_profile(schema: str, view: str, top_k: int) -> Optional[Dict[str, Any]]:
+    from snowflake.connector import DictCursor
+
+    from src.tools.snowflake_tools import get_snowflake_connection
+
+    conn = get_snowflake_connection(choose_route("profile"), choose_profile("profile"))
+    try:
+        cursor = conn.cursor(DictCursor)
+        try:
+            columns = fetch_catalog_columns(cursor, schema, [view]).get((schema, view))
+            if not columns:
+                return None
+            profiled = columns[:PROFILE_MAX_COLUMNS]
+            qualified = f"{_quote_identifier(schema)}.{_quote_identifier(view)}"
+            cursor.execute(build_profile_query(qualified, profiled, top_k))
+            profile = parse_profile_row(cursor.fetchone(), profiled)
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+    if len(columns) > len(profiled):
+        profile["truncated_columns"] = len(columns) - len(profiled)
+    return profile
+
+
+def profile_view(
+    view_name: str,
+    schema: Optional[str] = None,
+    top_k: int = 5,
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Profile every column of a view in one approximate query.
+
+    Args:
+        view_name: Name of the view to profile
+        schema: Schema name (optional, defaults to configured schema)
+        top_k: Number of most frequent values per column (1-20)
+        refresh: Ignore a cached profile and recompute it
+
+    Returns:
+        Dictionary with success status and the per-column profile
+    """
+    if not view_name or not view_name.strip():
+        return {"success": False, "error": "View name cannot be empty"}
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_$]*", view_name.strip()):
+        return {"success": False, "error": "View name must be an unquoted identifier"}
+
+    view = view_name.strip().upper()
+    schema = (schema or config.get_settings().schema or "").upper()
+    top_k = min(max(1, top_k), 20)
+    key = (schema, view, top_k)
+
+    with _cache_lock:
+        entry = _cache.get(key)
+    fresh = entry is not None and time.time() - entry[0] < PROFILE_CACHE_TTL_SECONDS
+    if fresh and not refresh:
+        return {"success": True, "data": {**entry[1], "cached": True}}
+
+    try:
+        if config.MOCK_MODE:
+            logger.info(f"MOCK MODE: Profiling sample rows for view {view}")
+            profile = _mock_profile(view, top_k)
+        else:
+            profile = _fetch_profile(schema, view, top_k)
+    except Exception as e:
+        logger.error(f"Error profiling view {view}: {e}")
+        return {"success": False, "error": f"Failed to profile view: {str(e)}"}
+
+    if profile is None:
+        return {"success": False, "error": f"View {schema}.{view} not found"}
+
+    profiled_at = time.time()
+    profile = {"view": view, "schema": schema, **profile, "profiled_at": profiled_at}
+    with _cache_lock:
+        _cache[key] = (profiled_at, profile)
+    return {"success": True, "data": {**profile, "cached": False}}
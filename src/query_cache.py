@@ -0,0 +1,268 @@
+"""Persistent cache of query results shared across restarts and processes.
+
+In stdio mode every client launch starts a fresh server process, so the
+in-memory result store starts empty each time. This cache keeps recent
+results on disk: a SQLite index (WAL mode, safe for several processes) maps
+a key built from the canonical SQL text and the session context to a
+pickled payload file. Entries expire after a TTL and the least recently used
+ones are evicted once the cache exceeds its size budget.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src import config
+from src.config import (
+    QUERY_CACHE_DIR,
+    QUERY_CACHE_ENABLED,
+    QUERY_CACHE_MAX_MB,
+    QUERY_CACHE_TTL_SECONDS,
+)
+from src.sql_utils import canonicalize_sql, is_deterministic
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    query_id TEXT,
+    columns TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+def session_context() -> Dict[str, Optional[str]]:
+    """Connection settings that can change what a query returns."""
+    settings = config.get_settings()
+    return {
+        "account": settings.account,
+        "user": settings.user,
+        "role": settings.role,
+        "database": settings.database,
+        "schema": settings.schema,
+    }
+
+
+def cache_key(sql: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """Key for a query: its canonical text plus the session context."""
+    context = session_context() if context is None else context
+    material = json.dumps([canonicalize_sql(sql), context], sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """Disk-backed result cache with TTL and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        directory: Path = QUERY_CACHE_DIR,
+        ttl_seconds: float = QUERY_CACHE_TTL_SECONDS,
+        max_bytes: int = QUERY_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.directory / "index.sqlite3",
+                timeout=10,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _payload_path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result (rows, columns, query, query_id) or None."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT query, query_id, columns, created_at FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            query, query_id, columns, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._delete(conn, key)
+                return None
+            try:
+                with open(self._payload_path(key), "rb") as f:
+                    rows = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                # Evicted by another process between the lookup and the read
+                self._delete(conn, key)
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        return {
+            "rows": rows,
+            "columns": json.loads(columns),
+            "query": query,
+            "query_id": query_id,
+            "created_at": created_at,
+        }
+
+    def put(
+        self,
+        key: str,
+        rows: List[Dict[str, Any]],
+        columns: List[str],
+        query: str,
+        query_id: Optional[str] = None,
+    ) -> None:
+        """
+        Store a result, evicting old entries beyond the size budget.
+
+        Results of queries calling clock, random or sequence functions
+        (CURRENT_TIMESTAMP, RANDOM, UUID_STRING, SEQ4, ...) are not stored:
+        a rerun would return something else.
+        """
+        if not is_deterministic(query):
+            return
+        path = self._payload_path(key)
+        with self._lock:
+            conn = self._connect()
+            # Payload first, atomically, so a visible index row always has a file
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            now = time.time()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                    (key, query, query_id, columns, row_count, size_bytes,
+                     created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    query,
+                    query_id,
+                    json.dumps(list(columns)),
+                    len(rows),
+                    path.stat().st_size,
+                    now,
+                    now,
+                ),
+            )
+            self._evict(conn)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            conn = self._connect()
+            for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+                self._delete(conn, key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the entry count and total payload size."""
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries"
+            ).fetchone()
+        return {"entries": entries, "size_bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _delete(self, conn: sqlite3.Connection, key: str) -> None:
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._payload_path(key).unlink(missing_ok=True)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # IMMEDIATE takes the write lock up front, so two processes evicting
+        # at once do not both pick the same victims
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute(
+                "SELECT key FROM entries WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            ).fetchall()
+            victims = [key for (key,) in expired]
+            (total,) = conn.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM entries"
+            ).fetchone()
+            if total > self.max_bytes:
+                for key, size in conn.execute(
+                    "SELECT key, size_bytes FROM entries ORDER BY last_access"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    victims.append(key)
+                    total -= size
+            for key in dict.fromkeys(victims):
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        for key in dict.fromkeys(victims):
+            self._payload_path(key).unlink(missing_ok=True)
+
+
+_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Return the process-wide query cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache()
+        return _cache
+
+
+def lookup(sql: str) -> Optional[Dict[str, Any]]:
+    """Cached result for a query, if any; cache failures count as misses."""
+    if not QUERY_CACHE_ENABLED:
+        return None
+    try:
+        return get_query_cache().get(cache_key(sql))
+    except Exception as e:
+        logger.warning(f"Query cache lookup failed: {e}")
+        return None
+
+
+def store(
+    sql: str,
+    rows: List[Dict[str, Any]],
+    columns: List[str],
+    query_id: Optional[str] = None,
+) -> None:
+    """Cache a query result; failures never affect the query."""
+    if not QUERY_CACHE_ENABLED:
+        return
+    try:
+        get_query_cache().put(cache_key(sql), rows, columns, sql, query_id)
+    except Exception as e:
+        logger.warning(f"Failed to cache query result: {e}")
@@ -0,0 +1,281 @@
+"""Server-side store for query results referenced by short handle ids.
+
+Tools return a ``result_id`` alongside query rows so later calls (charting,
+transforms, exports) can refer back to a result instead of resending it.
+Rows are held column by column in a ``CompactRows`` container, whose
+measured footprint counts against the memory budget. Entries expire after a
+TTL; when the in-memory budget is exceeded the least recently used results
+are spilled to disk, and the oldest spilled results are dropped once the
+disk budget is exceeded. The Snowflake query id of a dropped result is
+remembered for a while longer so its rows can be read back with RESULT_SCAN.
+
+Each store spills into its own directory under the spill root, removed when
+the process exits; directories left behind by processes that died are swept
+when the next store starts.
+"""
+
+import atexit
+import logging
+import os
+import pickle
+import secrets
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.compact_rows import CompactRows
+from src.config import (
+    CACHE_DIR,
+    RESULT_STORE_MAX_DISK_MB,
+    RESULT_STORE_MAX_MEMORY_MB,
+    RESULT_STORE_TTL_SECONDS,
+    RESULT_SCAN_TTL_SECONDS,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: stale spill directories are swept by age instead
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Query ids remembered for results whose rows were dropped
+MAX_FORGOTTEN = 10000
+
+# Per-store spill directories are named <prefix><pid>_<random>
+SPILL_DIR_PREFIX = "proc_"
+
+
+class ResultStore:
+    """Thread-safe LRU store of query results with TTL and disk spill."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = RESULT_STORE_TTL_SECONDS,
+        max_memory_bytes: int = RESULT_STORE_MAX_MEMORY_MB * 1024 * 1024,
+        max_disk_bytes: int = RESULT_STORE_MAX_DISK_MB * 1024 * 1024,
+        spill_dir: Path = CACHE_DIR / "results",
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.spill_root = Path(spill_dir)
+        self.spill_dir = (
+            self.spill_root / f"{SPILL_DIR_PREFIX}{os.getpid()}_{secrets.token_hex(4)}"
+        )
+        # Held while the spill directory exists, marking it as in use
+        self._spill_lock_file = None
+        self._lock = threading.RLock()
+        # result_id -> entry metadata; entries holding "rows" are in memory
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        # result_id -> query metadata of dropped results that have a query id
+        self._forgotten: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sweep()
+
+    def put(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        columns: List[str],
+        query: Optional[str] = None,
+        query_id: Optional[str] = None,
+        result_id: Optional[str] = None,
+    ) -> str:
+        """Store a result and return its handle id (new unless one is given)."""
+        result_id = result_id or f"res_{secrets.token_hex(4)}"
+        rows = CompactRows.from_rows(rows, columns)
+        size = rows.nbytes()
+        entry = {
+            "result_id": result_id,
+            "rows": rows,
+            "columns": list(columns),
+            "row_count": len(rows),
+            "query": query,
+            "query_id": query_id,
+            "size_bytes": size,
+            "created_at": time.time(),
+            "spill_path": None,
+        }
+        with self._lock:
+            self._expire()
+            if result_id in self._entries:
+                self._remove(result_id, remember=False)
+            self._forgotten.pop(result_id, None)
+            self._entries[result_id] = entry
+            self._memory_bytes += size
+            self._enforce_budgets()
+        return result_id
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a stored result (rows, columns, query metadata) or None.
+
+        Rows come back as a read-only :class:`CompactRows` sequence of row
+        mappings.
+        """
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return None
+            if self._is_expired(entry):
+                self._remove(result_id)
+                return None
+
+            self._entries.move_to_end(result_id)
+            if entry["rows"] is None:
+                self._load(entry)
+                self._enforce_budgets()
+            return {key: value for key, value in entry.items() if key != "spill_path"}
+
+    def delete(self, result_id: str) -> bool:
+        """Drop a stored result. Returns whether it existed."""
+        with self._lock:
+            self._forgotten.pop(result_id, None)
+            if result_id not in self._entries:
+                return False
+            self._remove(result_id, remember=False)
+            return True
+
+    def forgotten(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return query metadata of a dropped result that Snowflake still holds.
+
+        Returns:
+            Dictionary with query_id, query and columns, or None when the
+            result is still stored, was never known, or is past
+            RESULT_SCAN_TTL_SECONDS
+        """
+        with self._lock:
+            self._expire()
+            info = self._forgotten.get(result_id)
+            if info is None:
+                return None
+            if time.time() - info["created_at"] > RESULT_SCAN_TTL_SECONDS:
+                del self._forgotten[result_id]
+                return None
+            return dict(info)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry counts and memory/disk usage."""
+        with self._lock:
+            self._expire()
+            in_memory = sum(1 for e in self._entries.values() if e["rows"] is not None)
+            return {
+                "entries": len(self._entries),
+                "in_memory": in_memory,
+                "spilled": len(self._entries) - in_memory,
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "forgotten": len(self._forgotten),
+            }
+
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def _expire(self) -> None:
+        for result_id in [r for r, e in self._entries.items() if self._is_expired(e)]:
+            self._remove(result_id)
+
+    def _remove(self, result_id: str, remember: bool = True) -> None:
+        entry = self._entries.pop(result_id)
+        if remember and entry["query_id"]:
+            self._forgotten[result_id] = {
+                key: entry[key]
+                for key in ("query_id", "query", "columns", "created_at")
+            }
+            while len(self._forgotten) > MAX_FORGOTTEN:
+                self._forgotten.popitem(last=False)
+        if entry["rows"] is not None:
+            self._memory_bytes -= entry["size_bytes"]
+        if entry["spill_path"] is not None:
+            self._disk_bytes -= entry["disk_bytes"]
+            Path(entry["spill_path"]).unlink(missing_ok=True)
+
+    def _enforce_budgets(self) -> None:
+        # Spill least recently used results until memory fits, but always keep
+        # the most recent one in memory since it is about to be used
+        for result_id in list(self._entries)[:-1]:
+            if self._memory_bytes <= self.max_memory_bytes:
+                break
+            entry = self._entries[result_id]
+            if entry["rows"] is not None:
+                self._spill(entry)
+
+        for result_id in list(self._entries):
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            if self._entries[result_id]["rows"] is None:
+                logger.info(f"Result store over disk budget, dropping {result_id}")
+                self._remove(result_id)
+
+    def _sweep(self) -> None:
+        """Remove spill directories whose process is gone."""
+        try:
+            candidates = list(self.spill_root.glob(f"{SPILL_DIR_PREFIX}*"))
+        except OSError:
+            return
+        for path in candidates:
+            if path.is_dir() and not self._in_use(path):
+                logger.info(f"Removing stale result spill directory {path}")
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _in_use(self, path: Path) -> bool:
+        if fcntl is None:
+            # Every result spilled into a directory untouched for a TTL has expired
+            try:
+                return time.time() - path.stat().st_mtime <= self.ttl_seconds
+            except OSError:
+                return False
+        try:
+            with open(path / ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        return False
+
+    def _open_spill_dir(self) -> None:
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        if fcntl is not None:
+            self._spill_lock_file = open(self.spill_dir / ".lock", "a")
+            fcntl.flock(self._spill_lock_file, fcntl.LOCK_EX)
+        atexit.register(shutil.rmtree, self.spill_dir, ignore_errors=True)
+
+    def _spill(self, entry: Dict[str, Any]) -> None:
+        if not self.spill_dir.is_dir():
+            self._open_spill_dir()
+        path = self.spill_dir / f"{entry['result_id']}.pkl"
+        if entry["spill_path"] is None:
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry["rows"], f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            entry["spill_path"] = str(path)
+            entry["disk_bytes"] = path.stat().st_size
+            self._disk_bytes += entry["disk_bytes"]
+        entry["rows"] = None
+        self._memory_bytes -= entry["size_bytes"]
+
+    def _load(self, entry: Dict[str, Any]) -> None:
+        # Spill files are kept so the entry can be spilled again for free
+        with open(entry["spill_path"], "rb") as f:
+            entry["rows"] = pickle.load(f)
+        self._memory_bytes += entry["size_bytes"]
+
+
+_store: Optional[ResultStore] = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Return the process-wide result store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
@@ -0,0 +1,459 @@
+"""In-memory search index over the views and columns of the configured database.
+
+Agents otherwise spend several list/describe calls before they can write a
+query. The index keeps every view and column (name, type, comment) as a
+document with weighted terms in an inverted index; query words are matched
+to terms through a trigram index over the vocabulary, so misspelled or
+partial words ("reveneu", "categ") still find ``TOTAL_REVENUE`` or
+``PRODUCT_CATEGORY``. Searching never touches Snowflake; the index is
+synced from the database's INFORMATION_SCHEMA (every schema but
+INFORMATION_SCHEMA itself) when it is older than a TTL, re-reading only the
+columns of views whose LAST_ALTERED changed.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src import config, mock_data
+from src.config import SCHEMA_INDEX_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+ViewKey = Tuple[str, str]
+
+# Term weights per field; a whole-name match outranks a matching part
+FIELD_WEIGHTS = {"name": 1.0, "part": 0.8, "type": 0.4, "comment": 0.4, "view": 0.3}
+
+# Query words match vocabulary terms at least this similar
+MIN_TERM_SIMILARITY = 0.3
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def trigrams(term: str) -> Set[str]:
+    """Padded character trigrams of a term."""
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _words(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+class SchemaIndex:
+    """Inverted index of view and column documents with fuzzy term lookup."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        # term -> {doc id: weight}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        # trigram -> terms containing it
+        self._grams: Dict[str, Set[str]] = {}
+        self._view_docs: Dict[ViewKey, List[int]] = {}
+        self._versions: Dict[ViewKey, Any] = {}
+        self.synced_at: Optional[float] = None
+
+    def add_view(
+        self,
+        view: Dict[str, Any],
+        columns: Iterable[Dict[str, Any]],
+        version: Any = None,
+    ) -> None:
+        """
+        Index a view and its columns, replacing any previous version.
+
+        Args:
+            view: Dictionary with schema, name and optional comment
+            columns: Dictionaries with name and optional type and comment
+            version: Catalog version (LAST_ALTERED) used by :meth:`sync`
+        """
+        key = (view["schema"], view["name"])
+        with self._lock:
+            self.remove_view(key)
+            view_doc = {
+                "kind": "view",
+                "schema": key[0],
+                "view": key[1],
+                "comment": view.get("comment"),
+            }
+            ids = [self._add_doc(view_doc, view["name"])]
+            for column in columns:
+                ids.append(
+                    self._add_doc(
+                        {
+                            "kind": "column",
+                            "schema": key[0],
+                            "view": key[1],
+                            "column": column["name"],
+                            "type": column.get("type"),
+                            "comment": column.get("comment"),
+                        },
+                        column["name"],
+                        parent=view["name"],
+                    )
+                )
+            self._view_docs[key] = ids
+            self._versions[key] = version
+
+    def remove_view(self, key: ViewKey) -> None:
+        """Drop a view and its columns from the index."""
+        with self._lock:
+            for doc_id in self._view_docs.pop(key, []):
+                doc = self._docs.pop(doc_id)
+                for term in doc.pop("_terms"):
+                    postings = self._postings[term]
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+                        for gram in trigrams(term):
+                            self._grams[gram].discard(term)
+                            if not self._grams[gram]:
+                                del self._grams[gram]
+            self._versions.pop(key, None)
+
+    def sync(
+        self,
+        views: Dict[ViewKey, Dict[str, Any]],
+        fetch_columns: Callable[[List[ViewKey]], Dict[ViewKey, List[Dict[str, Any]]]],
+        schema: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Bring the index up to date with the catalog.
+
+        Columns are fetched without holding the lock, so searches are not
+        blocked by the catalog round trip; the changed views are swapped in
+        afterwards.
+
+        Args:
+            views: Current views by (schema, name), each with ``version``
+                and ``comment``
+            fetch_columns: Returns the columns of the given views
+            schema: Schema that ``views`` covers; views of other schemas are
+                left alone (default: ``views`` is the whole database)
+
+        Returns:
+            Counts of added, updated and removed views
+        """
+        with self._lock:
+            removed = [
+                key
+                for key in self._view_docs
+                if key not in views and (schema is None or key[0] == schema)
+            ]
+            changed = [
+                key
+                for key, view in views.items()
+                if key not in self._view_docs
+                or self._versions.get(key) != view.get("version")
+            ]
+            added = sum(1 for key in changed if key not in self._view_docs)
+
+        columns = fetch_columns(changed) if changed else {}
+
+        with self._lock:
+            for key in removed:
+                self.remove_view(key)
+            for key in changed:
+                view = views[key]
+                self.add_view(
+                    {"schema": key[0], "name": key[1], "comment": view.get("comment")},
+                    columns.get(key, []),
+                    version=view.get("version"),
+                )
+            if schema is None:
+                self.synced_at = time.time()
+        return {
+            "added": added,
+            "updated": len(changed) - added,
+            "removed": len(removed),
+        }
+
+    def search(
+        self, text: str, limit: int = 10, kind: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank views and columns matching free text.
+
+        Args:
+            text: Search words, e.g. "revenue by category"
+            limit: Maximum number of matches
+            kind: Restrict to "view" or "column"
+
+        Returns:
+            Matching documents with a relevance ``score``, best first
+        """
+        scores: Dict[int, float] = {}
+        with self._lock:
+            for word in _words(text):
+                best: Dict[int, float] = {}
+                for term, similarity in self._similar_terms(word):
+                    for doc_id, weight in self._postings[term].items():
+                        score = similarity * weight
+                        if score > best.get(doc_id, 0.0):
+                            best[doc_id] = score
+                for doc_id, score in best.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+            ranked = sorted(scores.items(), key=lambda item: -item[1])
+            matches = []
+            for doc_id, score in ranked:
+                doc = self._docs[doc_id]
+                if kind is not None and doc["kind"] != kind:
+                    continue
+                match = {
+                    k: v for k, v in doc.items() if k != "_terms" and v is not None
+                }
+                match["score"] = round(score, 3)
+                matches.append(match)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            columns = sum(1 for doc in self._docs.values() if doc["kind"] == "column")
+            return {
+                "views": len(self._view_docs),
+                "columns": columns,
+                "terms": len(self._postings),
+                "synced_at": self.synced_at,
+            }
+
+    def _add_doc(
+        self, doc: Dict[str, Any], name: str, parent: Optional[str] = None
+    ) -> int:
+        terms: Dict[str, float] = {}
+
+        def add(term: str, field: str) -> None:
+            terms[term] = max(terms.get(term, 0.0), FIELD_WEIGHTS[field])
+
+        add(name.lower(), "name")
+        for part in _words(name.replace("_", " ")):
+            add(part, "part")
+        for word in _words(parent.replace("_", " ") if parent else None):
+            add(word, "view")
+        for word in _words(re.sub(r"\(.*", "", doc.get("type") or "")):
+            add(word, "type")
+        for word in _words(doc.get("comment")):
+            add(word, "comment")
+
+        doc_id = self._next_id
+        self._next_id += 1
+        doc["_terms"] = list(terms)
+        self._docs[doc_id] = doc
+        for term, weight in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                for gram in trigrams(term):
+                    self._grams.setdefault(gram, set()).add(term)
+            self._postings[term][doc_id] = weight
+        return doc_id
+
+    def _similar_terms(self, word: str) -> List[Tuple[str, float]]:
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for term in self._grams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        similar = []
+        for term, count in shared.items():
+            if term == word:
+                similarity = 1.0
+            else:
+                # Jaccard similarity of the trigram sets; prefixes of a term
+                # (typing in progress) count as close matches
+                similarity = count / (len(grams) + len(trigrams(term)) - count)
+                if term.startswith(word):
+                    similarity = max(similarity, 0.9 * len(word) / len(term) + 0.1)
+            if similarity >= MIN_TERM_SIMILARITY:
+                similar.append((term, similarity))
+        return similar
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _schema_filter(schema: Optional[str]) -> str:
+    if schema is None:
+        return "TABLE_SCHEMA <> 'INFORMATION_SCHEMA'"
+    return f"TABLE_SCHEMA = {_quote(schema)}"
+
+
+def fetch_catalog_views(
+    cursor: Any, schema: Optional[str] = None
+) -> Dict[ViewKey, Dict[str, Any]]:
+    """
+    Views from INFORMATION_SCHEMA.VIEWS, keyed by (schema, name).
+
+    Args:
+        cursor: DictCursor on the database to read
+        schema: Schema to read (default: every schema of the database)
+    """
+    cursor.execute(
+        "SELECT TABLE_SCHEMA, TABLE_NAME, COMMENT, CREATED, LAST_ALTERED "
+        f"FROM INFORMATION_SCHEMA.VIEWS WHERE {_schema_filter(schema)}"
+    )
+    return {
+        (row["TABLE_SCHEMA"], row["TABLE_NAME"]): {
+            "comment": row.get("COMMENT"),
+            "created": row.get("CREATED"),
+            "version": row.get("LAST_ALTERED"),
+        }
+        for row in cursor.fetchall()
+    }
+
+
+def fetch_catalog_columns(
+    cursor: Any,
+    schema: Optional[str] = None,
+    view_names: Optional[Iterable[str]] = None,
+    keys: Optional[Iterable[ViewKey]] = None,
+) -> Dict[ViewKey, List[Dict[str, Any]]]:
+    """
+    Columns of views from INFORMATION_SCHEMA.COLUMNS, in order.
+
+    Args:
+        cursor: DictCursor on the database to read
+        schema: Schema to read (default: every schema of the database)
+        view_names: Restrict to these views of ``schema``
+        keys: Restrict to these (schema, name) views, across schemas
+    """
+    conditions = [_schema_filter(schema)]
+    if view_names is not None:
+        conditions.append(f"TABLE_NAME IN ({', '.join(_quote(n) for n in view_names)})")
+    if keys is not None:
+        by_schema: Dict[str, List[str]] = {}
+        for view_schema, name in keys:
+            by_schema.setdefault(view_schema, []).append(name)
+        conditions.append(
+            "("
+            + " OR ".join(
+                f"(TABLE_SCHEMA = {_quote(view_schema)} "
+                f"AND TABLE_NAME IN ({', '.join(_quote(n) for n in names)}))"
+                for view_schema, names in by_schema.items()
+            )
+            + ")"
+        )
+    cursor.execute(
+        "SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, "
+        "COLUMN_DEFAULT, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, "
+        f"COMMENT FROM INFORMATION_SCHEMA.COLUMNS WHERE {' AND '.join(conditions)} "
+        "ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION"
+    )
+
+    columns: Dict[ViewKey, List[Dict[str, Any]]] = {}
+    for row in cursor.fetchall():
+        data_type = row["DATA_TYPE"]
+        if row.get("CHARACTER_MAXIMUM_LENGTH") is not None:
+            data_type = f"{data_type}({row['CHARACTER_MAXIMUM_LENGTH']})"
+        elif data_type == "NUMBER" and row.get("NUMERIC_PRECISION") is not None:
+            precision, scale = row["NUMERIC_PRECISION"], row.get("NUMERIC_SCALE") or 0
+            data_type = f"NUMBER({precision},{scale})"
+        columns.setdefault((row["TABLE_SCHEMA"], row["TABLE_NAME"]), []).append(
+            {
+                "name": row["COLUMN_NAME"],
+                "type": data_type,
+                "null": row.get("IS_NULLABLE") == "YES",
+                "default": row.get("COLUMN_DEFAULT"),
+                "comment": row.get("COMMENT"),
+            }
+        )
+    return columns
+
+
+def _mock_catalog() -> Tuple[
+    Dict[ViewKey, Dict[str, Any]], Dict[ViewKey, List[Dict[str, Any]]]
+]:
+    views = {
+        (v["schema"], v["name"]): {"comment": None, "version": v["created_on"]}
+        for v in mock_data.LIST_VIEWS_RESPONSE["data"]["views"]
+    }
+    described = mock_data.DESCRIBE_DAILY_SALES["data"]
+    schema = mock_data.LIST_VIEWS_RESPONSE["data"]["schema"]
+    return views, {(schema, described["view"]): described["columns"]}
+
+
+_index = SchemaIndex()
+
+
+def get_schema_index() -> SchemaIndex:
+    """Return the process-wide schema index."""
+    return _index
+
+
+def refresh_schema_index(force: bool = False) -> Dict[str, int]:
+    """Sync the schema index from the catalog if it is older than the TTL."""
+    index = get_schema_index()
+    if (
+        not force
+        and index.synced_at is not None
+        and time.time() - index.synced_at < SCHEMA_INDEX_TTL_SECONDS
+    ):
+        return {"added": 0, "updated": 0, "removed": 0}
+
+    if config.MOCK_MODE:
+        views, columns = _mock_catalog()
+        return index.sync(views, lambda keys: columns)
+
+    from snowflake.connector import DictCursor
+
+    from src.tools.snowflake_tools import get_snowflake_connection
+
+    conn = get_snowflake_connection("metadata", "metadata")
+    try:
+        cursor = conn.cursor(DictCursor)
+        try:
+            views = fetch_catalog_views(cursor)
+            changes = index.sync(
+                views, lambda keys: fetch_catalog_columns(cursor, keys=keys)
+            )
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+    if any(changes.values()):
+        logger.info(f"Schema index synced: {changes}")
+    return changes
+
+
+def search_schema(
+    query: str, limit: int = 10, kind: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Search views and columns of the configured database by name, type and comment.
+
+    Args:
+        query: Search words
+        limit: Maximum number of matches (1-100)
+        kind: Restrict to "view" or "column"
+
+    Returns:
+        Dictionary with success status and ranked matches
+    """
+    if not query or not query.strip():
+        return {"success": False, "error": "Search query cannot be empty"}
+    if kind is not None and kind not in ("view", "column"):
+        return {"success": False, "error": "kind must be 'view' or 'column'"}
+
+    try:
+        refresh_schema_index()
+    except Exception as e:
+        # A stale index is still useful; only fail when there is nothing to search
+        logger.error(f"Error syncing schema index: {e}")
+        if get_schema_index().synced_at is None:
+            return {
+                "success": False,
+                "error": f"Failed to read schema catalog: {str(e)}",
+            }
+
+    index = get_schema_index()
+    matches = index.search(query, min(max(1, limit), 100), kind)
+    return {
+        "success": True,
+        "data": {"matches": matches, "count": len(matches), "index": index.stats()},
+    }
@@ -0,0 +1,173 @@
+"""Fast, typed JSON encoding of Snowflake values for tool responses.
+
+Rows from ``DictCursor`` hold ``Decimal``, ``datetime``, ``date``, ``time``
+and binary values. Every tool response goes through :func:`json_response`,
+which encodes them the same way everywhere:
+
+- ``Decimal``: a JSON number (an integer when the column scale is 0)
+- ``datetime`` / ``date`` / ``time``: ISO 8601 strings
+- binary: hex strings, Snowflake's default BINARY output format
+- stored result rows (``CompactRows``, ``RowView``): lists of objects
+- anything else unknown: ``str(value)``
+
+Encoding uses orjson (types are dispatched in C), falling back to the
+standard library encoder with the same conversions for integers beyond 64
+bits. ``python -m src.serialization`` benchmarks it against the generic
+``default=str`` path.
+"""
+
+import argparse
+import functools
+import json
+import logging
+import time
+import uuid
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+
+import orjson
+from mcp.types import TextContent
+
+try:
+    from fastmcp.tools import ToolResult
+except ImportError:  # fastmcp 2.x
+    from fastmcp.tools.tool import ToolResult
+
+from src.compact_rows import CompactRows
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _default(value: Any) -> Any:
+    """Convert a value the encoder has no native support for."""
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            return None
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, CompactRows):
+        return value.to_dicts()
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset, Sequence)):
+        return list(value)
+    return str(value)
+
+
+def _encode(value: Any) -> Tuple[bytes, Callable[[bytes], Any]]:
+    """Encode a value; also returns the decoder that reads it back exactly."""
+    try:
+        encoded = orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return encoded, orjson.loads
+    except TypeError:
+        # orjson only handles 64-bit integers (and decodes larger ones as
+        # floats); NUMBER(38,0) values go beyond, so use the exact stdlib codec
+        encoded = json.dumps(
+            value, default=_default, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+        return encoded, json.loads
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON."""
+    return _encode(value)[0]
+
+
+def json_response(tool: F) -> F:
+    """
+    Decorate a tool so its response is encoded once, by :func:`dumps`.
+
+    The encoded JSON becomes the text content of the tool result and,
+    decoded, its structured content, so FastMCP passes the result through
+    instead of serializing the response again.
+    """
+
+    @functools.wraps(tool)
+    def wrapper(*args: Any, **kwargs: Any) -> ToolResult:
+        response = tool(*args, **kwargs)
+        try:
+            encoded, decode = _encode(response)
+        except Exception as e:
+            logger.error(f"Could not encode response of {tool.__name__}: {e}")
+            encoded, decode = _encode(
+                {"success": False, "error": f"Failed to encode response: {str(e)}"}
+            )
+        return ToolResult(
+            content=[TextContent(type="text", text=encoded.decode("utf-8"))],
+            structured_content=decode(encoded),
+        )
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _sample_rows(n_rows: int) -> List[Dict[str, Any]]:
+    """Rows shaped like a typical Snowflake result, 10 cells each."""
+    tz = timezone(timedelta(hours=-7))
+    start = datetime(2025, 7, 1, 11, 53, 42, 699000, tzinfo=tz)
+    return [
+        {
+            "ID": i,
+            "TRANSACTION_DATE": date(2025, 1, 1) + timedelta(days=i % 365),
+            "CREATED_ON": start + timedelta(seconds=i),
+            "PRODUCT_CATEGORY": ("Electronics", "Garden", "Food", "Home")[i % 4],
+            "PRODUCT_NAME": f"Product {i % 1000}",
+            "TOTAL_REVENUE": Decimal(i * 37 % 100000) / 100,
+            "TOTAL_QUANTITY_SOLD": Decimal(i % 500),
+            "DISCOUNT": (i % 7) / 10,
+            "ROW_HASH": uuid.UUID(int=i).bytes,
+            "NOTE": None if i % 3 else "promo",
+        }
+        for i in range(n_rows)
+    ]
+
+
+def benchmark(n_cells: int = 100_000, repeat: int = 5) -> Dict[str, Any]:
+    """
+    Time the generic ``json.dumps(default=str)`` path against :func:`dumps`.
+
+    Args:
+        n_cells: Result size in cells (10 per row)
+        repeat: Timed runs per encoder; the fastest is reported
+
+    Returns:
+        Best time in milliseconds per encoder and the speedup
+    """
+    rows = _sample_rows(max(1, n_cells // 10))
+    encoders = {
+        "json_default_str": lambda: json.dumps(rows, default=str).encode("utf-8"),
+        "serializer": lambda: dumps(rows),
+    }
+    timings = {}
+    for name, encode in encoders.items():
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            encode()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = round(best * 1000, 2)
+    return {
+        "cells": len(rows) * 10,
+        "ms": timings,
+        "speedup": round(timings["json_default_str"] / timings["serializer"], 1),
+        "sample": json.loads(dumps(rows[1])),
+    }
+
+
+def main() -> None:
+    """Print the serializer benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--cells", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.cells, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
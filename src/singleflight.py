@@ -0,0 +1,66 @@
+"""Single-flight de-duplication of identical concurrent calls.
+
+When several callers ask for the same key at the same time, only the first
+runs the work; the others block until it finishes and receive the same
+result (or exception). Once a call completes its key is forgotten, so later
+callers run the work again: this coalesces bursts, it is not a cache.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one in-flight call per key at a time."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` unless a call for ``key`` is already in flight.
+
+        Args:
+            key: Identity of the work, e.g. a query cache key
+            fn: Zero-argument callable doing the work
+
+        Returns:
+            Tuple of the result and whether it was shared from another caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently executing."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,288 @@
+"""Text-level SQL helpers shared by the Snowflake tools.
+
+These work on the query text with string literals masked out, which is enough
+for the simple single-statement SELECTs agents send against GOLD views. They
+never need to be a full SQL parser: anything they do not recognise is left
+untouched.
+"""
+
+import hashlib
+import math
+import re
+from typing import Any, Dict, List, Tuple
+
+# Single-quoted strings and $$-delimited string bodies
+_LITERAL = re.compile(r"\$\$.*?\$\$|'(?:[^']|'')*'", re.DOTALL)
+_PLACEHOLDER = re.compile(r"\x00(\d+)\x00")
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_NUMBER = re.compile(r"(?<![\w$.])[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_QUOTED_IDENTIFIER = re.compile(r'("(?:[^"]|"")*")')
+# A VARIANT path such as v:customerId.address[0] (case-sensitive), or a word
+# and the parenthesis that makes it a function call
+_PATH_OR_WORD = re.compile(
+    r"(?<!:):(?!:)[\w$]+(?:\.[\w$]+|\[[^\]]*\])*|\b([A-Za-z_]\w*)(\s*\()?"
+)
+
+# Keywords upper-cased by canonicalize_sql (as are function names);
+# identifiers keep their spelling
+KEYWORDS = frozenset(
+    """
+    ALL AND ANY AS ASC BETWEEN BY CASE CAST CROSS DESC DISTINCT ELSE END EXCEPT
+    EXISTS FALSE FETCH FIRST FROM FULL GROUP HAVING ILIKE IN INNER INTERSECT IS
+    JOIN LAST LATERAL LEFT LIKE LIMIT MINUS NATURAL NEXT NOT NULL NULLS OFFSET
+    ON ONLY OR ORDER OUTER OVER PARTITION QUALIFY RECURSIVE RIGHT RLIKE ROW ROWS
+    SAMPLE SELECT SOME TABLESAMPLE THEN TOP TRUE UNION USING WHEN WHERE WITH
+    """.split()
+)
+
+# Clause keywords that end a FROM clause's table reference
+_CLAUSE_END = (
+    "WHERE|GROUP|ORDER|LIMIT|HAVING|QUALIFY|UNION|INTERSECT|EXCEPT|MINUS|"
+    "JOIN|INNER|LEFT|RIGHT|FULL|CROSS|NATURAL|SAMPLE|TABLESAMPLE|OFFSET|FETCH"
+)
+_FROM_TABLE = re.compile(
+    r"\bFROM\s+([A-Za-z_\"][\w$.\"]*)"
+    rf"(\s+(?:AS\s+)?(?!(?:{_CLAUSE_END})\b)[A-Za-z_]\w*)?",
+    re.IGNORECASE,
+)
+_AGGREGATE = re.compile(
+    r"\b(COUNT|SUM|AVG|MIN|MAX|MEDIAN|PERCENTILE_CONT|PERCENTILE_DISC|"
+    r"APPROX_\w+)\s*\(|\bGROUP\s+BY\b",
+    re.IGNORECASE,
+)
+
+# Argument with at most one level of nested parentheses, e.g. COALESCE(a, b)
+_ARG = r"((?:[^()]|\([^()]*\))+?)"
+_COUNT_DISTINCT = re.compile(rf"\bCOUNT\s*\(\s*DISTINCT\s+{_ARG}\s*\)", re.IGNORECASE)
+_MEDIAN = re.compile(rf"\bMEDIAN\s*\(\s*{_ARG}\s*\)", re.IGNORECASE)
+_PERCENTILE = re.compile(
+    rf"\bPERCENTILE_(?:CONT|DISC)\s*\(\s*([\d.]+)\s*\)\s*WITHIN\s+GROUP\s*"
+    rf"\(\s*ORDER\s+BY\s+{_ARG}\s*\)",
+    re.IGNORECASE,
+)
+_SCALABLE = re.compile(rf"\b(COUNT|SUM)\s*\(\s*{_ARG}\s*\)", re.IGNORECASE)
+# Statements whose effect outlives the query on a pooled session
+_SESSION_STATEMENT = re.compile(r"^\s*(?:USE|ALTER\s+SESSION)\b", re.IGNORECASE)
+
+# Functions whose value changes between executions of the same text
+_NONDETERMINISTIC = re.compile(
+    r"\b(?:CURRENT_(?:TIMESTAMP|DATE|TIME)|LOCALTIMESTAMP|LOCALTIME|SYSDATE|"
+    r"SYSTIMESTAMP|GETDATE|RANDOM|RANDSTR|UUID_STRING|SEQ[1248])\b",
+    re.IGNORECASE,
+)
+
+# Documented accuracy of Snowflake's approximate aggregate functions
+APPROX_ERROR_BOUNDS = {
+    "APPROX_COUNT_DISTINCT": "about 1.6% average relative error (HyperLogLog)",
+    "APPROX_PERCENTILE": "small rank error from a t-digest sketch; exact for small groups",
+}
+
+
+def mask_literals(sql: str) -> Tuple[str, List[str]]:
+    """Replace quoted string literals with placeholders so regexes skip them."""
+    literals: List[str] = []
+
+    def _stash(match: "re.Match[str]") -> str:
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+
+    return _LITERAL.sub(_stash, sql), literals
+
+
+def unmask_literals(sql: str, literals: List[str]) -> str:
+    """Restore literals removed by :func:`mask_literals`."""
+    return _PLACEHOLDER.sub(lambda m: literals[int(m.group(1))], sql)
+
+
+def normalize_sql(sql: str) -> str:
+    """Strip literals, numbers and comments so queries of one shape compare equal."""
+    masked, _ = mask_literals(sql)
+    text = _COMMENT.sub(" ", masked)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _VALUE_LIST.sub("(?)", text)
+    text = re.sub(r"\s*([=<>!,(])\s*", r"\1", text)
+    text = re.sub(r"\s+\)", ")", text)
+    text = re.sub(r"\s+", " ", text).strip().rstrip(";").strip()
+    return text.upper()
+
+
+def canonicalize_sql(sql: str) -> str:
+    """
+    Collapse formatting so equivalent query text is byte-identical.
+
+    Comments are dropped, whitespace runs become one space, the trailing
+    semicolon is removed and SQL keywords and function names are
+    upper-cased. String literals, ``$$`` bodies, quoted identifiers, VARIANT
+    paths (``v:customerId``) and all other words keep their spelling, so the
+    result is still the same query and can be executed in place of the
+    original.
+    """
+    masked, literals = mask_literals(sql)
+    text = _COMMENT.sub(" ", masked)
+    text = re.sub(r"\s+", " ", text).strip().rstrip(";").strip()
+
+    def _keyword(match: "re.Match[str]") -> str:
+        word, call = match.group(1), match.group(2)
+        if word is None:
+            return match.group(0)
+        if call or word.upper() in KEYWORDS:
+            return word.upper() + (call or "")
+        return word
+
+    parts = _QUOTED_IDENTIFIER.split(text)
+    text = "".join(
+        p if i % 2 else _PATH_OR_WORD.sub(_keyword, p) for i, p in enumerate(parts)
+    )
+    return unmask_literals(text, literals)
+
+
+def fingerprint(sql: str) -> str:
+    """Return a short stable hash of a query's literal-stripped shape."""
+    return hashlib.sha1(normalize_sql(sql).encode("utf-8")).hexdigest()[:16]
+
+
+def _single_table_source(masked: str) -> "re.Match[str] | None":
+    """Return the FROM match when the query reads exactly one table or view."""
+    upper = masked.upper()
+    if upper.lstrip().startswith("WITH") or re.search(
+        r"\b(JOIN|UNION|INTERSECT|EXCEPT|MINUS|SAMPLE|TABLESAMPLE)\b", upper
+    ):
+        return None
+    if len(re.findall(r"\bFROM\b", upper)) != 1:
+        return None
+    match = _FROM_TABLE.search(masked)
+    if match is None:
+        return None
+    # A comma right after the table reference means an implicit join
+    rest = masked[match.end():].lstrip()
+    return None if rest.startswith(",") else match
+
+
+def is_single_source_aggregate(sql: str) -> bool:
+    """Whether a query aggregates over exactly one table or view."""
+    masked, _ = mask_literals(sql)
+    return _single_table_source(masked) is not None and bool(_AGGREGATE.search(masked))
+
+
+def changes_session(sql: str) -> bool:
+    """Whether a statement changes session state (USE, ALTER SESSION)."""
+    return _SESSION_STATEMENT.match(_COMMENT.sub(" ", sql)) is not None
+
+
+def is_deterministic(sql: str) -> bool:
+    """Whether a query is free of clock, random and sequence functions."""
+    masked, _ = mask_literals(sql)
+    masked = _QUOTED_IDENTIFIER.sub('""', masked)
+    return _NONDETERMINISTIC.search(masked) is None
+
+
+def resolve_identifier(name: str) -> str:
+    """
+    The name Snowflake stores for an identifier as written.
+
+    Unquoted identifiers resolve upper-cased; quoted ones keep their case,
+    with doubled quotes unescaped.
+    """
+    name = name.strip()
+    if len(name) >= 2 and name.startswith('"') and name.endswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name.upper()
+
+
+_TAIL = re.compile(
+    r"^(?P<core>.*?)(?P<tail>(?:\s+ORDER\s+BY\s+[^()]*?)?"
+    r"(?:\s+LIMIT\s+[^\s()]+(?:\s+OFFSET\s+[^\s()]+)?)?)\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def split_tail(sql: str) -> Tuple[str, str]:
+    """Split a query into its core and a trailing ORDER BY / LIMIT clause."""
+    masked, literals = mask_literals(sql.strip().rstrip(";"))
+    match = _TAIL.match(masked)
+    core, tail = match.group("core"), match.group("tail")
+    return unmask_literals(core, literals), unmask_literals(tail, literals).strip()
+
+
+def has_limit(sql: str) -> bool:
+    """Whether the outer query ends in a LIMIT (not one in a subquery or literal)."""
+    return re.search(r"\bLIMIT\b", split_tail(sql)[1], re.IGNORECASE) is not None
+
+
+def sampling_error(fraction: float, sampled_rows: int, z: float = 1.96) -> float:
+    """Relative error (95% by default) of a scaled COUNT/SUM from sampled rows."""
+    return z * math.sqrt((1 - fraction) / sampled_rows)
+
+
+def rewrite_approximate(sql: str, sample_percent: float) -> Dict[str, Any]:
+    """
+    Rewrite an aggregate query to use Snowflake's approximate features.
+
+    Exact distinct counts and percentiles become APPROX_COUNT_DISTINCT and
+    APPROX_PERCENTILE. Aggregate queries over a single table or view are
+    also sampled with ``SAMPLE (p)``, with COUNT and SUM scaled back up by
+    100/p so totals stay comparable to the exact answer.
+
+    Args:
+        sql: Query text
+        sample_percent: Row sampling percentage (0-100]; 100 disables sampling
+
+    Returns:
+        Dictionary with the rewritten ``query`` and an ``approximation``
+        report (sampling fraction, functions used, error bounds)
+    """
+    masked, literals = mask_literals(sql.strip().rstrip(";"))
+    functions: List[str] = []
+
+    rewritten = _COUNT_DISTINCT.sub(r"APPROX_COUNT_DISTINCT(\1)", masked)
+    if rewritten != masked:
+        functions.append("APPROX_COUNT_DISTINCT")
+    percentiles = _MEDIAN.sub(r"APPROX_PERCENTILE(\1, 0.5)", rewritten)
+    percentiles = _PERCENTILE.sub(r"APPROX_PERCENTILE(\2, \1)", percentiles)
+    if percentiles != rewritten:
+        functions.append("APPROX_PERCENTILE")
+    rewritten = percentiles
+
+    notes: List[str] = []
+    fraction = 1.0
+    source = _single_table_source(rewritten)
+    is_aggregate = _AGGREGATE.search(rewritten) is not None
+    if 0 < sample_percent < 100 and source is not None and is_aggregate:
+        fraction = sample_percent / 100
+        scale = round(100 / sample_percent, 6)
+        head, tail = rewritten[: source.end()], rewritten[source.end():]
+        head = _SCALABLE.sub(lambda m: f"({m.group(0)} * {scale})", head)
+        rewritten = f"{head} SAMPLE ({sample_percent:g}){tail}"
+        notes.append(
+            f"COUNT and SUM are scaled by {scale:g} to estimate full-table totals"
+        )
+        if re.search(r"\bHAVING\b", tail, re.IGNORECASE):
+            notes.append("HAVING conditions are evaluated on unscaled sampled values")
+        if "APPROX_COUNT_DISTINCT" in functions:
+            notes.append("Distinct counts over a sample underestimate the full table")
+    elif sample_percent < 100:
+        notes.append("Query not sampled: only single-source aggregate queries are")
+
+    error_bounds = {name: APPROX_ERROR_BOUNDS[name] for name in functions}
+    if fraction < 1:
+        error_bounds["sampling"] = (
+            "95% relative error of a scaled COUNT/SUM is about "
+            "1.96*sqrt((1-f)/n) for n sampled rows in a group "
+            f"(±{sampling_error(fraction, 100):.0%} at n=100, "
+            f"±{sampling_error(fraction, 1000):.1%} at n=1000)"
+        )
+
+    return {
+        "query": unmask_literals(rewritten, literals),
+        "approximation": {
+            "applied": bool(functions) or fraction < 1,
+            "sampled": fraction < 1,
+            "sample_percent": sample_percent if fraction < 1 else 100.0,
+            "sampling_fraction": fraction,
+            "approx_functions": functions,
+            "error_bounds": error_bounds,
+            "notes": notes,
+        },
+    }
@@ -0,0 +1,168 @@
+"""Compact per-column summaries of query results.
+
+Used to shape large tool responses: instead of every row, the agent gets
+min/max/mean/null count and a distinct-count estimate for each column plus a
+few sample rows, with the full result kept behind its result_id.
+"""
+
+import heapq
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from src.compact_rows import CompactRows
+from src.config import RESPONSE_MAX_BYTES, RESPONSE_MAX_ROWS, RESPONSE_SAMPLE_ROWS
+from src.serialization import dumps
+
+# Size of the KMV sketch; distinct counts below this are exact
+DISTINCT_SKETCH_SIZE = 256
+_MASK64 = (1 << 64) - 1
+
+# Rows serialized when estimating the JSON size of a result
+SIZE_SAMPLE_ROWS = 50
+
+
+def _mix64(value: int) -> int:
+    """splitmix64 finalizer: spreads Python hashes (ints hash to themselves)."""
+    value &= _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class DistinctSketch:
+    """KMV sketch estimating the number of distinct values added to it."""
+
+    def __init__(self, k: int = DISTINCT_SKETCH_SIZE):
+        self.k = k
+        # Max-heap (negated) of the k smallest hashes seen so far
+        self._heap: List[int] = []
+        self._members = set()
+
+    def add(self, value: Any) -> None:
+        h = _mix64(hash(value))
+        if h in self._members:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            self._members.discard(-heapq.heapreplace(self._heap, -h))
+            self._members.add(h)
+
+    def estimate(self) -> int:
+        if len(self._heap) < self.k:
+            return len(self._heap)
+        kth_smallest = -self._heap[0] / _MASK64
+        return int((self.k - 1) / kth_smallest)
+
+
+def estimate_distinct(values: Iterable[Any], k: int = DISTINCT_SKETCH_SIZE) -> int:
+    """Estimate the number of distinct non-null values with a KMV sketch."""
+    sketch = DistinctSketch(k)
+    for value in values:
+        if value is not None:
+            sketch.add(value)
+    return sketch.estimate()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def summarize_column(values: Iterable[Any]) -> Dict[str, Any]:
+    """Compute null count, min, max, mean and distinct estimate in one pass."""
+    sketch = DistinctSketch()
+    count = nulls = 0
+    low = high = None
+    comparable = numeric = True
+    total = 0.0
+    for value in values:
+        count += 1
+        if value is None:
+            nulls += 1
+            continue
+        sketch.add(value)
+        if comparable:
+            try:
+                if low is None or value < low:
+                    low = value
+                if high is None or value > high:
+                    high = value
+            except TypeError:
+                # Mixed, non-comparable types: leave the range empty
+                comparable = False
+        if numeric:
+            if _is_number(value):
+                total += float(value)
+            else:
+                numeric = False
+
+    present = count - nulls
+    return {
+        "null_count": nulls,
+        "distinct_estimate": sketch.estimate(),
+        "min": low if comparable else None,
+        "max": high if comparable else None,
+        "mean": total / present if numeric and present else None,
+    }
+
+
+def summarize_rows(
+    rows: Sequence[Dict[str, Any]], columns: Sequence[str]
+) -> Dict[str, Dict[str, Any]]:
+    """Summarize every column of a result, one pass over each column."""
+    if isinstance(rows, CompactRows):
+        return {column: summarize_column(rows.column(column)) for column in columns}
+    return {
+        column: summarize_column(row.get(column) for row in rows) for column in columns
+    }
+
+
+def estimate_json_bytes(rows: Sequence[Dict[str, Any]]) -> int:
+    """Estimate the serialized size of rows from a sample, without encoding all."""
+    if not rows:
+        return 2
+    sample = rows[:SIZE_SAMPLE_ROWS]
+    sample_bytes = len(dumps(list(sample)))
+    return sample_bytes * len(rows) // len(sample)
+
+
+def shape_result_data(
+    data: Dict[str, Any],
+    summarize: Optional[bool] = None,
+    all_rows: Optional[Sequence[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Replace the rows of a query result with a summary when it is too large.
+
+    Args:
+        data: Query result ``data`` (rows, columns, row_count, result_id, ...)
+        summarize: True to always summarize, False to never, None to
+            summarize only past RESPONSE_MAX_ROWS or RESPONSE_MAX_BYTES
+        all_rows: The full result when ``data["rows"]`` is only its first
+            page; the summary describes these rows
+
+    Returns:
+        The data unchanged, or a copy with ``summary`` and ``sample_rows``
+        in place of ``rows``
+    """
+    rows = data["rows"]
+    if summarize is None:
+        summarize = (
+            len(rows) > RESPONSE_MAX_ROWS
+            or estimate_json_bytes(rows) > RESPONSE_MAX_BYTES
+        )
+    if not summarize:
+        return data
+
+    shaped = {key: value for key, value in data.items() if key != "rows"}
+    shaped["summarized"] = True
+    shaped["summary"] = summarize_rows(
+        rows if all_rows is None else all_rows, data["columns"]
+    )
+    shaped["sample_rows"] = list(rows[:RESPONSE_SAMPLE_ROWS])
+    shaped["note"] = (
+        "Result summarized to save space; pass result_id to result_fetch, "
+        "result_transform or create_chart to use the full rows."
+    )
+    return shaped
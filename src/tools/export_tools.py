@@ -0,0 +1,268 @@
+"""Bulk export of full query results to local files.
+
+Rows are streamed from the cursor in batches and written as they arrive, so
+memory stays constant no matter how large the result is and nothing passes
+through the agent's context.
+"""
+
+import csv
+import functools
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import snowflake.connector
+
+from src import config
+from src.config import EXPORT_BATCH_SIZE, EXPORTS_DIR
+from src.pool import choose_profile, choose_route
+from src.sql_utils import changes_session
+from src.tools import snowflake_tools
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"csv": "csv", "ndjson": "ndjson", "parquet": "parquet"}
+
+
+def _export_path(file_name: Optional[str], export_format: str) -> Path:
+    """Build the output path, keeping user-supplied names inside EXPORTS_DIR."""
+    EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    extension = EXPORT_FORMATS[export_format]
+    if file_name:
+        stem = re.sub(r"[^A-Za-z0-9_.-]", "_", Path(file_name).name)
+        stem = stem[: -len(extension) - 1] if stem.endswith(f".{extension}") else stem
+    else:
+        stem = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return EXPORTS_DIR / f"{stem}.{extension}"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return str(value)
+
+
+def _write_csv(path: Path, columns: List[str], batches: Iterator[Sequence[tuple]]) -> int:
+    rows_written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            rows_written += len(batch)
+    return rows_written
+
+
+def _write_ndjson(
+    path: Path, columns: List[str], batches: Iterator[Sequence[tuple]]
+) -> int:
+    rows_written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for batch in batches:
+            f.writelines(
+                json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+                for row in batch
+            )
+            rows_written += len(batch)
+    return rows_written
+
+
+def arrow_schema(description: Sequence[Sequence[Any]]) -> Any:
+    """
+    Build the Parquet schema from Snowflake column metadata.
+
+    Types come from ``cursor.description`` (name, type_code, ..., precision,
+    scale), so every batch is written with the same schema regardless of
+    which values it happens to contain.
+    """
+    import pyarrow as pa
+    from snowflake.connector.constants import FIELD_ID_TO_NAME
+
+    simple = {
+        "REAL": pa.float64(),
+        "DATE": pa.date32(),
+        "TIME": pa.time64("us"),
+        "TIMESTAMP": pa.timestamp("us"),
+        "TIMESTAMP_NTZ": pa.timestamp("us"),
+        "TIMESTAMP_LTZ": pa.timestamp("us", tz="UTC"),
+        "TIMESTAMP_TZ": pa.timestamp("us", tz="UTC"),
+        "BOOLEAN": pa.bool_(),
+        "BINARY": pa.binary(),
+        "VECTOR": pa.list_(pa.float64()),
+    }
+    fields = []
+    for name, type_code, _, _, precision, scale, *_ in description:
+        type_name = FIELD_ID_TO_NAME.get(type_code)
+        if type_name == "FIXED":
+            precision = precision or 38
+            if scale or precision > 18:
+                arrow_type = pa.decimal128(precision, scale or 0)
+            else:
+                arrow_type = pa.int64()
+        else:
+            # TEXT, and VARIANT/OBJECT/ARRAY/GEOGRAPHY, which arrive as JSON text
+            arrow_type = simple.get(type_name, pa.string())
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _write_parquet(
+    path: Path,
+    columns: List[str],
+    batches: Iterator[Sequence[tuple]],
+    schema: Any = None,
+) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows_written = 0
+    writer = None
+    try:
+        for batch in batches:
+            if schema is None:
+                # Without column metadata (mock data) the first batch decides
+                table = pa.Table.from_arrays(
+                    [pa.array([row[i] for row in batch]) for i in range(len(columns))],
+                    names=columns,
+                )
+                schema = table.schema
+            else:
+                table = pa.Table.from_arrays(
+                    [
+                        pa.array([row[i] for row in batch], type=field.type)
+                        for i, field in enumerate(schema)
+                    ],
+                    schema=schema,
+                )
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table)
+            rows_written += len(batch)
+        if writer is None:
+            # Empty result: still produce a valid file with the column names
+            if schema is None:
+                schema = pa.schema([pa.field(name, pa.null()) for name in columns])
+            pq.write_table(schema.empty_table(), path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows_written
+
+
+WRITERS = {"csv": _write_csv, "ndjson": _write_ndjson, "parquet": _write_parquet}
+
+
+def _cursor_batches(cursor: Any, max_rows: Optional[int]) -> Iterator[Sequence[tuple]]:
+    remaining = max_rows
+    while remaining is None or remaining > 0:
+        size = EXPORT_BATCH_SIZE if remaining is None else min(EXPORT_BATCH_SIZE, remaining)
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        if remaining is not None:
+            remaining -= len(batch)
+        yield batch
+
+
+def _mock_source(
+    query: str, max_rows: Optional[int]
+) -> Tuple[List[str], Iterator[Sequence[tuple]]]:
+    data = snowflake_tools.query_snowflake(query)["data"]
+    columns = data["columns"]
+    rows = [tuple(row.get(c) for c in columns) for row in data["rows"]]
+    return columns, iter([rows[:max_rows]])
+
+
+def export_query(
+    query: str,
+    export_format: str = "csv",
+    file_name: Optional[str] = None,
+    max_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a query's full result set to a local CSV, NDJSON or Parquet file.
+
+    Args:
+        query: SQL query to export
+        export_format: Output format (csv, ndjson, parquet)
+        file_name: Optional file name inside the exports directory
+        max_rows: Optional cap on the number of rows written
+
+    Returns:
+        Dictionary with success status, file path, rows and bytes written
+    """
+    tmp_path: Optional[Path] = None
+    try:
+        if not query or not query.strip():
+            return {"success": False, "error": "Query cannot be empty"}
+        export_format = export_format.lower()
+        if export_format not in EXPORT_FORMATS:
+            return {
+                "success": False,
+                "error": f"Unknown format '{export_format}', expected one of "
+                f"{tuple(EXPORT_FORMATS)}",
+            }
+        if export_format == "parquet":
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                return {
+                    "success": False,
+                    "error": "Parquet export requires pyarrow (pip install pyarrow)",
+                }
+
+        path = _export_path(file_name, export_format)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        write = WRITERS[export_format]
+
+        if config.MOCK_MODE:
+            logger.info(f"MOCK MODE: Exporting simulated data for query: {query}")
+            columns, batches = _mock_source(query, max_rows)
+            rows_written = write(tmp_path, columns, batches)
+        else:
+            conn = snowflake_tools.get_snowflake_connection(
+                choose_route("export", query), choose_profile("export")
+            )
+            try:
+                cursor = conn.cursor()
+                cursor.execute(query.strip().rstrip(";"))
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                if export_format == "parquet":
+                    write = functools.partial(
+                        write, schema=arrow_schema(cursor.description or [])
+                    )
+                rows_written = write(tmp_path, columns, _cursor_batches(cursor, max_rows))
+            finally:
+                cursor.close()
+                if changes_session(query):
+                    # Session settings must not leak into the next checkout
+                    conn.discard()
+                else:
+                    conn.close()
+
+        os.replace(tmp_path, path)
+        logger.info(f"Exported {rows_written} rows to {path}")
+        return {
+            "success": True,
+            "data": {
+                "file_path": str(path.absolute()),
+                "format": export_format,
+                "rows_written": rows_written,
+                "bytes_written": path.stat().st_size,
+                "columns": columns,
+            },
+        }
+
+    except snowflake.connector.errors.ProgrammingError as e:
+        logger.error(f"Snowflake export query error: {e}")
+        return {"success": False, "error": f"Query error: {str(e)}"}
+    except Exception as e:
+        logger.error(f"Unexpected error in export_query: {e}")
+        return {"success": False, "error": f"Export failed: {str(e)}"}
+    finally:
+        if tmp_path is not None and tmp_path.exists():
+            tmp_path.unlink()
@@ -1,56 +1,229 @@
 """Core Snowflake MCP tools for natural language querying."""
 
 import logging
-from typing import Any, Dict, List, Optional
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import snowflake.connector
 from snowflake.connector import DictCursor
 
-from src import config, mock_data
-from src.config import get_snowflake_config
+from src import config, mock_data, query_cache
+from src.admission import Overloaded, admit
+from src.advisor import rewrite_query
+from src.cost import preflight
+from src.pool import (
+    DEFAULT_PROFILE,
+    DEFAULT_ROUTE,
+    PooledConnection,
+    choose_profile,
+    choose_route,
+    get_pool,
+)
+from src.result_store import get_result_store
+from src.schema_index import (
+    fetch_catalog_columns,
+    fetch_catalog_views,
+    get_schema_index,
+)
+from src.singleflight import SingleFlight
+from src.sql_utils import (
+    canonicalize_sql,
+    changes_session,
+    has_limit,
+    resolve_identifier,
+    rewrite_approximate,
+)
+from src.summary import estimate_json_bytes, shape_result_data
+from src.workload import record_query
+from src.config import (
+    APPROX_SAMPLE_PERCENT,
+    CHART_MAX_ROWS,
+    CHART_SIDECAR_THRESHOLD,
+    COST_PREFLIGHT_ENABLED,
+    QUERY_FETCH_ROWS,
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Initialize configuration state (detect Mock Mode)
-config.validate_config()
+# De-duplicates identical queries running at the same time
+_query_flight = SingleFlight()
 
 
-def get_snowflake_connection() -> snowflake.connector.SnowflakeConnection:
-    """Create and return a Snowflake connection."""
+def get_snowflake_connection(
+    route: str = DEFAULT_ROUTE, profile: str = DEFAULT_PROFILE
+) -> PooledConnection:
+    """
+    Return a pooled connection on a warehouse route.
+
+    The call first waits for admission (global and per-client limits);
+    closing the returned connection hands it back to the route's pool and
+    frees the admission slot.
+
+    Args:
+        route: Warehouse route (metadata, small, heavy)
+        profile: Session parameter profile (interactive, export, metadata)
+
+    Raises:
+        Overloaded: If the server is too busy to admit the request
+    """
+    slot = admit(route)
     try:
-        config = get_snowflake_config()
-        # If in Mock Mode, this returns empty dict, so we shouldn't even get here 
-        # because the tools check MOCK_MODE first.
-        conn = snowflake.connector.connect(**config)
-        logger.info("Successfully connected to Snowflake")
-        return conn
+        return get_pool(route, profile).acquire(on_release=slot.release)
     except Exception as e:
+        slot.release()
         logger.error(f"Failed to connect to Snowflake: {e}")
         raise
 
 
-def query_snowflake(query: str, limit: int = 100) -> Dict[str, Any]:
+def _execute_query(
+    query: str, route: str = DEFAULT_ROUTE, profile: str = DEFAULT_PROFILE
+) -> Tuple[List[Dict[str, Any]], List[str], Optional[str]]:
+    """Run a query on a pooled connection, recording its workload statistics."""
+    conn = get_snowflake_connection(route, profile)
+    try:
+        cursor = conn.cursor(DictCursor)
+        started = time.perf_counter()
+        try:
+            cursor.execute(query)
+            results = cursor.fetchall()
+        except Exception:
+            record_query(query, (time.perf_counter() - started) * 1000, error=True)
+            raise
+        record_query(
+            query,
+            (time.perf_counter() - started) * 1000,
+            rows=len(results),
+            result_bytes=estimate_json_bytes(results),
+        )
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        return results, columns, getattr(cursor, "sfqid", None)
+    finally:
+        cursor.close()
+        if changes_session(query):
+            # Session settings must not leak into the next checkout
+            conn.discard()
+        else:
+            conn.close()
+
+
+def _cache_hit(query: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """Look a query up in the persistent cache, recording a hit."""
+    cached = query_cache.lookup(query) if use_cache else None
+    if cached is not None:
+        logger.info("Serving query from the persistent result cache")
+        record_query(query, 0.0, cached=True)
+    return cached
+
+
+def _cached_execute(
+    query: str,
+    route: Optional[str] = None,
+    tool: str = "query",
+    use_cache: bool = True,
+) -> Tuple[List[Dict[str, Any]], List[str], Optional[str], bool]:
+    """Serve a query from the persistent cache, or run and cache it."""
+    cached = _cache_hit(query, use_cache)
+    if cached is not None:
+        return cached["rows"], cached["columns"], cached["query_id"], True
+    route = route or choose_route(tool, query)
+    results, columns, query_id = _execute_query(query, route, choose_profile(tool))
+    query_cache.store(query, results, columns, query_id)
+    return results, columns, query_id, False
+
+
+def _shared_execute(
+    query: str,
+    route: Optional[str] = None,
+    tool: str = "query",
+    use_cache: bool = True,
+) -> Tuple[List[Dict[str, Any]], List[str], Optional[str], bool]:
+    """
+    Run a query once for all identical concurrent callers, via the cache.
+
+    With ``use_cache`` false the cache is not read (the result is still
+    stored), and the call only shares executions with other such calls.
+    """
+    key = query_cache.cache_key(query) + ("" if use_cache else ":run")
+    (results, columns, query_id, cached), coalesced = _query_flight.do(
+        key, lambda: _cached_execute(query, route, tool, use_cache)
+    )
+    if coalesced:
+        logger.info("Shared the result of an identical in-flight query")
+        record_query(query, 0.0, coalesced=True)
+    return results, columns, query_id, cached
+
+
+def query_snowflake(
+    query: str,
+    limit: int = 100,
+    summarize: Optional[bool] = None,
+    approximate: bool = False,
+    sample_percent: Optional[float] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
     """
     Execute a SQL query against Snowflake and return results.
 
     Args:
         query: SQL query to execute
         limit: Maximum number of rows to return (default: 100)
+        summarize: Return column statistics and sample rows instead of all
+            rows (None: only when the result exceeds the response budget)
+        approximate: Rewrite the query to use SAMPLE and APPROX_* functions
+        sample_percent: Sampling percentage for approximate mode
+            (default: APPROX_SAMPLE_PERCENT)
+        use_cache: Serve the result from the persistent query cache when it
+            holds one; false always runs the query
 
     Returns:
-        Dictionary with success status, data, and metadata
+        Dictionary with success status, data, and metadata; ``cached`` and,
+        for cached results, ``cache_age_seconds`` tell how old the rows are
     """
+    approximation = None
+    original_query = None
+    rewritten = rewrite_query(query) if query and query.strip() else None
+    if rewritten is not None:
+        original_query, query = query, rewritten
+        logger.info(f"Rewrote query to read a materialization: {query}")
+        if approximate:
+            # The materialization already holds the exact precomputed answer
+            approximation = {
+                "applied": False,
+                "sampled": False,
+                "notes": [
+                    "Approximation skipped: a materialization answers this "
+                    "query exactly"
+                ],
+            }
+    elif approximate and query and query.strip():
+        rewrite = rewrite_approximate(
+            query, APPROX_SAMPLE_PERCENT if sample_percent is None else sample_percent
+        )
+        query, approximation = rewrite["query"], rewrite["approximation"]
+        logger.info(f"Approximate mode rewrote query to: {query}")
+
     if config.MOCK_MODE:
         logger.info(f"MOCK MODE: Returning simulated data for query: {query}")
         query_upper = query.upper()
         
         # Simple heuristic to return relevant mock data
         if "GROUP BY TRANSACTION_DATE" in query_upper:
-            return mock_data.SAMPLE_DAILY_TREND
+            sample = mock_data.SAMPLE_DAILY_TREND
         else:
             # Default to Category Sales (most common request)
-            return mock_data.SAMPLE_CATEGORY_SALES
+            sample = mock_data.SAMPLE_CATEGORY_SALES
+
+        data = sample["data"]
+        record_query(query, 0.0, rows=len(data["rows"]))
+        result_id = get_result_store().put(data["rows"], data["columns"], query)
+        data = {**data, "result_id": result_id}
+        if approximation is not None:
+            data["approximation"] = approximation
+        if original_query is not None:
+            data["original_query"] = original_query
+        return {**sample, "data": shape_result_data(data, summarize)}
 
     try:
         # Input validation
@@ -60,49 +233,173 @@ def query_snowflake(query: str, limit: int = 100) -> Dict[str, Any]:
         # Ensure limit is reasonable
         limit = min(max(1, limit), 1000)  # Between 1 and 1000
 
-        # Add LIMIT clause if not present
-        query_upper = query.upper().strip()
-        if not query_upper.endswith(";"):
-            query = query.strip()
-        if "LIMIT" not in query_upper:
-            query = f"{query.rstrip(';')} LIMIT {limit}"
-
-        conn = get_snowflake_connection()
-
-        try:
-            cursor = conn.cursor(DictCursor)
-            cursor.execute(query)
-
-            # Fetch results
-            results = cursor.fetchall()
+        # Equivalent text must be byte-identical to hit Snowflake's result
+        # cache, so formatting is canonicalized and a missing LIMIT is always
+        # the same fixed cap; the caller's limit is applied to the fetched rows
+        query = canonicalize_sql(query)
+        capped = not has_limit(query)
+        if capped:
+            query = f"{query} LIMIT {QUERY_FETCH_ROWS}"
+
+        # Estimate the scan before running anything not already cached
+        estimate = None
+        route = None
+        hit = _cache_hit(query, use_cache)
+        if COST_PREFLIGHT_ENABLED and hit is None:
+            decision = preflight(query, allow_sample=approximation is None)
+            estimate = decision["estimate"]
+            if "rejected" in decision:
+                return {
+                    "success": False,
+                    "error": decision["rejected"],
+                    "estimate": estimate,
+                }
+            if "approximation" in decision:
+                query = canonicalize_sql(decision["query"])
+                approximation = decision["approximation"]
+            route = decision.get("route")
 
-            # Get column information
-            columns = (
-                [desc[0] for desc in cursor.description] if cursor.description else []
+        if hit is not None:
+            results, columns, query_id = hit["rows"], hit["columns"], hit["query_id"]
+        else:
+            # Identical concurrent requests share one execution
+            results, columns, query_id, _ = _shared_execute(
+                query, route, use_cache=False
             )
 
-            return {
-                "success": True,
-                "data": {
-                    "rows": results,
-                    "columns": columns,
-                    "row_count": len(results),
-                    "query": query,
-                },
-            }
-
-        finally:
-            cursor.close()
-            conn.close()
+        # Keep the result server-side so later tools can reference it
+        result_id = get_result_store().put(results, columns, query, query_id=query_id)
+
+        rows = results[:limit]
+        # Hitting the server's own fetch cap means the query has more rows
+        # than were fetched, and total_rows only counts the fetched ones
+        truncated = capped and len(results) >= QUERY_FETCH_ROWS
+        data = {
+            "rows": rows,
+            "columns": columns,
+            "row_count": len(rows),
+            "total_rows": len(results),
+            "has_more": truncated or len(results) > len(rows),
+            "truncated": truncated,
+            "query": query,
+            "result_id": result_id,
+            "cached": hit is not None,
+        }
+        if hit is not None:
+            data["cache_age_seconds"] = round(time.time() - hit["created_at"], 1)
+        if estimate is not None:
+            data["estimate"] = estimate
+        if approximation is not None:
+            data["approximation"] = approximation
+        if original_query is not None:
+            data["original_query"] = original_query
+        return {
+            "success": True,
+            "data": shape_result_data(data, summarize, all_rows=results),
+        }
 
     except snowflake.connector.errors.ProgrammingError as e:
         logger.error(f"Snowflake query error: {e}")
         return {"success": False, "error": f"Query error: {str(e)}"}
+    except Overloaded as e:
+        logger.warning(f"Query rejected by admission control: {e}")
+        return {"success": False, "error": str(e)}
     except Exception as e:
         logger.error(f"Unexpected error in query_snowflake: {e}")
         return {"success": False, "error": f"Unexpected error: {str(e)}"}
 
 
+def get_stored_result(result_id: str) -> Dict[str, Any]:
+    """
+    Look up a previously stored query result by its handle.
+
+    Args:
+        result_id: Handle returned in a query result's ``result_id`` field
+
+    Returns:
+        Dictionary with success status and the stored rows and columns
+    """
+    stored = get_result_store().get(result_id)
+    if stored is None:
+        return {
+            "success": False,
+            "error": f"Result {result_id} not found or expired; re-run the query",
+        }
+    return {"success": True, "data": stored}
+
+
+def _restore_from_result_scan(result_id: str) -> Optional[Dict[str, Any]]:
+    """Re-read a dropped result from Snowflake's result cache by query id."""
+    info = get_result_store().forgotten(result_id)
+    if info is None or config.MOCK_MODE:
+        return None
+    query_id = info["query_id"]
+    if not re.fullmatch(r"[0-9A-Za-z-]+", query_id):
+        return None
+    try:
+        results, columns, _ = _execute_query(
+            f"SELECT * FROM TABLE(RESULT_SCAN('{query_id}'))"
+        )
+    except Exception as e:
+        logger.warning(f"RESULT_SCAN of {query_id} for {result_id} failed: {e}")
+        return None
+    logger.info(f"Restored result {result_id} from query {query_id} via RESULT_SCAN")
+    get_result_store().put(
+        results, columns, info["query"], query_id=query_id, result_id=result_id
+    )
+    return {"success": True, "data": {"rows": results, "columns": columns}}
+
+
+def load_stored_result(result_id: str) -> Dict[str, Any]:
+    """
+    Look up a stored result, re-reading it with RESULT_SCAN if it was dropped.
+
+    Args:
+        result_id: Handle returned in a query result's ``result_id`` field
+
+    Returns:
+        Dictionary with success status and the stored rows, columns and query
+    """
+    stored = get_stored_result(result_id)
+    if stored["success"] or _restore_from_result_scan(result_id) is None:
+        return stored
+    return get_stored_result(result_id)
+
+
+def fetch_result_rows(result_id: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """
+    Return a page of rows from a stored query result.
+
+    Args:
+        result_id: Handle returned in a query result's ``result_id`` field
+        offset: Index of the first row to return
+        limit: Maximum number of rows to return (1-1000)
+
+    Returns:
+        Dictionary with success status and the requested rows
+    """
+    stored = load_stored_result(result_id)
+    if not stored["success"]:
+        return stored
+
+    offset = max(0, offset)
+    limit = min(max(1, limit), 1000)
+    rows = stored["data"]["rows"]
+    page = rows[offset : offset + limit]
+    return {
+        "success": True,
+        "data": {
+            "rows": page,
+            "columns": stored["data"]["columns"],
+            "row_count": len(page),
+            "total_rows": len(rows),
+            "offset": offset,
+            "has_more": offset + len(page) < len(rows),
+            "result_id": result_id,
+        },
+    }
+
+
 def list_views(schema: Optional[str] = None) -> Dict[str, Any]:
     """
     List all available views in the specified schema or current schema.
@@ -118,7 +415,9 @@ def list_views(schema: Optional[str] = None) -> Dict[str, Any]:
         return mock_data.LIST_VIEWS_RESPONSE
 
     try:
-        conn = get_snowflake_connection()
+        conn = get_snowflake_connection(
+            choose_route("list_views"), choose_profile("list_views")
+        )
 
         try:
             cursor = conn.cursor(DictCursor)
@@ -140,9 +439,7 @@ def list_views(schema: Optional[str] = None) -> Dict[str, Any]:
                     "schema": row.get("schema_name"),
                     "database": row.get("database_name"),
                     "kind": "VIEW",
-                    "created_on": str(row.get("created_on"))
-                    if row.get("created_on")
-                    else None,
+                    "created_on": row.get("created_on"),
                 }
                 views.append(view_info)
 
@@ -183,7 +480,9 @@ def describe_view(view_name: str, schema: Optional[str] = None) -> Dict[str, Any
         if not view_name or not view_name.strip():
             return {"success": False, "error": "View name cannot be empty"}
 
-        conn = get_snowflake_connection()
+        conn = get_snowflake_connection(
+            choose_route("describe_view"), choose_profile("describe_view")
+        )
 
         try:
             cursor = conn.cursor(DictCursor)
@@ -230,9 +529,7 @@ def describe_view(view_name: str, schema: Optional[str] = None) -> Dict[str, Any
                     "schema": view_metadata.get("schema_name"),
                     "database": view_metadata.get("database_name"),
                     "kind": "VIEW",
-                    "created_on": str(view_metadata.get("created_on"))
-                    if view_metadata.get("created_on")
-                    else None,
+                    "created_on": view_metadata.get("created_on"),
                     "comment": view_metadata.get("comment"),
                 }
 
@@ -253,3 +550,330 @@ def describe_view(view_name: str, schema: Optional[str] = None) -> Dict[str, Any
     except Exception as e:
         logger.error(f"Error describing view {view_name}: {e}")
         return {"success": False, "error": f"Failed to describe view: {str(e)}"}
+
+
+def _mock_describe_views(names: Optional[List[str]]) -> Dict[str, Any]:
+    described = mock_data.DESCRIBE_DAILY_SALES["data"]
+    views = {}
+    for view in mock_data.LIST_VIEWS_RESPONSE["data"]["views"]:
+        if names is not None and view["name"] not in names:
+            continue
+        columns = described["columns"] if view["name"] == described["view"] else []
+        views[view["name"]] = {
+            "columns": columns,
+            "column_count": len(columns),
+            "metadata": {**view, "comment": None},
+        }
+    return {
+        "success": True,
+        "data": {
+            "views": views,
+            "count": len(views),
+            "schema": mock_data.LIST_VIEWS_RESPONSE["data"]["schema"],
+            "not_found": sorted(set(names or []) - set(views)),
+        },
+    }
+
+
+def describe_views(
+    view_names: Optional[List[str]] = None, schema: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Describe many views at once from INFORMATION_SCHEMA.
+
+    One query reads the views and one reads all their columns, on a single
+    connection, instead of two statements per view.
+
+    Args:
+        view_names: Views to describe (default: every view in the schema);
+            unquoted names are matched upper-cased, "quoted" names exactly
+        schema: Schema name (optional, defaults to configured schema)
+
+    Returns:
+        Dictionary with success status and columns and metadata keyed by view
+    """
+    names = [resolve_identifier(name) for name in view_names] if view_names else None
+    if names is not None and not all(names):
+        return {"success": False, "error": "View names cannot be empty"}
+
+    if config.MOCK_MODE:
+        logger.info("MOCK MODE: Returning simulated view descriptions")
+        return _mock_describe_views(names)
+
+    schema = resolve_identifier(schema or config.get_settings().schema)
+    try:
+        conn = get_snowflake_connection(
+            choose_route("describe_view"), choose_profile("describe_view")
+        )
+        try:
+            cursor = conn.cursor(DictCursor)
+            catalog = fetch_catalog_views(cursor, schema)
+            if names is not None:
+                catalog = {k: v for k, v in catalog.items() if k[1] in names}
+            columns = fetch_catalog_columns(cursor, schema, names) if catalog else {}
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as e:
+        logger.error(f"Error describing views in {schema}: {e}")
+        return {"success": False, "error": f"Failed to describe views: {str(e)}"}
+
+    if names is None:
+        # The full catalog of one schema: keep its part of the search index current
+        get_schema_index().sync(catalog, lambda keys: columns, schema=schema)
+
+    views = {}
+    for (view_schema, name), view in sorted(catalog.items()):
+        view_columns = columns.get((view_schema, name), [])
+        views[name] = {
+            "columns": view_columns,
+            "column_count": len(view_columns),
+            "metadata": {
+                "name": name,
+                "schema": view_schema,
+                "kind": "VIEW",
+                "created_on": view.get("created"),
+                "comment": view.get("comment"),
+            },
+        }
+    return {
+        "success": True,
+        "data": {
+            "views": views,
+            "count": len(views),
+            "schema": schema,
+            "not_found": sorted(set(names or []) - set(views)),
+        },
+    }
+
+
+CHART_AGGREGATES = ("sum", "avg", "min", "max", "count", "none")
+
+# Extra column of a pushed-down chart query: source rows behind each point
+CHART_ROWS_COLUMN = "CHART_SOURCE_ROWS"
+
+
+def _sql_identifier(name: str) -> str:
+    """Reference a column by name: plain names unquoted, anything else quoted."""
+    if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_$]*", name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _chart_sql(
+    query: str, x_column: str, y_column: str, aggregate: str, max_rows: int
+) -> str:
+    """
+    Build the SQL that produces a chart's points.
+
+    Aggregates are pushed into Snowflake as ``GROUP BY x`` over the query, so
+    only one row per point comes back, ordered by X. With ``none`` the query
+    runs as written. Either way the result is capped at one row past
+    ``max_rows`` so truncation can be detected.
+    """
+    query = canonicalize_sql(query)
+    if aggregate == "none":
+        if has_limit(query):
+            return query
+        return f"{query} LIMIT {max_rows + 1}"
+
+    x, y = _sql_identifier(x_column), _sql_identifier(y_column)
+    value = "COUNT(*)" if aggregate == "count" else f"{aggregate.upper()}({y})"
+    return (
+        f"SELECT {x}, {value} AS {y}, COUNT(*) AS {CHART_ROWS_COLUMN} "
+        f"FROM ({query}) GROUP BY {x} ORDER BY {x} LIMIT {max_rows + 1}"
+    )
+
+
+def _find_column(columns: Sequence[str], name: str) -> Optional[int]:
+    """Return the index of a result column, matching case-insensitively."""
+    if name in columns:
+        return list(columns).index(name)
+    lowered = [column.lower() for column in columns]
+    return lowered.index(name.lower()) if name.lower() in lowered else None
+
+
+def _aggregate_points(
+    rows: Iterable[Sequence[Any]], x_index: int, y_index: int, aggregate: str
+) -> Dict[str, Any]:
+    """Fold (x, y) rows into chart points, keeping first-seen label order."""
+    if aggregate == "none":
+        labels, values = [], []
+        for row in rows:
+            labels.append(str(row[x_index]))
+            values.append(None if row[y_index] is None else float(row[y_index]))
+        return {"labels": labels, "values": values}
+
+    totals: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for row in rows:
+        label = str(row[x_index])
+        value = row[y_index]
+        if value is None and aggregate != "count":
+            counts.setdefault(label, 0)
+            continue
+        value = 1.0 if aggregate == "count" else float(value)
+        if label not in totals:
+            totals[label] = value
+        elif aggregate in ("sum", "avg", "count"):
+            totals[label] += value
+        elif aggregate == "min":
+            totals[label] = min(totals[label], value)
+        else:
+            totals[label] = max(totals[label], value)
+        counts[label] = counts.get(label, 0) + 1
+
+    labels = list(counts)
+    if aggregate == "avg":
+        values = [
+            totals[label] / counts[label] if label in totals else None
+            for label in labels
+        ]
+    else:
+        values = [totals.get(label) for label in labels]
+    return {"labels": labels, "values": values}
+
+
+def _fetch_chart_rows(query: str, max_rows: int) -> Dict[str, Any]:
+    """Run chart SQL through the query cache and return its rows as tuples."""
+    results, columns, _, cached = _shared_execute(
+        query, choose_route("chart", query), tool="chart"
+    )
+    rows = [tuple(row.get(c) for c in columns) for row in results[: max_rows + 1]]
+    return {
+        "columns": columns,
+        "rows": rows[:max_rows],
+        "truncated": len(rows) > max_rows,
+        "cached": cached,
+    }
+
+
+def chart_query(
+    query: Optional[str],
+    x_column: str,
+    y_column: str,
+    chart_type: str = "bar",
+    title: str = "Data Visualization",
+    aggregate: str = "sum",
+    open_browser: bool = True,
+    result_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run a query server-side and render its result straight into a chart.
+
+    Rows never leave the server: only the chart location and a small summary
+    are returned, so large results cost neither tokens nor the 1000-row cap.
+
+    Args:
+        query: SQL query producing the chart data
+        x_column: Result column used for labels/X-axis
+        y_column: Result column used for values/Y-axis
+        chart_type: Type of chart (bar, line, pie, scatter, doughnut)
+        title: Chart title
+        aggregate: How rows sharing an X label are combined
+            (sum, avg, min, max, count, or none to plot every row)
+        open_browser: Whether to open the chart in the browser
+        result_id: Chart a stored result instead of running ``query``
+
+    Returns:
+        Dictionary with success status, chart id, file path and summary;
+        sidecar charts also carry the chart-server ``url`` they open from
+    """
+    try:
+        if not result_id and (not query or not query.strip()):
+            return {"success": False, "error": "Query cannot be empty"}
+        if not x_column or not y_column:
+            return {"success": False, "error": "Both x_column and y_column are required"}
+        if aggregate not in CHART_AGGREGATES:
+            return {
+                "success": False,
+                "error": f"Unknown aggregate '{aggregate}', expected one of {CHART_AGGREGATES}",
+            }
+
+        if result_id or config.MOCK_MODE:
+            if result_id:
+                stored = get_stored_result(result_id)
+                if not stored["success"]:
+                    return stored
+                source = stored["data"]
+            else:
+                logger.info(f"MOCK MODE: Charting simulated data for query: {query}")
+                source = query_snowflake(query)["data"]
+            columns = source["columns"]
+            fetched = {
+                "columns": columns,
+                "rows": [[row.get(c) for c in columns] for row in source["rows"]],
+                "truncated": False,
+            }
+        else:
+            fetched = _fetch_chart_rows(
+                _chart_sql(query, x_column, y_column, aggregate, CHART_MAX_ROWS),
+                CHART_MAX_ROWS,
+            )
+
+        columns = fetched["columns"]
+        x_index = _find_column(columns, x_column)
+        y_index = _find_column(columns, y_column)
+        if x_index is None or y_index is None:
+            return {
+                "success": False,
+                "error": f"Columns '{x_column}' or '{y_column}' not found in result "
+                f"(available: {', '.join(columns)})",
+            }
+
+        # Pushed-down queries already return one row per point
+        pushed_down = CHART_ROWS_COLUMN in columns and aggregate != "none"
+        points = _aggregate_points(
+            fetched["rows"], x_index, y_index, "none" if pushed_down else aggregate
+        )
+        labels, values = points["labels"], points["values"]
+        if not labels:
+            return {"success": False, "error": "Query returned no rows to chart"}
+
+        from src.visualize import generate_chart_html
+
+        x_name, y_name = columns[x_index], columns[y_index]
+        sidecar = len(labels) > CHART_SIDECAR_THRESHOLD
+        result = generate_chart_html(
+            data=[{x_name: label, y_name: value} for label, value in zip(labels, values)],
+            chart_type=chart_type,
+            x_column=x_name,
+            y_column=y_name,
+            title=title,
+            open_browser=open_browser,
+            data_format="json" if sidecar else "inline",
+        )
+        if not result.get("success"):
+            return result
+        if sidecar:
+            # Browsers refuse fetch() from file:// pages, so sidecar charts
+            # are only viewable through the chart server
+            from src.chart_server import ensure_chart_server
+
+            base_url = ensure_chart_server().base_url
+            result["url"] = f"{base_url}/charts/{result['chart_id']}"
+
+        present = [value for value in values if value is not None]
+        if pushed_down:
+            rows_column = columns.index(CHART_ROWS_COLUMN)
+            rows_scanned = sum(int(row[rows_column] or 0) for row in fetched["rows"])
+        else:
+            rows_scanned = len(fetched["rows"])
+        result["summary"] = {
+            "rows_scanned": rows_scanned,
+            "points": len(labels),
+            "truncated": fetched["truncated"],
+            "cached": fetched.get("cached", False),
+            "aggregate": aggregate,
+            "y_min": min(present) if present else None,
+            "y_max": max(present) if present else None,
+            "y_total": sum(present) if present else None,
+        }
+        return result
+
+    except snowflake.connector.errors.ProgrammingError as e:
+        logger.error(f"Snowflake query error: {e}")
+        return {"success": False, "error": f"Query error: {str(e)}"}
+    except Exception as e:
+        logger.error(f"Unexpected error in chart_query: {e}")
+        return {"success": False, "error": f"Unexpected error: {str(e)}"}
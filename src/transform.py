@@ -0,0 +1,320 @@
+"""Local filter/sort/group-by/top-N/pivot over stored query results.
+
+Follow-up questions on a result the agent already fetched ("top 5 by
+revenue", "group by category") are answered here instead of re-querying
+Snowflake. Results are converted once into a column-oriented ``Frame`` and
+each operation works column-at-a-time on row index lists, so a step touches
+only the columns it needs.
+"""
+
+import heapq
+import logging
+import operator
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.compact_rows import CompactRows
+from src.result_store import get_result_store
+
+logger = logging.getLogger(__name__)
+
+COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda value, options: value in options,
+    "not_in": lambda value, options: value not in options,
+    "contains": lambda value, text: str(text).lower() in str(value).lower(),
+}
+NULL_CHECKS = ("is_null", "not_null")
+
+AGGREGATES = ("sum", "avg", "min", "max", "count", "count_distinct")
+
+
+class Frame:
+    """Column-oriented table: a column order plus one value list per column."""
+
+    def __init__(self, columns: List[str], data: Dict[str, List[Any]]):
+        self.columns = columns
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]], columns: List[str]) -> "Frame":
+        if isinstance(rows, CompactRows):
+            # Stored results are already column-oriented
+            return cls(list(columns), {c: rows.column(c) for c in columns})
+        return cls(list(columns), {c: [row.get(c) for row in rows] for c in columns})
+
+    def __len__(self) -> int:
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def column(self, name: str) -> List[Any]:
+        if name not in self.data:
+            raise ValueError(
+                f"Column '{name}' not found (available: {', '.join(self.columns)})"
+            )
+        return self.data[name]
+
+    def take(self, indices: List[int]) -> "Frame":
+        return Frame(
+            self.columns, {c: [values[i] for i in indices] for c, values in self.data.items()}
+        )
+
+    def to_rows(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        count = len(self) if limit is None else min(limit, len(self))
+        columns = [self.data[c] for c in self.columns]
+        return [
+            dict(zip(self.columns, [values[i] for values in columns]))
+            for i in range(count)
+        ]
+
+
+def _coerce(value: Any, sample: Any) -> Any:
+    """Convert a JSON filter value to the type of the column it is compared with."""
+    if isinstance(value, list):
+        return [_coerce(v, sample) for v in value]
+    if isinstance(value, str):
+        if isinstance(sample, datetime):
+            return datetime.fromisoformat(value)
+        if isinstance(sample, date):
+            return date.fromisoformat(value)
+    if isinstance(sample, Decimal) and isinstance(value, (int, float)):
+        return Decimal(str(value))
+    return value
+
+
+def _first_present(values: List[Any]) -> Any:
+    return next((v for v in values if v is not None), None)
+
+
+def _sort_indices(
+    frame: Frame, by: Sequence[str], descending: bool
+) -> List[int]:
+    indices = list(range(len(frame)))
+    # Stable multi-key sort: apply keys from last to first; nulls always last
+    for name in reversed(by):
+        values = frame.column(name)
+        present = [i for i in indices if values[i] is not None]
+        missing = [i for i in indices if values[i] is None]
+        present.sort(key=values.__getitem__, reverse=descending)
+        indices = present + missing
+    return indices
+
+
+def apply_filter(frame: Frame, step: Dict[str, Any]) -> Frame:
+    values = frame.column(step["column"])
+    op = step.get("operator", "=")
+
+    if op in NULL_CHECKS:
+        want_null = op == "is_null"
+        return frame.take([i for i, v in enumerate(values) if (v is None) == want_null])
+
+    if op not in COMPARATORS:
+        raise ValueError(
+            f"Unknown filter operator '{op}', expected one of "
+            f"{tuple(COMPARATORS) + NULL_CHECKS}"
+        )
+    compare = COMPARATORS[op]
+    target = _coerce(step.get("value"), _first_present(values))
+    if op in ("in", "not_in"):
+        target = set(target)
+    # SQL semantics: comparisons against NULL are never true
+    return frame.take(
+        [i for i, v in enumerate(values) if v is not None and compare(v, target)]
+    )
+
+
+def apply_sort(frame: Frame, step: Dict[str, Any]) -> Frame:
+    by = step["by"] if isinstance(step["by"], list) else [step["by"]]
+    return frame.take(_sort_indices(frame, by, bool(step.get("descending", False))))
+
+
+def apply_top_n(frame: Frame, step: Dict[str, Any]) -> Frame:
+    n = int(step.get("n", 10))
+    values = frame.column(step["by"])
+    present = [i for i, v in enumerate(values) if v is not None]
+    pick = heapq.nlargest if step.get("descending", True) else heapq.nsmallest
+    return frame.take(pick(n, present, key=values.__getitem__))
+
+
+def _aggregate(func: str, values: List[Any]) -> Any:
+    present = [v for v in values if v is not None]
+    if func == "count":
+        return len(present)
+    if func == "count_distinct":
+        return len(set(present))
+    if not present:
+        return None
+    if func == "sum":
+        return sum(present)
+    if func == "avg":
+        return sum(present) / len(present)
+    if func == "min":
+        return min(present)
+    if func == "max":
+        return max(present)
+    raise ValueError(f"Unknown aggregate '{func}', expected one of {AGGREGATES}")
+
+
+def _group_indices(frame: Frame, by: Sequence[str]) -> Dict[tuple, List[int]]:
+    keys = list(zip(*(frame.column(name) for name in by)))
+    groups: Dict[tuple, List[int]] = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+    return groups
+
+
+def apply_group_by(frame: Frame, step: Dict[str, Any]) -> Frame:
+    by = step["by"] if isinstance(step["by"], list) else [step["by"]]
+    aggregates = step.get("aggregates") or {"*": "count"}
+    if not isinstance(aggregates, dict):
+        raise TypeError("group_by aggregates must map column names to functions")
+    groups = _group_indices(frame, by)
+
+    columns = list(by)
+    data: Dict[str, List[Any]] = {
+        name: [key[pos] for key in groups] for pos, name in enumerate(by)
+    }
+    for source, funcs in aggregates.items():
+        func_list = funcs if isinstance(funcs, list) else [funcs]
+        for func in func_list:
+            if func not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate '{func}', expected one of {AGGREGATES}")
+            if source == "*":
+                # '*' has no values to sum or compare, only rows to count
+                if func != "count":
+                    raise ValueError(f"Aggregate '{func}' needs a column, not '*'")
+                name = func.upper()
+                output = [len(indices) for indices in groups.values()]
+            else:
+                values = frame.column(source)
+                # A single aggregate keeps the column name so later steps can use it
+                name = source if len(func_list) == 1 else f"{source}_{func.upper()}"
+                output = [
+                    _aggregate(func, [values[i] for i in indices])
+                    for indices in groups.values()
+                ]
+            columns.append(name)
+            data[name] = output
+    return Frame(columns, data)
+
+
+def apply_pivot(frame: Frame, step: Dict[str, Any]) -> Frame:
+    index, pivot, value = step["index"], step["columns"], step["values"]
+    func = step.get("aggregate", "sum")
+    index_values = frame.column(index)
+    pivot_values = frame.column(pivot)
+    measure = frame.column(value)
+
+    cells: Dict[Any, Dict[Any, List[Any]]] = {}
+    pivot_keys: Dict[Any, None] = {}
+    for i, row_key in enumerate(index_values):
+        pivot_keys.setdefault(pivot_values[i], None)
+        cells.setdefault(row_key, {}).setdefault(pivot_values[i], []).append(measure[i])
+
+    columns = [index] + [str(key) for key in pivot_keys]
+    data: Dict[str, List[Any]] = {index: list(cells)}
+    for key in pivot_keys:
+        data[str(key)] = [
+            _aggregate(func, row[key]) if key in row else None for row in cells.values()
+        ]
+    return Frame(columns, data)
+
+
+def apply_select(frame: Frame, step: Dict[str, Any]) -> Frame:
+    columns = step["columns"]
+    return Frame(list(columns), {c: frame.column(c) for c in columns})
+
+
+OPERATIONS: Dict[str, Callable[[Frame, Dict[str, Any]], Frame]] = {
+    "filter": apply_filter,
+    "sort": apply_sort,
+    "top_n": apply_top_n,
+    "group_by": apply_group_by,
+    "pivot": apply_pivot,
+    "select": apply_select,
+}
+
+
+def run_operations(frame: Frame, operations: List[Dict[str, Any]]) -> Frame:
+    """Apply a pipeline of operation steps to a frame, in order."""
+    if not isinstance(operations, list):
+        raise TypeError("operations must be a list of steps")
+    # Check every step before running any, so a bad step fails fast
+    for position, step in enumerate(operations, start=1):
+        if not isinstance(step, dict):
+            raise TypeError(
+                f"Step {position}: expected an object with an 'op' key, "
+                f"got {type(step).__name__}"
+            )
+        op = step.get("op")
+        if op not in OPERATIONS:
+            raise ValueError(
+                f"Step {position}: unknown op '{op}', expected one of {tuple(OPERATIONS)}"
+            )
+
+    for position, step in enumerate(operations, start=1):
+        op = step["op"]
+        try:
+            frame = OPERATIONS[op](frame, step)
+        except KeyError as e:
+            raise ValueError(f"Step {position} ({op}): missing field {e}") from None
+    return frame
+
+
+def transform_result(
+    result_id: str, operations: List[Dict[str, Any]], limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Run transform operations over a stored result and store the output.
+
+    Args:
+        result_id: Handle of a previous query or transform result
+        operations: Steps applied in order, each a dict with an ``op`` key:
+            filter (column, operator, value), sort (by, descending),
+            top_n (n, by, descending), group_by (by, aggregates),
+            pivot (index, columns, values, aggregate), select (columns)
+        limit: Maximum number of rows to return inline (1-1000)
+
+    Returns:
+        Dictionary with success status, rows, columns, paging counts and a
+        new result_id
+    """
+    from src.tools.snowflake_tools import load_stored_result
+
+    loaded = load_stored_result(result_id)
+    if not loaded["success"]:
+        return loaded
+    stored = loaded["data"]
+
+    try:
+        frame = run_operations(
+            Frame.from_rows(stored["rows"], stored["columns"]), operations or []
+        )
+    except (ValueError, TypeError) as e:
+        logger.error(f"Error transforming result {result_id}: {e}")
+        return {"success": False, "error": f"Transform error: {str(e)}"}
+
+    limit = min(max(1, limit), 1000)
+    all_rows = frame.to_rows()
+    new_result_id = get_result_store().put(
+        all_rows, frame.columns, stored.get("query")
+    )
+    rows = all_rows[:limit]
+    return {
+        "success": True,
+        "data": {
+            "rows": rows,
+            "columns": frame.columns,
+            "row_count": len(rows),
+            "total_rows": len(all_rows),
+            "has_more": len(all_rows) > len(rows),
+            "result_id": new_result_id,
+            "source_result_id": result_id,
+        },
+    }
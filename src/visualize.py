@@ -4,18 +4,39 @@ This follows the pattern from the Gemini CLI course - generate HTML files direct
 and open them in the browser. No server required.
 """
 
+import gzip
+import hashlib
 import json
+import math
 import os
+import struct
+import threading
 import webbrowser
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
-import uuid
 
 
 # Output directory for generated charts (inside project folder)
 CHARTS_DIR = Path(__file__).parent.parent / "charts"
 
+# Index of generated charts keyed by chart_id. Chart ids are content hashes,
+# so an identical request maps to the same entry (and the same file on disk).
+_CHART_INDEX: Dict[str, Dict[str, Any]] = {}
+_CHART_INDEX_LOCK = threading.Lock()
+
+# Ways of shipping chart data to the page: inlined in the HTML, or as a
+# sidecar file fetched after the shell renders (gzip JSON or typed array)
+DATA_FORMATS = ("inline", "json", "binary")
+
+# Sidecar file name suffix per data format
+SIDECAR_SUFFIXES = {"json": ".data.json.gz", "binary": ".data.bin"}
+
+# Binary sidecar layout (little-endian): magic, point count, label JSON length,
+# padding, then the UTF-8 label JSON padded to 8 bytes and float64 values
+BINARY_MAGIC = b"CHRT"
+BINARY_HEADER = struct.Struct("<4sIII")
+
 
 def ensure_charts_dir() -> Path:
     """Ensure the charts directory exists."""
@@ -23,6 +44,116 @@ def ensure_charts_dir() -> Path:
     return CHARTS_DIR
 
 
+def chart_key(
+    chart_type: str,
+    x_column: str,
+    y_column: str,
+    title: str,
+    labels: List[str],
+    values: List[Any],
+    data_format: str = "inline",
+) -> str:
+    """Return the content hash identifying a chart's rendered output."""
+    payload = json.dumps(
+        [chart_type.lower(), x_column, y_column, title, data_format, labels, values],
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """Write a file so concurrent readers never see it partially written."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def _json_value(value: Any) -> Any:
+    """Chart value as JSON allows it: NaN and infinities become null."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return value if math.isfinite(number) else None
+
+
+def encode_json_sidecar(labels: List[str], values: List[Any]) -> bytes:
+    """Encode chart data as gzip-compressed JSON."""
+    payload = json.dumps(
+        {"labels": labels, "values": [_json_value(value) for value in values]},
+        default=float,
+        allow_nan=False,
+    )
+    return gzip.compress(payload.encode("utf-8"), compresslevel=6)
+
+
+def encode_binary_sidecar(labels: List[str], values: List[Any]) -> bytes:
+    """Encode chart data as label JSON followed by a float64 value array."""
+    labels_bytes = json.dumps(labels).encode("utf-8")
+    padding = -(BINARY_HEADER.size + len(labels_bytes)) % 8
+    numbers = [math.nan if value is None else float(value) for value in values]
+    return b"".join(
+        [
+            BINARY_HEADER.pack(BINARY_MAGIC, len(numbers), len(labels_bytes), 0),
+            labels_bytes,
+            b"\0" * padding,
+            struct.pack(f"<{len(numbers)}d", *numbers),
+        ]
+    )
+
+
+def sidecar_name(chart_id: str, data_format: str) -> Optional[str]:
+    """File name of a chart's data sidecar, or None for inline data."""
+    suffix = SIDECAR_SUFFIXES.get(data_format)
+    return f"chart_{chart_id}{suffix}" if suffix else None
+
+
+def get_chart(
+    chart_id: str, data_format: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up a chart by id, falling back to files left by earlier processes.
+
+    Args:
+        chart_id: Chart id returned when the chart was generated
+        data_format: The chart's data format when known; a chart found on
+            disk only counts when its sidecar (if any) is there too
+    """
+    with _CHART_INDEX_LOCK:
+        entry = _CHART_INDEX.get(chart_id)
+    if entry is not None:
+        files = [entry["file_path"], entry.get("data_file")]
+        if all(Path(path).exists() for path in files if path):
+            return entry
+        # Deleted from disk since it was indexed; forget it so it is rewritten
+        with _CHART_INDEX_LOCK:
+            if _CHART_INDEX.get(chart_id) is entry:
+                del _CHART_INDEX[chart_id]
+
+    filepath = CHARTS_DIR / f"chart_{chart_id}.html"
+    if not filepath.exists():
+        return None
+
+    # Sidecar formats first: an unknown format is inline only without a sidecar
+    formats = [data_format] if data_format else ["json", "binary", "inline"]
+    for candidate in formats:
+        data_file = sidecar_name(chart_id, candidate)
+        if data_file is None or (CHARTS_DIR / data_file).exists():
+            break
+    else:
+        return None
+
+    entry = {
+        "chart_id": chart_id,
+        "file_path": str(filepath.absolute()),
+        "data_format": candidate,
+        "data_file": str((CHARTS_DIR / data_file).absolute()) if data_file else None,
+    }
+    with _CHART_INDEX_LOCK:
+        return _CHART_INDEX.setdefault(chart_id, entry)
+
+
 def generate_chart_html(
     data: List[Dict[str, Any]],
     chart_type: str,
@@ -30,6 +161,7 @@ def generate_chart_html(
     y_column: str,
     title: str = "Data Visualization",
     open_browser: bool = False,
+    data_format: str = "inline",
 ) -> Dict[str, Any]:
     """
     Generate a static HTML file with an embedded Chart.js visualization.
@@ -41,11 +173,21 @@ def generate_chart_html(
         y_column: Column name for values/Y-axis
         title: Chart title
         open_browser: Whether to automatically open the chart in browser
+        data_format: "inline" embeds the data in the page; "json" (gzip JSON)
+            or "binary" (float64 typed array) write a sidecar file that the
+            page fetches after rendering, for charts with very many points
     
     Returns:
-        Dictionary with success status and file path
+        Dictionary with success status and file path. Identical requests are
+        served from the chart index without rewriting the file (``cached``).
     """
     try:
+        if data_format not in DATA_FORMATS:
+            return {
+                "success": False,
+                "error": f"Unknown data_format '{data_format}', expected one of {DATA_FORMATS}",
+            }
+
         ensure_charts_dir()
         
         # Extract data
@@ -58,37 +200,75 @@ def generate_chart_html(
                 "error": f"Columns '{x_column}' or '{y_column}' not found in data"
             }
         
-        # Generate chart ID and filename
-        chart_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"chart_{timestamp}_{chart_id}.html"
+        # Chart ID is derived from the content, so repeats are free
+        chart_id = chart_key(
+            chart_type, x_column, y_column, title, labels, values, data_format
+        )[:16]
+        existing = get_chart(chart_id, data_format)
+        if existing is not None:
+            return {
+                "success": True,
+                "chart_id": chart_id,
+                "file_path": existing["file_path"],
+                "cached": True,
+                "message": f"Chart already exists at {Path(existing['file_path']).name}",
+            }
+
+        filename = f"chart_{chart_id}.html"
         filepath = CHARTS_DIR / filename
-        
-        # Generate colors
-        colors = generate_colors(len(labels))
+
+        # Large charts ship their data in a sidecar so the HTML stays tiny
+        data_file = sidecar_name(chart_id, data_format)
+        if data_format == "json":
+            _write_atomic(CHARTS_DIR / data_file, encode_json_sidecar(labels, values))
+        elif data_format == "binary":
+            _write_atomic(CHARTS_DIR / data_file, encode_binary_sidecar(labels, values))
         
         # Create HTML content
         html_content = create_chart_html(
             title=title,
             chart_type=chart_type,
-            labels=labels,
-            values=values,
-            colors=colors,
+            labels=labels if data_file is None else [],
+            values=values if data_file is None else [],
+            colors=generate_colors(len(labels)) if data_file is None else [],
             x_label=x_column,
             y_label=y_column,
+            data_url=data_file,
+            data_format=data_format,
+            data_count=len(values),
         )
         
-        # Write file
-        filepath.write_text(html_content)
+        _write_atomic(filepath, html_content.encode("utf-8"))
+
+        with _CHART_INDEX_LOCK:
+            _CHART_INDEX[chart_id] = {
+                "chart_id": chart_id,
+                "file_path": str(filepath.absolute()),
+                "title": title,
+                "chart_type": chart_type,
+                "x_column": x_column,
+                "y_column": y_column,
+                "data_count": len(values),
+                "data_format": data_format,
+                "data_file": str((CHARTS_DIR / data_file).absolute()) if data_file else None,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+            }
         
-        # Open in browser if requested
+        # Open in browser if requested. Browsers refuse fetch() from file://
+        # pages, so sidecar charts are opened through the chart server.
         if open_browser:
-            webbrowser.open(f"file://{filepath.absolute()}")
+            if data_file is None:
+                webbrowser.open(f"file://{filepath.absolute()}")
+            else:
+                from src.chart_server import ensure_chart_server
+
+                webbrowser.open(f"{ensure_chart_server().base_url}/charts/{chart_id}")
         
         return {
             "success": True,
             "chart_id": chart_id,
             "file_path": str(filepath.absolute()),
+            "cached": False,
             "message": f"Chart saved to {filepath.name}" + (" and opened in browser" if open_browser else ""),
         }
         
@@ -122,8 +302,15 @@ def create_chart_html(
     colors: List[str],
     x_label: str,
     y_label: str,
+    data_url: Optional[str] = None,
+    data_format: str = "inline",
+    data_count: Optional[int] = None,
 ) -> str:
-    """Create the HTML content for the chart."""
+    """Create the HTML content for the chart.
+
+    When ``data_url`` is given the page embeds no data; it renders the shell
+    and then fetches and decodes the sidecar in ``data_format``.
+    """
     
     # Map chart types
     chart_type_map = {
@@ -139,6 +326,41 @@ def create_chart_html(
     labels_json = json.dumps(labels)
     values_json = json.dumps(values)
     colors_json = json.dumps(colors)
+    base_colors_json = json.dumps(generate_colors(10))
+    if data_count is None:
+        data_count = len(values)
+
+    if data_url is None:
+        load_data_js = f"""const chartData = Promise.resolve({{
+            labels: {labels_json},
+            values: {values_json},
+            colors: {colors_json},
+        }});"""
+    else:
+        load_data_js = f"""const dataUrl = {json.dumps(data_url)};
+        const dataFormat = {json.dumps(data_format)};
+        const baseColors = {base_colors_json};
+
+        async function loadChartData() {{
+            const response = await fetch(dataUrl);
+            if (!response.ok) throw new Error('HTTP ' + response.status);
+            let labels, values;
+            if (dataFormat === 'json') {{
+                const stream = response.body.pipeThrough(new DecompressionStream('gzip'));
+                ({{ labels, values }} = await new Response(stream).json());
+            }} else {{
+                const buffer = await response.arrayBuffer();
+                const header = new DataView(buffer, 0, 16);
+                const count = header.getUint32(4, true);
+                const labelsLength = header.getUint32(8, true);
+                labels = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 16, labelsLength)));
+                const offset = 16 + labelsLength + ((8 - (16 + labelsLength) % 8) % 8);
+                values = Array.from(new Float64Array(buffer, offset, count));
+            }}
+            const colors = labels.map((_, i) => baseColors[i % baseColors.length]);
+            return {{ labels, values, colors }};
+        }}
+        const chartData = loadChartData();"""
     
     html = f"""<!DOCTYPE html>
 <html lang="en">
@@ -196,61 +418,70 @@ def create_chart_html(
         </div>
         <div class="meta">
             <span><strong>Chart Type:</strong> {chart_type}</span>
-            <span><strong>Data Points:</strong> {len(values)}</span>
+            <span><strong>Data Points:</strong> {data_count}</span>
             <span><strong>Generated:</strong> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</span>
+            <span id="status"></span>
         </div>
     </div>
     
     <script>
         const ctx = document.getElementById('chart').getContext('2d');
-        const labels = {labels_json};
-        const values = {values_json};
-        const colors = {colors_json};
-        
-        new Chart(ctx, {{
-            type: '{js_chart_type}',
-            data: {{
-                labels: labels,
-                datasets: [{{
-                    label: '{y_label}',
-                    data: values,
-                    backgroundColor: colors,
-                    borderColor: colors.map(c => c.replace('0.8', '1')),
-                    borderWidth: 2,
-                    tension: 0.3,
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                plugins: {{
-                    legend: {{
-                        labels: {{ color: '#eee' }}
-                    }},
-                    title: {{
-                        display: false
-                    }}
+        {load_data_js}
+
+        function renderChart({{ labels, values, colors }}) {{
+            // Skip animation for large charts so the first paint stays fast
+            const large = values.length > 10000;
+            new Chart(ctx, {{
+                type: '{js_chart_type}',
+                data: {{
+                    labels: labels,
+                    datasets: [{{
+                        label: '{y_label}',
+                        data: values,
+                        backgroundColor: colors,
+                        borderColor: colors.map(c => c.replace('0.8', '1')),
+                        borderWidth: 2,
+                        tension: 0.3,
+                    }}]
                 }},
-                scales: {{
-                    x: {{
-                        ticks: {{ color: '#aaa' }},
-                        grid: {{ color: 'rgba(255,255,255,0.1)' }},
+                options: {{
+                    responsive: true,
+                    animation: large ? false : undefined,
+                    normalized: true,
+                    plugins: {{
+                        legend: {{
+                            labels: {{ color: '#eee' }}
+                        }},
                         title: {{
-                            display: true,
-                            text: '{x_label}',
-                            color: '#aaa'
+                            display: false
                         }}
                     }},
-                    y: {{
-                        ticks: {{ color: '#aaa' }},
-                        grid: {{ color: 'rgba(255,255,255,0.1)' }},
-                        title: {{
-                            display: true,
-                            text: '{y_label}',
-                            color: '#aaa'
+                    scales: {{
+                        x: {{
+                            ticks: {{ color: '#aaa' }},
+                            grid: {{ color: 'rgba(255,255,255,0.1)' }},
+                            title: {{
+                                display: true,
+                                text: '{x_label}',
+                                color: '#aaa'
+                            }}
+                        }},
+                        y: {{
+                            ticks: {{ color: '#aaa' }},
+                            grid: {{ color: 'rgba(255,255,255,0.1)' }},
+                            title: {{
+                                display: true,
+                                text: '{y_label}',
+                                color: '#aaa'
+                            }}
                         }}
                     }}
                 }}
-            }}
+            }});
+        }}
+
+        chartData.then(renderChart).catch(err => {{
+            document.getElementById('status').textContent = 'Failed to load data: ' + err.message;
         }});
     </script>
 </body>
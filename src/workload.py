@@ -0,0 +1,308 @@
+"""Persistent per-fingerprint statistics about the queries agents run.
+
+Every query call is reduced to a literal-stripped fingerprint and counted in
+a local SQLite database, so the most frequent and most expensive query shapes
+can be reported (``snowflake_workload_stats`` tool or ``python -m
+src.workload``). Calls answered from the query cache or by sharing an
+identical in-flight execution count as calls (flagged ``cached`` or
+``coalesced``); latency, row count and result size accumulate over the
+executions that actually reached the warehouse.
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.admission import get_admission_controller
+from src.config import WORKLOAD_DB_PATH, WORKLOAD_TRACKING_ENABLED
+from src.sql_utils import fingerprint, normalize_sql
+
+logger = logging.getLogger(__name__)
+
+# Calls that ran on the warehouse (never 0 in a division)
+EXECUTIONS = "MAX(calls - cached_calls - coalesced_calls, 1)"
+
+ORDER_COLUMNS = {
+    "total_ms": "total_ms",
+    "mean_ms": f"total_ms * 1.0 / {EXECUTIONS}",
+    "max_ms": "max_ms",
+    "calls": "calls",
+    "rows": "total_rows",
+    "bytes": "total_bytes",
+    "errors": "errors",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_stats (
+    fingerprint TEXT PRIMARY KEY,
+    normalized_sql TEXT NOT NULL,
+    sample_sql TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    cached_calls INTEGER NOT NULL DEFAULT 0,
+    coalesced_calls INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    total_ms REAL NOT NULL DEFAULT 0,
+    max_ms REAL NOT NULL DEFAULT 0,
+    total_rows INTEGER NOT NULL DEFAULT 0,
+    total_bytes INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS materializations (
+    normalized_sql TEXT PRIMARY KEY,
+    object_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    ddl TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class WorkloadStore:
+    """SQLite-backed accumulator of query statistics keyed by fingerprint."""
+
+    def __init__(self, path: Path = WORKLOAD_DB_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Several server processes may share the file: WAL plus a busy
+            # timeout lets them write without "database is locked" errors
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def record(
+        self,
+        sql: str,
+        elapsed_ms: float,
+        rows: int = 0,
+        result_bytes: int = 0,
+        error: bool = False,
+        cached: bool = False,
+        coalesced: bool = False,
+    ) -> str:
+        """
+        Accumulate one call of ``sql`` and return its fingerprint.
+
+        ``cached`` and ``coalesced`` calls were answered without running the
+        query; they count towards ``calls`` but not the execution statistics.
+        """
+        key = fingerprint(sql)
+        now = time.time()
+        if cached or coalesced:
+            elapsed_ms, rows, result_bytes, error = 0.0, 0, 0, False
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT INTO query_stats (
+                    fingerprint, normalized_sql, sample_sql, calls, cached_calls,
+                    coalesced_calls, errors, total_ms, max_ms, total_rows,
+                    total_bytes, first_seen, last_seen
+                ) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(fingerprint) DO UPDATE SET
+                    sample_sql = excluded.sample_sql,
+                    calls = calls + 1,
+                    cached_calls = cached_calls + excluded.cached_calls,
+                    coalesced_calls = coalesced_calls + excluded.coalesced_calls,
+                    errors = errors + excluded.errors,
+                    total_ms = total_ms + excluded.total_ms,
+                    max_ms = MAX(max_ms, excluded.max_ms),
+                    total_rows = total_rows + excluded.total_rows,
+                    total_bytes = total_bytes + excluded.total_bytes,
+                    last_seen = excluded.last_seen
+                """,
+                (
+                    key,
+                    normalize_sql(sql),
+                    sql,
+                    int(cached),
+                    int(coalesced),
+                    int(error),
+                    elapsed_ms,
+                    elapsed_ms,
+                    rows,
+                    result_bytes,
+                    now,
+                    now,
+                ),
+            )
+            conn.commit()
+        return key
+
+    def top(self, limit: int = 10, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """Return the heaviest fingerprints by the given statistic."""
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(
+                f"Unknown order_by '{order_by}', expected one of {tuple(ORDER_COLUMNS)}"
+            )
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                f"""
+                SELECT fingerprint, normalized_sql, sample_sql, calls, cached_calls,
+                       coalesced_calls, errors, total_ms,
+                       total_ms * 1.0 / {EXECUTIONS} AS mean_ms, max_ms,
+                       total_rows, total_bytes, first_seen, last_seen
+                FROM query_stats
+                ORDER BY {ORDER_COLUMNS[order_by]} DESC
+                LIMIT ?
+                """,
+                (limit,),
+            )
+            names = [desc[0] for desc in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the statistics of one fingerprint, or None if never seen."""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                f"""
+                SELECT fingerprint, normalized_sql, calls, cached_calls,
+                       coalesced_calls, errors, total_ms,
+                       total_ms * 1.0 / {EXECUTIONS} AS mean_ms, max_ms
+                FROM query_stats WHERE fingerprint = ?
+                """,
+                (key,),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([desc[0] for desc in cursor.description], row))
+
+    def register_materialization(
+        self, normalized_sql: str, object_name: str, kind: str, ddl: str
+    ) -> None:
+        """Remember that a query shape is served by a materialized object."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO materializations
+                    (normalized_sql, object_name, kind, ddl, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (normalized_sql, object_name, kind, ddl, time.time()),
+            )
+            conn.commit()
+
+    def materializations(self) -> Dict[str, Dict[str, Any]]:
+        """Return registered materializations keyed by normalized query."""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "SELECT normalized_sql, object_name, kind, ddl, created_at "
+                "FROM materializations"
+            )
+            names = [desc[0] for desc in cursor.description]
+            return {row[0]: dict(zip(names, row)) for row in cursor.fetchall()}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_store: Optional[WorkloadStore] = None
+_store_lock = threading.Lock()
+
+
+def get_workload_store() -> WorkloadStore:
+    """Return the process-wide workload store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WorkloadStore()
+        return _store
+
+
+def record_query(
+    sql: str,
+    elapsed_ms: float,
+    rows: int = 0,
+    result_bytes: int = 0,
+    error: bool = False,
+    cached: bool = False,
+    coalesced: bool = False,
+) -> Optional[str]:
+    """Record a query call; tracking failures never affect the query."""
+    if not WORKLOAD_TRACKING_ENABLED:
+        return None
+    try:
+        return get_workload_store().record(
+            sql, elapsed_ms, rows, result_bytes, error, cached, coalesced
+        )
+    except Exception as e:
+        logger.warning(f"Failed to record workload statistics: {e}")
+        return None
+
+
+def workload_stats(limit: int = 10, order_by: str = "total_ms") -> Dict[str, Any]:
+    """
+    Report the most expensive or most frequent query fingerprints.
+
+    Args:
+        limit: Number of fingerprints to return
+        order_by: Statistic to rank by (total_ms, mean_ms, max_ms, calls,
+            rows, bytes, errors)
+
+    Returns:
+        Dictionary with success status and per-fingerprint statistics
+    """
+    try:
+        queries = get_workload_store().top(min(max(1, limit), 100), order_by)
+        return {
+            "success": True,
+            "data": {
+                "queries": queries,
+                "count": len(queries),
+                "order_by": order_by,
+                "admission": get_admission_controller().stats(),
+            },
+        }
+    except Exception as e:
+        logger.error(f"Error reading workload statistics: {e}")
+        return {"success": False, "error": f"Failed to read workload stats: {str(e)}"}
+
+
+def main() -> None:
+    """Print the top query fingerprints from the workload store."""
+    parser = argparse.ArgumentParser(description="Show top query fingerprints")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--order-by", default="total_ms", choices=sorted(ORDER_COLUMNS))
+    parser.add_argument("--json", action="store_true", help="Print raw JSON")
+    args = parser.parse_args()
+
+    result = workload_stats(args.limit, args.order_by)
+    if not result["success"] or args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(
+        f"{'calls':>7} {'cached':>7} {'total_ms':>11} {'mean_ms':>9} {'rows':>9}  query"
+    )
+    for q in result["data"]["queries"]:
+        shared = q["cached_calls"] + q["coalesced_calls"]
+        print(
+            f"{q['calls']:>7} {shared:>7} {q['total_ms']:>11.0f} {q['mean_ms']:>9.1f} "
+            f"{q['total_rows']:>9}  {q['normalized_sql'][:100]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Fixtures shared by tests that exercise the live (non-mock) tool paths.
+
+Import the fixtures into a test module to use them, e.g.
+``from tests.helpers import live_mode  # noqa: F401``.
+"""
+
+import pytest
+
+from src.result_store import ResultStore
+
+
+@pytest.fixture
+def live_mode(tmp_path, monkeypatch):
+    """
+    Run the Snowflake tools against mocked connections.
+
+    Mock mode, the persistent query cache and workload tracking are off, and
+    stored results spill into a temporary directory. Tests that need the
+    query cache enable it on top of this fixture.
+    """
+    monkeypatch.setattr("src.config.MOCK_MODE", False)
+    monkeypatch.setattr("src.query_cache.QUERY_CACHE_ENABLED", False)
+    monkeypatch.setattr("src.workload.WORKLOAD_TRACKING_ENABLED", False)
+    monkeypatch.setattr(
+        "src.result_store._store", ResultStore(spill_dir=tmp_path / "results")
+    )
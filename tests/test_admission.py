@@ -0,0 +1,118 @@
+"""Unit tests for query admission control."""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.admission import AdmissionController, Overloaded
+from src.pool import ConnectionPool
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+class TestAdmissionController:
+    """Test cases for AdmissionController."""
+
+    def test_immediate_admission(self):
+        """Test that work below the caps starts without queueing."""
+        controller = AdmissionController(max_concurrent=2, max_per_client=2)
+        slot = controller.acquire("small", client="a")
+
+        assert controller.stats()["running"] == 1
+        slot.release()
+        slot.release()
+        assert controller.stats()["running"] == 0
+        assert controller.stats()["admitted"] == 1
+
+    def test_per_client_cap(self):
+        """Test that one client cannot take every slot."""
+        controller = AdmissionController(max_concurrent=4, max_per_client=1, queue_timeout=0.05)
+        controller.acquire("heavy", client="greedy")
+
+        with pytest.raises(Overloaded):
+            controller.acquire("heavy", client="greedy")
+        assert controller.acquire("small", client="polite") is not None
+        assert controller.stats()["timed_out"] == 1
+
+    def test_fast_rejection_when_queue_full(self):
+        """Test that requests beyond the queue length fail immediately."""
+        controller = AdmissionController(max_concurrent=1, max_per_client=5, max_queue=1)
+        controller.acquire("small", client="a")
+        waiter_errors = []
+
+        def waiter():
+            try:
+                controller.acquire("small", client="b", timeout=1)
+            except Overloaded as e:
+                waiter_errors.append(e)
+
+        thread = threading.Thread(target=waiter, daemon=True)
+        thread.start()
+        _wait_until(lambda: controller.stats()["queued"] == 1)
+
+        started = time.perf_counter()
+        with pytest.raises(Overloaded, match="Server busy"):
+            controller.acquire("small", client="c")
+        assert time.perf_counter() - started < 0.5
+        assert controller.stats()["rejected"] == 1
+
+        # The queued waiter times out behind the held slot
+        thread.join(timeout=2)
+        assert len(waiter_errors) == 1
+        assert controller.stats()["timed_out"] == 1
+
+    def test_priority_order(self):
+        """Test that metadata and small work runs before queued heavy scans."""
+        controller = AdmissionController(max_concurrent=1, max_per_client=5)
+        running = controller.acquire("small", client="a")
+        order = []
+
+        def worker(route, client):
+            slot = controller.acquire(route, client=client, timeout=2)
+            order.append(route)
+            slot.release()
+
+        threads = []
+        for route, client in (("heavy", "b"), ("small", "c"), ("metadata", "d")):
+            thread = threading.Thread(target=worker, args=(route, client))
+            thread.start()
+            threads.append(thread)
+            _wait_until(lambda n=len(threads): controller.stats()["queued"] == n)
+
+        assert controller.stats()["queued_by_route"] == {"metadata": 1, "small": 1, "heavy": 1}
+        running.release()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert order == ["metadata", "small", "heavy"]
+        stats = controller.stats()
+        assert stats["admitted"] == 4
+        assert stats["wait_ms_max"] > 0
+
+
+class TestPooledAdmission:
+    """Test cases for releasing admission slots with pooled connections."""
+
+    def test_slot_released_with_connection(self):
+        """Test that closing a pooled connection frees its admission slot."""
+        controller = AdmissionController(max_concurrent=1)
+        pool = ConnectionPool("small", {}, connect=MagicMock())
+        slot = controller.acquire("small", client="a")
+
+        conn = pool.acquire(on_release=slot.release)
+        assert controller.stats()["running"] == 1
+        conn.close()
+
+        assert controller.stats()["running"] == 0
@@ -0,0 +1,177 @@
+"""Unit tests for the materialization advisor."""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import advisor
+from src.sql_utils import split_tail
+from src.tools.snowflake_tools import query_snowflake
+from src.workload import WorkloadStore
+
+HOT_QUERY = (
+    "SELECT product_category, SUM(total_revenue) AS revenue "
+    "FROM DAILY_SALES_SUMMARY GROUP BY product_category ORDER BY revenue DESC LIMIT 10"
+)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    workload = WorkloadStore(tmp_path / "workload.sqlite3")
+    monkeypatch.setattr(advisor, "get_workload_store", lambda: workload)
+    monkeypatch.setattr(advisor, "_registry", None)
+    monkeypatch.setattr(advisor.config, "WORKLOAD_DB_PATH", workload.path)
+    yield workload
+    workload.close()
+
+
+class TestSplitTail:
+    """Test cases for separating ORDER BY / LIMIT from the query core."""
+
+    def test_splits_order_and_limit(self):
+        """Test that the trailing clauses are returned separately."""
+        core, tail = split_tail("select a, sum(b) from t group by a order by 2 desc limit 5;")
+
+        assert core == "select a, sum(b) from t group by a"
+        assert tail == "order by 2 desc limit 5"
+
+    def test_no_tail(self):
+        """Test a query without ORDER BY or LIMIT."""
+        assert split_tail("SELECT COUNT(*) FROM t") == ("SELECT COUNT(*) FROM t", "")
+
+
+class TestFindCandidates:
+    """Test cases for ranking materialization candidates."""
+
+    def test_hot_aggregate_is_eligible(self, store):
+        """Test that a repeated aggregate over one view gets DDL."""
+        for _ in range(3):
+            store.record(HOT_QUERY, 2000.0)
+
+        [candidate] = advisor.find_candidates(min_calls=3, store=store)
+
+        assert candidate["eligible"]
+        assert candidate["calls"] == 3
+        assert candidate["estimated_savings_ms"] == 6000.0
+        assert candidate["tail"] == "ORDER BY revenue DESC LIMIT 10"
+        assert "GROUP BY product_category" in candidate["ddl"]
+        assert "LIMIT" not in candidate["ddl"]
+
+    def test_infrequent_and_non_aggregate_queries(self, store):
+        """Test the call threshold and the aggregate requirement."""
+        store.record(HOT_QUERY, 2000.0)
+        for _ in range(3):
+            store.record("SELECT * FROM DAILY_SALES_SUMMARY", 10.0)
+
+        [candidate] = advisor.find_candidates(min_calls=3, store=store)
+
+        assert not candidate["eligible"]
+        assert "aggregate" in candidate["reason"]
+
+    def test_literal_filters_are_not_materialized(self, store):
+        """Test that a shape with varying literals is reported, not materialized."""
+        for day in ("2024-01-01", "2024-01-02", "2024-01-03"):
+            store.record(
+                "SELECT SUM(total_revenue) FROM DAILY_SALES_SUMMARY "
+                f"WHERE transaction_date = '{day}'",
+                500.0,
+            )
+
+        [candidate] = advisor.find_candidates(min_calls=3, store=store)
+
+        assert not candidate["eligible"]
+        assert "literal" in candidate["reason"]
+
+    def test_dynamic_table_ddl(self):
+        """Test the generated dynamic table statement."""
+        ddl = advisor.build_ddl("DB.GOLD.MCP_AGG_X", "SELECT 1", "dynamic_table")
+
+        assert ddl.startswith("CREATE DYNAMIC TABLE IF NOT EXISTS DB.GOLD.MCP_AGG_X")
+        assert "TARGET_LAG" in ddl
+        with pytest.raises(ValueError):
+            advisor.build_ddl("X", "SELECT 1", "index")
+
+
+class TestRewrite:
+    """Test cases for routing queries to registered materializations."""
+
+    def _register(self, store):
+        for _ in range(3):
+            store.record(HOT_QUERY, 2000.0)
+        [candidate] = advisor.find_candidates(store=store)
+        conn = MagicMock()
+        with patch(
+            "src.tools.snowflake_tools.get_snowflake_connection", return_value=conn
+        ):
+            advisor.create_materialization(candidate, store=store)
+        conn.cursor.return_value.execute.assert_called_once_with(candidate["ddl"])
+        return candidate
+
+    def test_matching_query_is_rewritten(self, store):
+        """Test that formatting differences and a new tail still match."""
+        candidate = self._register(store)
+
+        rewritten = advisor.rewrite_query(
+            "select product_category, sum(total_revenue) as revenue\n"
+            "from daily_sales_summary group by product_category limit 3;"
+        )
+
+        assert rewritten == f"SELECT * FROM {candidate['object_name']} limit 3"
+
+    def test_approximation_is_reported_as_skipped(self, store, monkeypatch):
+        """Test that approximate mode says a materialization served the query."""
+        self._register(store)
+        monkeypatch.setattr("src.config.MOCK_MODE", True)
+        monkeypatch.setattr("src.workload.WORKLOAD_TRACKING_ENABLED", False)
+
+        data = query_snowflake(HOT_QUERY, approximate=True)["data"]
+
+        assert data["original_query"] == HOT_QUERY
+        assert data["approximation"]["applied"] is False
+        assert "materialization" in data["approximation"]["notes"][0]
+
+    def test_registered_shape_is_not_suggested_again(self, store):
+        """Test that the advisor skips shapes that are already materialized."""
+        self._register(store)
+
+        assert advisor.find_candidates(store=store) == []
+
+    def test_non_matching_queries_are_left_alone(self, store):
+        """Test different queries and tails that need the original columns."""
+        self._register(store)
+
+        assert advisor.rewrite_query("SELECT COUNT(*) FROM DAILY_SALES_SUMMARY") is None
+        assert (
+            advisor.rewrite_query(
+                "SELECT product_category, SUM(total_revenue) AS revenue "
+                "FROM DAILY_SALES_SUMMARY GROUP BY product_category "
+                "ORDER BY SUM(total_revenue) DESC"
+            )
+            is None
+        )
+
+    def test_no_registry_means_no_rewrite(self, store):
+        """Test that an empty registry never rewrites."""
+        assert advisor.rewrite_query(HOT_QUERY) is None
+
+
+class TestAdvise:
+    """Test cases for the advise() tool entry point."""
+
+    def test_create_requires_flag(self, store):
+        """Test that creation is refused unless explicitly enabled."""
+        for _ in range(3):
+            store.record(HOT_QUERY, 2000.0)
+
+        with patch.object(advisor, "create_materialization") as create:
+            result = advisor.advise(create=True)
+
+        create.assert_not_called()
+        assert result["success"]
+        assert result["data"]["created"] == []
+        assert "MATERIALIZATION_AUTO_CREATE" in result["data"]["notes"][0]
@@ -0,0 +1,209 @@
+"""Unit tests for key-pair and OAuth credentials."""
+
+import io
+import json
+import os
+import sys
+import time
+from dataclasses import replace
+from unittest.mock import patch
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import auth, config
+from src.auth import OAuthTokenCache, connection_auth_params, load_private_key
+
+
+@pytest.fixture
+def key_file(tmp_path):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = tmp_path / "rsa_key.p8"
+    path.write_bytes(
+        key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.BestAvailableEncryption(b"secret"),
+        )
+    )
+    return path
+
+
+def _use_settings(monkeypatch, **values):
+    monkeypatch.setattr(config, "_settings", replace(config.get_settings(), **values))
+
+
+def _token_response(token, expires_in=600, **extra):
+    payload = {"access_token": token, "expires_in": expires_in, **extra}
+    return io.BytesIO(json.dumps(payload).encode())
+
+
+class TestKeyPair:
+    """Test cases for key-pair (JWT) authentication."""
+
+    def test_key_is_decrypted_once(self, key_file):
+        """Test that the decrypted key is reused across connections."""
+        with patch(
+            "cryptography.hazmat.primitives.serialization.load_pem_private_key",
+            wraps=serialization.load_pem_private_key,
+        ) as loader:
+            first = load_private_key(str(key_file), "secret")
+            second = load_private_key(str(key_file), "secret")
+
+        assert loader.call_count == 1
+        assert first is second
+        assert serialization.load_der_private_key(first, password=None).key_size == 2048
+
+    def test_connection_params(self, key_file, monkeypatch):
+        """Test the connector arguments for snowflake_jwt."""
+        _use_settings(
+            monkeypatch,
+            authenticator="snowflake_jwt",
+            private_key_path=str(key_file),
+            private_key_passphrase="secret",
+        )
+
+        params = connection_auth_params()
+
+        assert params["authenticator"] == "SNOWFLAKE_JWT"
+        assert isinstance(params["private_key"], bytes)
+
+
+class TestOAuthTokenCache:
+    """Test cases for OAuth token caching and refresh."""
+
+    @pytest.fixture(autouse=True)
+    def oauth_config(self, monkeypatch):
+        _use_settings(
+            monkeypatch,
+            oauth_token=None,
+            oauth_refresh_token="refresh",
+            oauth_token_url="https://idp.example/token",
+            oauth_client_id="client",
+            oauth_client_secret="shh",
+        )
+
+    def test_token_is_refreshed_once_and_shared(self, tmp_path):
+        """Test that a second process reads the cached token from disk."""
+        path = tmp_path / "oauth_token.json"
+        with patch(
+            "src.auth.urllib.request.urlopen", return_value=_token_response("tok1")
+        ) as urlopen:
+            assert OAuthTokenCache(path).get_token() == "tok1"
+            assert OAuthTokenCache(path).get_token() == "tok1"
+
+        assert urlopen.call_count == 1
+        body = urlopen.call_args.args[0].data.decode()
+        assert "grant_type=refresh_token" in body
+        assert "client_id=client" in body
+        assert oct(path.stat().st_mode & 0o777) == "0o600"
+
+    def test_expiring_token_is_refreshed(self, tmp_path):
+        """Test refresh shortly before expiry."""
+        cache = OAuthTokenCache(tmp_path / "oauth_token.json")
+        with patch(
+            "src.auth.urllib.request.urlopen",
+            side_effect=[_token_response("old", expires_in=30), _token_response("new")],
+        ):
+            assert cache.get_token() == "old"
+            assert cache.get_token() == "new"
+
+    def test_static_token(self, tmp_path, monkeypatch):
+        """Test a fixed access token without refresh configuration."""
+        _use_settings(monkeypatch, oauth_refresh_token=None, oauth_token="static")
+
+        assert OAuthTokenCache(tmp_path / "t.json").get_token() == "static"
+
+    def test_cached_token_from_disk_is_used(self, tmp_path):
+        """Test that a valid token written by another process skips the refresh."""
+        path = tmp_path / "oauth_token.json"
+        token = {
+            "access_token": "disk",
+            "expires_at": time.time() + 900,
+            "issued_for": auth._issued_for(config.get_settings()),
+        }
+        path.write_text(json.dumps(token))
+
+        with patch("src.auth.urllib.request.urlopen") as urlopen:
+            assert OAuthTokenCache(path).get_token() == "disk"
+        urlopen.assert_not_called()
+
+    def test_new_identity_fetches_a_new_token(self, tmp_path, monkeypatch):
+        """Test that a changed refresh token or user is not served the old token."""
+        monkeypatch.setattr(auth, "CACHE_DIR", tmp_path)
+        cache = OAuthTokenCache()
+        with patch(
+            "src.auth.urllib.request.urlopen",
+            side_effect=[_token_response(token) for token in ("a", "b", "c")],
+        ) as urlopen:
+            assert cache.get_token() == "a"
+            _use_settings(monkeypatch, oauth_refresh_token="switched")
+            assert cache.get_token() == "b"
+            _use_settings(monkeypatch, user="someone_else")
+            assert cache.get_token() == "c"
+
+        body = urlopen.call_args_list[1].args[0].data.decode()
+        assert "refresh_token=switched" in body
+
+    def test_token_for_another_identity_is_not_reused(self, tmp_path, monkeypatch):
+        """Test that a shared cache file written for another user is refreshed."""
+        path = tmp_path / "oauth_token.json"
+        with patch(
+            "src.auth.urllib.request.urlopen",
+            side_effect=[_token_response("old"), _token_response("new")],
+        ):
+            assert OAuthTokenCache(path).get_token() == "old"
+            _use_settings(monkeypatch, user="someone_else")
+            assert OAuthTokenCache(path).get_token() == "new"
+
+    def test_rotated_refresh_token_is_persisted(self, tmp_path, monkeypatch):
+        """Test that the next refresh uses the refresh token issued last."""
+        path = tmp_path / "oauth_token.json"
+        with patch(
+            "src.auth.urllib.request.urlopen",
+            side_effect=[
+                _token_response("tok1", expires_in=30, refresh_token="rotated"),
+                _token_response("tok2", expires_in=30),
+                _token_response("tok3"),
+            ],
+        ) as urlopen:
+            assert OAuthTokenCache(path).get_token() == "tok1"
+            assert json.loads(path.read_text())["refresh_token"] == "rotated"
+            assert OAuthTokenCache(path).get_token() == "tok2"
+            # A newly configured refresh token wins over the rotated one
+            _use_settings(monkeypatch, oauth_refresh_token="reissued")
+            assert OAuthTokenCache(path).get_token() == "tok3"
+
+        sent = [call.args[0].data.decode() for call in urlopen.call_args_list]
+        assert "refresh_token=refresh" in sent[0]
+        assert "refresh_token=rotated" in sent[1]
+        assert "refresh_token=reissued" in sent[2]
+
+    def test_cache_file_per_account_and_client(self, tmp_path, monkeypatch):
+        """Test that different accounts or clients never share a token."""
+        monkeypatch.setattr(auth, "CACHE_DIR", tmp_path)
+        cache = OAuthTokenCache()
+        with patch(
+            "src.auth.urllib.request.urlopen",
+            side_effect=[_token_response("a"), _token_response("b")],
+        ):
+            _use_settings(monkeypatch, account="acct1")
+            assert cache.get_token() == "a"
+            _use_settings(monkeypatch, account="acct2")
+            assert cache.get_token() == "b"
+
+        assert len(list((tmp_path / "auth").glob("oauth_token_*.json"))) == 2
+
+
+class TestExternalBrowser:
+    """Test cases for browser SSO."""
+
+    def test_id_token_cache_enabled(self, monkeypatch):
+        """Test that the connector's ID-token cache is turned on."""
+        _use_settings(monkeypatch, authenticator="externalbrowser")
+
+        assert connection_auth_params() == {"client_store_temporary_credential": True}
@@ -0,0 +1,184 @@
+"""Unit tests for the query-to-chart pipeline."""
+
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import visualize
+from src.query_cache import QueryCache
+from src.tools.snowflake_tools import CHART_ROWS_COLUMN, chart_query, query_snowflake
+from tests.helpers import live_mode  # noqa: F401
+
+
+@pytest.fixture(autouse=True)
+def charts_dir(live_mode, tmp_path, monkeypatch):
+    """Write charts to a temp directory with an empty index."""
+    monkeypatch.setattr(visualize, "CHARTS_DIR", tmp_path)
+    monkeypatch.setattr(visualize, "_CHART_INDEX", {})
+
+
+def make_connection(rows, columns=("CATEGORY", "REVENUE")):
+    """Build a mock connection whose cursor returns the given rows."""
+    mock_cursor = Mock()
+    mock_cursor.description = [(name,) for name in columns]
+    mock_cursor.sfqid = "01b2-0000"
+    mock_cursor.fetchall.return_value = [dict(zip(columns, row)) for row in rows]
+    mock_conn = Mock()
+    mock_conn.cursor.return_value = mock_cursor
+    return mock_conn
+
+
+def grouped(rows):
+    """Mock connection returning rows as the pushed-down GROUP BY would."""
+    return make_connection(rows, ("CATEGORY", "REVENUE", CHART_ROWS_COLUMN))
+
+
+def executed_sql(mock_get_conn):
+    return mock_get_conn.return_value.cursor.return_value.execute.call_args[0][0]
+
+
+class TestChartQuery:
+    """Test cases for chart_query."""
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_returns_summary_without_rows(self, mock_get_conn):
+        """Test that only chart location and summary come back."""
+        mock_get_conn.return_value = grouped([("Food", 12, 2), ("Home", 5, 1)])
+
+        result = chart_query(
+            "SELECT category, revenue FROM sales", "category", "revenue",
+            open_browser=False,
+        )
+
+        assert result["success"] is True
+        assert "rows" not in result
+        assert "url" not in result
+        assert os.path.exists(result["file_path"])
+        assert result["summary"]["rows_scanned"] == 3
+        assert result["summary"]["points"] == 2
+        assert result["summary"]["y_total"] == 17.0
+
+    @pytest.mark.parametrize(
+        "aggregate,expected",
+        [("sum", "SUM(revenue) AS revenue"), ("avg", "AVG(revenue) AS revenue"),
+         ("max", "MAX(revenue) AS revenue"), ("min", "MIN(revenue) AS revenue"),
+         ("count", "COUNT(*) AS revenue")],
+    )
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_aggregates_are_pushed_down(self, mock_get_conn, aggregate, expected):
+        """Test that the aggregate runs in Snowflake as a GROUP BY."""
+        mock_get_conn.return_value = grouped([("Food", 12, 2), ("Home", 5, 1)])
+
+        with patch("src.visualize.generate_chart_html") as mock_chart:
+            mock_chart.return_value = {"success": True}
+            chart_query(
+                "select category, revenue from sales;", "category", "revenue",
+                aggregate=aggregate, open_browser=False,
+            )
+
+        assert executed_sql(mock_get_conn) == (
+            f"SELECT category, {expected}, COUNT(*) AS {CHART_ROWS_COLUMN} "
+            "FROM (SELECT category, revenue FROM sales) "
+            "GROUP BY category ORDER BY category LIMIT 500001"
+        )
+        data = mock_chart.call_args.kwargs["data"]
+        assert [row["REVENUE"] for row in data] == [12.0, 5.0]
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_limit_detection_matches_whole_words(self, mock_get_conn):
+        """Test that only a LIMIT ending the outer query counts."""
+        mock_get_conn.return_value = make_connection([("a", 1)])
+
+        chart_query(
+            "SELECT category, credit_limit AS revenue FROM accounts",
+            "CATEGORY", "REVENUE", aggregate="none", open_browser=False,
+        )
+        assert executed_sql(mock_get_conn).endswith("LIMIT 500001")
+
+        chart_query(
+            "SELECT category, revenue FROM sales LIMIT 10",
+            "CATEGORY", "REVENUE", aggregate="none", open_browser=False,
+        )
+        assert executed_sql(mock_get_conn).endswith("LIMIT 10")
+
+        chart_query(
+            "SELECT category, revenue FROM (SELECT * FROM sales LIMIT 10)",
+            "CATEGORY", "REVENUE", aggregate="none", open_browser=False,
+        )
+        assert executed_sql(mock_get_conn).endswith(") LIMIT 500001")
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_repeated_chart_is_served_from_cache(
+        self, mock_get_conn, tmp_path, monkeypatch
+    ):
+        """Test that chart queries go through the persistent query cache."""
+        monkeypatch.setattr("src.query_cache.QUERY_CACHE_ENABLED", True)
+        monkeypatch.setattr("src.query_cache._cache", QueryCache(tmp_path / "cache"))
+        mock_get_conn.return_value = grouped([("Food", 12, 2)])
+
+        first = chart_query(
+            "SELECT * FROM sales", "CATEGORY", "REVENUE", open_browser=False
+        )
+        second = chart_query(
+            "select * from sales", "CATEGORY", "REVENUE", open_browser=False
+        )
+
+        assert mock_get_conn.call_count == 1
+        assert first["summary"]["cached"] is False
+        assert second["summary"]["cached"] is True
+
+    @patch("src.chart_server.ensure_chart_server")
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_large_results_use_sidecar(
+        self, mock_get_conn, mock_server, monkeypatch
+    ):
+        """Test that charts above the threshold are served by the chart server."""
+        monkeypatch.setattr("src.tools.snowflake_tools.CHART_SIDECAR_THRESHOLD", 2)
+        mock_server.return_value.base_url = "http://127.0.0.1:8050"
+        mock_get_conn.return_value = make_connection([("a", 1), ("b", 2), ("c", 3)])
+
+        result = chart_query(
+            "SELECT 1", "CATEGORY", "REVENUE", aggregate="none", open_browser=False
+        )
+
+        chart = visualize.get_chart(result["chart_id"])
+        assert chart["data_format"] == "json"
+        assert result["url"] == f"http://127.0.0.1:8050/charts/{result['chart_id']}"
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_unknown_column(self, mock_get_conn):
+        """Test the error when a chart column is not in the result."""
+        mock_get_conn.return_value = make_connection([("Food", 10)])
+
+        result = chart_query("SELECT 1", "CATEGORY", "PROFIT", aggregate="none")
+
+        assert result["success"] is False
+        assert "PROFIT" in result["error"]
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_chart_from_result_handle(self, mock_get_conn):
+        """Test that a stored query result is charted without re-querying."""
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [
+            {"CATEGORY": "Food", "REVENUE": 10},
+            {"CATEGORY": "Home", "REVENUE": 5},
+        ]
+        mock_cursor.description = [("CATEGORY",), ("REVENUE",)]
+        mock_get_conn.return_value.cursor.return_value = mock_cursor
+
+        query_result = query_snowflake("SELECT category, revenue FROM sales")
+        mock_get_conn.reset_mock()
+
+        result = chart_query(
+            None, "CATEGORY", "REVENUE",
+            result_id=query_result["data"]["result_id"], open_browser=False,
+        )
+
+        assert result["success"] is True
+        assert result["summary"]["y_total"] == 15.0
+        mock_get_conn.assert_not_called()
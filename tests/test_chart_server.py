@@ -0,0 +1,128 @@
+"""Tests for the embedded chart server."""
+
+import gzip
+import http.client
+import json
+import os
+import sys
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import visualize
+from src.chart_server import ChartServer
+from src.visualize import generate_chart_html
+
+SAMPLE_DATA = [{"category": f"Category {i}", "sales": i * 100} for i in range(50)]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Run a chart server over a temporary charts directory."""
+    monkeypatch.setattr(visualize, "CHARTS_DIR", tmp_path)
+    monkeypatch.setattr(visualize, "_CHART_INDEX", {})
+    chart_server = ChartServer(host="127.0.0.1", port=0)
+    chart_server.start()
+    yield chart_server
+    chart_server.stop()
+
+
+@pytest.fixture
+def chart():
+    return generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+
+
+class TestChartServer:
+    """Test cases for serving charts over HTTP."""
+
+    def test_serves_chart_html_by_id(self, server, chart):
+        """Test that a chart id resolves to its HTML file."""
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        conn.request("GET", f"/charts/{chart['chart_id']}")
+        response = conn.getresponse()
+
+        assert response.status == 200
+        assert response.getheader("Content-Type").startswith("text/html")
+        assert b"<canvas" in response.read()
+
+    def test_serves_chart_json_from_index(self, server, chart):
+        """Test the chart metadata endpoint."""
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        conn.request("GET", f"/charts/{chart['chart_id']}/data")
+        data = json.loads(conn.getresponse().read())
+
+        assert data["success"] is True
+        assert data["chart"]["chart_id"] == chart["chart_id"]
+        assert data["chart"]["data_count"] == len(SAMPLE_DATA)
+
+    def test_unknown_chart_returns_404(self, server):
+        """Test that missing charts and path traversal are rejected."""
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        conn.request("GET", "/charts/missing/data")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 404
+
+        conn.request("GET", "/charts/..%2Fsecret")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 404
+
+    def test_keep_alive_and_etag_revalidation(self, server, chart):
+        """Test that one connection serves a 200 followed by a 304."""
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        conn.request("GET", f"/charts/{chart['chart_id']}")
+        first = conn.getresponse()
+        first.read()
+        etag = first.getheader("ETag")
+
+        conn.request(
+            "GET", f"/charts/{chart['chart_id']}", headers={"If-None-Match": etag}
+        )
+        second = conn.getresponse()
+
+        assert first.getheader("Connection") == "keep-alive"
+        assert second.status == 304
+        assert second.read() == b""
+
+    def test_gzip_encoding(self, server, chart):
+        """Test that compressible responses are gzipped on request."""
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        conn.request(
+            "GET",
+            f"/charts/{chart['chart_id']}",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        response = conn.getresponse()
+
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert b"<canvas" in gzip.decompress(response.read())
+
+    def test_gzip_body_has_its_own_etag(self, server, chart):
+        """Test that gzip and identity bodies vary by encoding with distinct ETags."""
+        conn = http.client.HTTPConnection("127.0.0.1", server.port)
+        path = f"/charts/{chart['chart_id']}"
+        conn.request("GET", path)
+        plain = conn.getresponse()
+        plain.read()
+        conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+        zipped = conn.getresponse()
+        zipped.read()
+        gz_etag = zipped.getheader("ETag")
+
+        assert plain.getheader("Vary") == zipped.getheader("Vary") == "Accept-Encoding"
+        assert gz_etag == plain.getheader("ETag")[:-1] + '-gz"'
+
+        conn.request("GET", path, headers={"If-None-Match": gz_etag})
+        mismatched = conn.getresponse()
+        mismatched.read()
+        conn.request(
+            "GET", path, headers={"Accept-Encoding": "gzip", "If-None-Match": gz_etag}
+        )
+        revalidated = conn.getresponse()
+
+        assert mismatched.status == 200
+        assert revalidated.status == 304
+        assert revalidated.getheader("Vary") == "Accept-Encoding"
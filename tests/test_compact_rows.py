@@ -0,0 +1,90 @@
+"""Unit tests for compact result rows."""
+
+import json
+import os
+import pickle
+import sys
+from array import array
+from decimal import Decimal
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.compact_rows import CompactRows, RowView
+from src.serialization import dumps
+
+ROWS = [
+    {
+        "ID": i,
+        "REGION": ("NORTH", "SOUTH", "EAST")[i % 3],
+        "SALES": i * 1.5,
+        "MARGIN": Decimal("0.25") if i % 2 else None,
+    }
+    for i in range(1000)
+]
+COLUMNS = ["ID", "REGION", "SALES", "MARGIN"]
+
+
+@pytest.fixture
+def rows():
+    return CompactRows.from_rows(ROWS, COLUMNS)
+
+
+class TestCompactRows:
+    """Test cases for CompactRows."""
+
+    def test_rows_read_like_dicts(self, rows):
+        """Test that row views behave like the original row dicts."""
+        assert len(rows) == 1000
+        assert rows == ROWS
+        assert rows[-1]["ID"] == 999
+        assert rows[1].get("MARGIN") == Decimal("0.25")
+        assert rows[0].get("MISSING", "n/a") == "n/a"
+        assert dict(rows[2]) == ROWS[2]
+        assert [row["ID"] for row in rows[10:13]] == [10, 11, 12]
+        with pytest.raises(IndexError):
+            rows[1000]
+
+    def test_row_views_have_no_instance_dict(self, rows):
+        """Test that row views are slot-only objects."""
+        assert isinstance(rows[0], RowView)
+        assert not hasattr(rows[0], "__dict__")
+
+    def test_typed_columns(self, rows):
+        """Test that NULL-free numeric columns are packed into arrays."""
+        assert isinstance(rows._data[0], array)
+        assert isinstance(rows._data[2], array)
+        assert isinstance(rows._data[3], list)
+        # Equal strings are stored once
+        assert rows[0]["REGION"] is rows[3]["REGION"]
+
+    def test_footprint_smaller_than_dicts(self, rows):
+        """Test that the measured footprint is well under the row dicts'."""
+        dict_bytes = sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+            for row in ROWS
+        )
+
+        assert 0 < rows.nbytes() < dict_bytes / 3
+
+    def test_pickle_and_json(self, rows):
+        """Test the spill and response encodings."""
+        assert pickle.loads(pickle.dumps(rows)) == ROWS
+        encoded = json.loads(dumps({"rows": rows, "first": rows[1]}))
+        assert encoded["rows"][1] == {
+            "ID": 1,
+            "REGION": "SOUTH",
+            "SALES": 1.5,
+            "MARGIN": 0.25,
+        }
+        assert encoded["first"] == encoded["rows"][1]
+
+    def test_extra_keys_are_kept(self):
+        """Test that keys missing from the column list are appended."""
+        rows = CompactRows.from_rows([{"A": 1}, {"A": 2, "B": "x"}], ["A"])
+
+        assert rows.columns == ["A", "B"]
+        assert rows[0]["B"] is None
+        assert CompactRows.from_rows(rows) is rows
@@ -0,0 +1,126 @@
+"""Unit tests for EXPLAIN-based cost pre-flight checks."""
+
+import json
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import cost
+from src.cost import over_budget, parse_plan, preflight
+from src.tools.snowflake_tools import query_snowflake
+from tests.helpers import live_mode  # noqa: F401
+
+GB = 1024 ** 3
+
+PLAN = json.dumps(
+    {
+        "GlobalStats": {
+            "partitionsTotal": 5000,
+            "partitionsAssigned": 4200,
+            "bytesAssigned": 40 * GB,
+        },
+        "Operations": [[{"id": 0, "operation": "Result"}]],
+    }
+)
+
+
+class TestEstimate:
+    """Test cases for plan parsing and budgets."""
+
+    def test_parse_plan(self):
+        """Test reading the global scan statistics."""
+        assert parse_plan(PLAN) == {
+            "partitions_total": 5000,
+            "partitions_assigned": 4200,
+            "bytes_assigned": 40 * GB,
+        }
+
+    def test_over_budget(self):
+        """Test byte and partition budgets, 0 meaning unlimited."""
+        estimate = parse_plan(PLAN)
+
+        assert "40.0 GB" in over_budget(estimate, max_bytes=10 * GB, max_partitions=0)
+        assert "4200 of 5000" in over_budget(estimate, max_bytes=0, max_partitions=1000)
+        assert over_budget(estimate, max_bytes=0, max_partitions=0) is None
+
+
+class TestPreflight:
+    """Test cases for over-budget actions."""
+
+    @pytest.fixture(autouse=True)
+    def expensive(self, monkeypatch):
+        monkeypatch.setattr(cost, "estimate_cost", lambda query: parse_plan(PLAN))
+        monkeypatch.setattr(cost, "COST_MAX_BYTES", 10 * GB)
+
+    def test_reject(self):
+        """Test that an expensive query is rejected with its estimate."""
+        decision = preflight("SELECT * FROM big", action="reject")
+
+        assert "over the 10.0 GB budget" in decision["rejected"]
+        assert decision["estimate"]["action"] == "reject"
+
+    def test_sample(self):
+        """Test that an aggregate over one source is sampled instead."""
+        decision = preflight("SELECT region, SUM(x) FROM big GROUP BY region", action="sample")
+
+        assert "SAMPLE (10)" in decision["query"]
+        assert decision["approximation"]["sampled"]
+        assert decision["estimate"]["action"] == "sample"
+
+    def test_sample_falls_back_to_reject(self):
+        """Test that queries that cannot be sampled are rejected."""
+        assert "rejected" in preflight("SELECT * FROM big", action="sample")
+
+    def test_route(self):
+        """Test that an expensive query is sent to the heavy warehouse."""
+        assert preflight("SELECT * FROM big", action="route")["route"] == "heavy"
+
+    def test_explain_failure_does_not_block(self, monkeypatch):
+        """Test that a failed EXPLAIN lets the query run."""
+        monkeypatch.setattr(cost, "estimate_cost", Mock(side_effect=RuntimeError("boom")))
+
+        assert preflight("SELECT 1") == {"estimate": None}
+
+
+class TestQueryPreflight:
+    """Test cases for the pre-flight step in query_snowflake."""
+
+    @pytest.fixture(autouse=True)
+    def preflight_enabled(self, live_mode, monkeypatch):
+        monkeypatch.setattr("src.tools.snowflake_tools.COST_PREFLIGHT_ENABLED", True)
+        monkeypatch.setattr(cost, "COST_MAX_BYTES", 10 * GB)
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_rejected_query_is_not_run(self, mock_get_conn):
+        """Test that only the EXPLAIN runs for an over-budget query."""
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (PLAN,)
+        mock_get_conn.return_value.cursor.return_value = mock_cursor
+
+        result = query_snowflake("SELECT * FROM big")
+
+        assert not result["success"]
+        assert result["estimate"]["bytes_assigned"] == 40 * GB
+        mock_cursor.execute.assert_called_once_with(
+            "EXPLAIN USING JSON SELECT * FROM big LIMIT 1000"
+        )
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_estimate_is_returned(self, mock_get_conn, monkeypatch):
+        """Test that the estimate accompanies results within budget."""
+        estimate = {"partitions_total": 10, "partitions_assigned": 1, "bytes_assigned": 1024}
+        monkeypatch.setattr(cost, "estimate_cost", lambda query: estimate)
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [{"N": 1}]
+        mock_cursor.description = [("N",)]
+        mock_get_conn.return_value.cursor.return_value = mock_cursor
+
+        result = query_snowflake("SELECT n FROM t WHERE id = 1")
+
+        assert result["success"]
+        assert result["data"]["estimate"]["bytes_assigned"] == 1024
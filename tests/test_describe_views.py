@@ -0,0 +1,107 @@
+"""Unit tests for bulk view descriptions."""
+
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import schema_index
+from src.schema_index import SchemaIndex
+from src.tools.snowflake_tools import describe_views
+from tests.helpers import live_mode  # noqa: F401
+
+SALES = {"TABLE_SCHEMA": "GOLD", "TABLE_NAME": "SALES"}
+STORES = {"TABLE_SCHEMA": "GOLD", "TABLE_NAME": "STORES"}
+VIEW_ROWS = [
+    {**SALES, "COMMENT": "Daily sales", "CREATED": "c1"},
+    {**STORES, "COMMENT": None, "CREATED": "c2"},
+]
+COLUMN_ROWS = [
+    {**SALES, "COLUMN_NAME": "AMOUNT", "DATA_TYPE": "FLOAT"},
+    {**SALES, "COLUMN_NAME": "DAY", "DATA_TYPE": "DATE"},
+    {**STORES, "COLUMN_NAME": "ID", "DATA_TYPE": "TEXT"},
+]
+
+
+@pytest.fixture
+def cursor():
+    cursor = Mock()
+    cursor.fetchall.side_effect = [VIEW_ROWS, COLUMN_ROWS]
+    return cursor
+
+
+class TestDescribeViews:
+    """Test cases for describe_views."""
+
+    @pytest.fixture(autouse=True)
+    def empty_index(self, live_mode, monkeypatch):
+        monkeypatch.setattr(schema_index, "_index", SchemaIndex())
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_all_views_in_two_queries(self, mock_get_conn, cursor):
+        """Test that the whole schema takes one connection and two queries."""
+        mock_get_conn.return_value.cursor.return_value = cursor
+
+        result = describe_views()
+
+        assert result["success"]
+        assert mock_get_conn.call_count == 1
+        assert cursor.execute.call_count == 2
+        views = result["data"]["views"]
+        assert [c["name"] for c in views["SALES"]["columns"]] == ["AMOUNT", "DAY"]
+        assert views["SALES"]["metadata"]["comment"] == "Daily sales"
+        assert views["STORES"]["column_count"] == 1
+        # The full catalog also refreshes the search index
+        assert schema_index.get_schema_index().stats()["views"] == 2
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_selected_views(self, mock_get_conn, cursor):
+        """Test describing named views and reporting unknown ones."""
+        cursor.fetchall.side_effect = [VIEW_ROWS, COLUMN_ROWS[:2]]
+        mock_get_conn.return_value.cursor.return_value = cursor
+
+        result = describe_views(["sales", "missing"])
+
+        assert list(result["data"]["views"]) == ["SALES"]
+        assert result["data"]["not_found"] == ["MISSING"]
+        assert "TABLE_NAME IN ('SALES', 'MISSING')" in cursor.execute.call_args.args[0]
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_quoted_names_keep_their_case(self, mock_get_conn, cursor):
+        """Test that quoted mixed-case views match exactly and unquoted fold."""
+        mixed = {"TABLE_SCHEMA": "GOLD", "TABLE_NAME": "Sales Daily"}
+        cursor.fetchall.side_effect = [
+            VIEW_ROWS + [{**mixed, "COMMENT": None, "CREATED": "c3"}],
+            [{**mixed, "COLUMN_NAME": "Amount", "DATA_TYPE": "FLOAT"}],
+        ]
+        mock_get_conn.return_value.cursor.return_value = cursor
+
+        result = describe_views(['"Sales Daily"', "stores", '"sales"'])
+
+        assert sorted(result["data"]["views"]) == ["STORES", "Sales Daily"]
+        assert result["data"]["not_found"] == ["sales"]
+        sql = cursor.execute.call_args.args[0]
+        assert "TABLE_NAME IN ('Sales Daily', 'STORES', 'sales')" in sql
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_error(self, mock_get_conn):
+        """Test the error response when the catalog query fails."""
+        mock_get_conn.side_effect = RuntimeError("no access")
+
+        result = describe_views()
+
+        assert not result["success"]
+        assert "no access" in result["error"]
+
+    def test_mock_mode(self, monkeypatch):
+        """Test the simulated descriptions."""
+        monkeypatch.setattr("src.config.MOCK_MODE", True)
+
+        result = describe_views()
+
+        assert result["data"]["count"] == 2
+        assert result["data"]["views"]["DAILY_SALES_SUMMARY"]["column_count"] == 5
@@ -0,0 +1,135 @@
+"""Unit tests for bulk query exports."""
+
+import csv
+import json
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.tools.export_tools import export_query
+
+ROWS = [
+    (date(2023, 12, 1), "Food", Decimal("10.50")),
+    (date(2023, 12, 2), "Home", Decimal("4.00")),
+    (date(2023, 12, 3), "Garden", None),
+]
+
+
+@pytest.fixture(autouse=True)
+def exports_dir(tmp_path, monkeypatch):
+    """Write exports to a temp directory against a live-mode connection."""
+    monkeypatch.setattr("src.config.MOCK_MODE", False)
+    monkeypatch.setattr("src.tools.export_tools.EXPORTS_DIR", tmp_path)
+    monkeypatch.setattr("src.tools.export_tools.EXPORT_BATCH_SIZE", 2)
+    return tmp_path
+
+
+@pytest.fixture
+def mock_conn():
+    """Connection whose cursor serves ROWS through fetchmany."""
+    mock_cursor = Mock()
+    # (name, type_code, display_size, internal_size, precision, scale, null_ok)
+    mock_cursor.description = [
+        ("DAY", 3, None, None, None, None, False),
+        ("CATEGORY", 2, None, 16, None, None, False),
+        ("REVENUE", 0, None, None, 10, 2, True),
+    ]
+    remaining = list(ROWS)
+
+    def fetchmany(size):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    mock_cursor.fetchmany.side_effect = fetchmany
+    conn = Mock()
+    conn.cursor.return_value = mock_cursor
+    with patch(
+        "src.tools.snowflake_tools.get_snowflake_connection", return_value=conn
+    ):
+        yield conn
+
+
+class TestExportQuery:
+    """Test cases for export_query."""
+
+    def test_csv_export_streams_batches(self, mock_conn, exports_dir):
+        """Test a CSV export written across several fetchmany batches."""
+        result = export_query("SELECT * FROM sales;", "csv", "sales")
+
+        assert result["success"] is True
+        data = result["data"]
+        assert data["file_path"] == str(exports_dir / "sales.csv")
+        assert data["rows_written"] == 3
+        assert data["bytes_written"] == os.path.getsize(data["file_path"])
+        with open(data["file_path"], newline="") as f:
+            lines = list(csv.reader(f))
+        assert lines[0] == ["DAY", "CATEGORY", "REVENUE"]
+        assert lines[1] == ["2023-12-01", "Food", "10.50"]
+        cursor = mock_conn.cursor.return_value
+        cursor.execute.assert_called_once_with("SELECT * FROM sales")
+        assert cursor.fetchmany.call_count == 3
+
+    def test_ndjson_export_with_row_cap(self, mock_conn):
+        """Test NDJSON output and the max_rows cap."""
+        result = export_query("SELECT * FROM sales", "ndjson", max_rows=2)
+
+        with open(result["data"]["file_path"]) as f:
+            records = [json.loads(line) for line in f]
+        assert result["data"]["rows_written"] == 2
+        assert records[0] == {"DAY": "2023-12-01", "CATEGORY": "Food", "REVENUE": "10.50"}
+
+    def test_file_name_cannot_escape_exports_dir(self, mock_conn, exports_dir):
+        """Test that path components in file_name are discarded."""
+        result = export_query("SELECT 1", "csv", "../../etc/passwd")
+
+        assert result["data"]["file_path"] == str(exports_dir / "passwd.csv")
+
+    def test_parquet_export(self, mock_conn):
+        """Test Parquet output when pyarrow is installed."""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        result = export_query("SELECT * FROM sales", "parquet")
+
+        table = pq.read_table(result["data"]["file_path"])
+        assert table.num_rows == 3
+        assert table.column_names == ["DAY", "CATEGORY", "REVENUE"]
+
+    def test_parquet_schema_comes_from_column_metadata(self, mock_conn):
+        """Test batches that would each infer a different schema."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        cursor = mock_conn.cursor.return_value
+        # DATE, TEXT and NUMBER(10,2); the first batch has no CATEGORY values
+        # and each batch has a different decimal scale
+        cursor.description = [
+            ("DAY", 3, None, None, None, None, True),
+            ("CATEGORY", 2, None, 16, None, None, True),
+            ("REVENUE", 0, None, None, 10, 2, True),
+        ]
+        rows = [
+            (date(2023, 12, 1), None, Decimal("10.5")),
+            (date(2023, 12, 2), None, Decimal("4")),
+            (date(2023, 12, 3), "Garden", Decimal("1.25")),
+        ]
+        cursor.fetchmany.side_effect = [rows[:2], rows[2:], []]
+
+        result = export_query("SELECT * FROM sales", "parquet")
+
+        table = pq.read_table(result["data"]["file_path"])
+        assert str(table.schema.field("REVENUE").type) == "decimal128(10, 2)"
+        assert table.column("CATEGORY").to_pylist() == [None, None, "Garden"]
+        assert table.column("REVENUE").to_pylist()[0] == Decimal("10.50")
+
+    def test_unknown_format(self):
+        """Test format validation."""
+        result = export_query("SELECT 1", "xlsx")
+
+        assert result["success"] is False
+        assert "xlsx" in result["error"]
@@ -0,0 +1,212 @@
+"""Unit tests for warehouse routing and connection pools."""
+
+import os
+import sys
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config, pool
+from src.pool import ConnectionPool, choose_route
+from src.sql_utils import fingerprint
+from src.tools.snowflake_tools import _execute_query
+from src.workload import WorkloadStore
+
+
+def _fake_connect(**params):
+    conn = MagicMock()
+    conn.is_closed.return_value = False
+    conn.params = params
+    return conn
+
+
+@pytest.fixture
+def conn_pool():
+    return ConnectionPool(
+        "small", {"warehouse": "XS_WH"}, max_size=2, connect=MagicMock(side_effect=_fake_connect)
+    )
+
+
+class TestConnectionPool:
+    """Test cases for ConnectionPool."""
+
+    def test_connections_are_reused(self, conn_pool):
+        """Test that a closed proxy returns its session to the pool."""
+        first = conn_pool.acquire()
+        raw = first._conn
+        first.close()
+        second = conn_pool.acquire()
+
+        assert second._conn is raw
+        assert conn_pool.stats()["created"] == 1
+        assert conn_pool.stats()["reused"] == 1
+        raw.close.assert_not_called()
+
+    def test_proxy_delegates_to_connection(self, conn_pool):
+        """Test that the proxy behaves like the wrapped connection."""
+        conn = conn_pool.acquire()
+        conn.cursor()
+
+        conn._conn.cursor.assert_called_once()
+        assert conn.route == "small"
+
+    def test_pool_size_is_bounded(self, conn_pool):
+        """Test that callers beyond max_size wait and then time out."""
+        held = [conn_pool.acquire(), conn_pool.acquire()]
+
+        with pytest.raises(TimeoutError):
+            conn_pool.acquire(timeout=0.05)
+
+        held[0].close()
+        assert conn_pool.acquire(timeout=0.05) is not None
+
+    def test_dead_and_idle_connections_are_replaced(self, conn_pool):
+        """Test that closed or long-idle sessions are not handed out."""
+        conn = conn_pool.acquire()
+        conn._conn.is_closed.return_value = True
+        conn.close()
+        assert conn_pool.stats()["idle"] == 0
+
+        conn = conn_pool.acquire()
+        raw = conn._conn
+        conn.close()
+        conn_pool.idle_seconds = -1
+
+        assert conn_pool.acquire()._conn is not raw
+        raw.close.assert_called_once()
+
+    def test_discard_closes_connection(self, conn_pool):
+        """Test that a discarded connection is closed, not pooled."""
+        conn = conn_pool.acquire()
+        conn.discard()
+        conn.close()
+
+        conn._conn.close.assert_called_once()
+        assert conn_pool.stats()["idle"] == 0
+
+    def test_changed_session_context_is_not_pooled(self):
+        """Test that a session moved by USE is closed instead of reused."""
+        conn_pool = ConnectionPool(
+            "small",
+            {"warehouse": "xs_wh", "database": "SALES", "schema": '"Gold"'},
+            connect=MagicMock(side_effect=_fake_connect),
+        )
+        kept = conn_pool.acquire()
+        kept._conn.configure_mock(warehouse="XS_WH", database="SALES", schema="Gold")
+        kept.close()
+        moved = conn_pool.acquire()
+        moved._conn.schema = "STAGING"
+        moved.close()
+
+        assert moved._conn is kept._conn
+        moved._conn.close.assert_called_once()
+        assert conn_pool.stats()["idle"] == 0
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_alter_session_discards_connection(self, mock_get_conn, monkeypatch):
+        """Test that sessions changed by ALTER SESSION are not handed back."""
+        monkeypatch.setattr("src.workload.WORKLOAD_TRACKING_ENABLED", False)
+        mock_get_conn.return_value.cursor.return_value.fetchall.return_value = []
+
+        _execute_query("-- tz\nalter session set TIMEZONE = 'UTC'")
+        _execute_query("SELECT 1")
+
+        assert mock_get_conn.return_value.discard.call_count == 1
+        assert mock_get_conn.return_value.close.call_count == 1
+
+
+class TestChooseRoute:
+    """Test cases for warehouse route selection."""
+
+    def test_tool_defaults(self):
+        """Test the per-tool default routes."""
+        assert choose_route("list_views") == "metadata"
+        assert choose_route("export", "SELECT * FROM t") == "heavy"
+        assert choose_route("unknown_tool") == "small"
+
+    def test_fingerprint_override(self, monkeypatch):
+        """Test explicit fingerprint routing rules."""
+        query = "SELECT * FROM big_view WHERE id = 1"
+        monkeypatch.setitem(pool.ROUTE_FINGERPRINTS, fingerprint(query), "heavy")
+
+        assert choose_route("query", "select * from big_view where id = 42") == "heavy"
+
+    def test_slow_shapes_go_to_heavy(self, tmp_path, monkeypatch):
+        """Test routing by observed mean latency."""
+        store = WorkloadStore(tmp_path / "workload.sqlite3")
+        store.record("SELECT * FROM big_view", 60000.0)
+        store.record("SELECT 1", 5.0)
+        monkeypatch.setattr(pool.config, "WORKLOAD_DB_PATH", store.path)
+        monkeypatch.setattr(pool, "get_workload_store", lambda: store)
+
+        assert choose_route("query", "SELECT * FROM big_view") == "heavy"
+        assert choose_route("query", "SELECT 1") == "small"
+        store.close()
+
+
+class TestGetPool:
+    """Test cases for the per-route pool registry."""
+
+    def test_route_warehouses(self, monkeypatch):
+        """Test that each route connects to its own warehouse."""
+        monkeypatch.setattr(pool, "_pools", {})
+        settings = replace(
+            config.get_settings(),
+            warehouse="DEFAULT_WH",
+            warehouse_routes={"metadata": "XS_WH", "small": None, "heavy": "L_WH"},
+        )
+        monkeypatch.setattr(config, "_settings", settings)
+
+        assert pool.get_pool("metadata").params["warehouse"] == "XS_WH"
+        assert pool.get_pool("small").params["warehouse"] == "DEFAULT_WH"
+        assert pool.get_pool("heavy").params["warehouse"] == "L_WH"
+        assert pool.get_pool("heavy") is pool.get_pool("heavy")
+
+        with pytest.raises(ValueError):
+            pool.get_pool("gigantic")
+
+    def test_session_profiles(self, monkeypatch):
+        """Test one pool per profile, each logging in with its parameters."""
+        monkeypatch.setattr(pool, "_pools", {})
+
+        interactive = pool.get_pool("heavy")
+        export = pool.get_pool("heavy", "export")
+        params = export.params["session_parameters"]
+
+        assert interactive is not export
+        assert export.stats()["profile"] == "export"
+        assert params["CLIENT_PREFETCH_THREADS"] == 10
+        assert params["QUERY_TAG"].endswith(":export")
+        # Results are bounded by LIMIT, never truncated server-side
+        assert interactive.params["session_parameters"]["ROWS_PER_RESULTSET"] == 0
+        # Pools copy the profile, so a session cannot alter the shared defaults
+        assert params is not config.SESSION_PROFILES["export"]
+
+        with pytest.raises(ValueError):
+            pool.get_pool("heavy", "batch")
+
+    def test_tool_profiles(self):
+        """Test the per-tool default profiles."""
+        assert pool.choose_profile("export") == "export"
+        assert pool.choose_profile("describe_view") == "metadata"
+        assert pool.choose_profile("unknown_tool") == "interactive"
+
+    def test_pools_are_rebuilt_on_reload(self, monkeypatch):
+        """Test that closing the pools drops sessions built with old settings."""
+        old = ConnectionPool(
+            "small", {}, connect=MagicMock(side_effect=_fake_connect)
+        )
+        monkeypatch.setattr(pool, "_pools", {"small": old})
+        idle, busy = old.acquire(), old.acquire()
+        idle.close()
+
+        pool.close_pools()
+
+        idle._conn.close.assert_called_once()
+        busy.close()
+        busy._conn.close.assert_called_once()
+        assert pool._pools == {}
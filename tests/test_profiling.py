@@ -0,0 +1,118 @@
+"""Unit tests for column profiling."""
+
+import json
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import profiling
+from src.profiling import build_profile_query, parse_profile_row, profile_view
+
+COLUMNS = [
+    {"name": "REGION", "type": "TEXT(20)"},
+    {"name": "PAYLOAD", "type": "VARIANT"},
+]
+
+PROFILE_ROW = {
+    "ROW_COUNT": 200,
+    "N_0": 150,
+    "D_0": 3,
+    "MIN_0": "EAST",
+    "MAX_0": "WEST",
+    "TOP_0": json.dumps([["EAST", 90], ["WEST", 50]]),
+    "N_1": 200,
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(profiling, "_cache", {})
+
+
+class TestProfileQuery:
+    """Test cases for building and parsing the combined profile query."""
+
+    def test_single_query_for_all_columns(self):
+        """Test that every statistic comes from one SELECT."""
+        sql = build_profile_query('"GOLD"."SALES"', COLUMNS, 5)
+
+        assert sql.startswith("SELECT COUNT(*) AS ROW_COUNT")
+        assert 'APPROX_TOP_K("REGION", 5) AS TOP_0' in sql
+        assert 'APPROX_COUNT_DISTINCT("REGION") AS D_0' in sql
+        assert 'COUNT("PAYLOAD") AS N_1' in sql
+        assert "D_1" not in sql
+        assert sql.endswith('FROM "GOLD"."SALES"')
+
+    def test_parse_row(self):
+        """Test turning the aliased row into column profiles."""
+        profile = parse_profile_row(PROFILE_ROW, COLUMNS)
+
+        region, payload = profile["columns"]
+        assert profile["row_count"] == 200
+        assert region["null_fraction"] == 0.25
+        assert region["distinct_count"] == 3
+        assert region["top_values"][0] == {"value": "EAST", "count": 90}
+        assert payload == {"name": "PAYLOAD", "type": "VARIANT", "null_fraction": 0.0}
+
+
+class TestProfileView:
+    """Test cases for the profile_view tool function."""
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_profile_is_cached(self, mock_get_conn, monkeypatch):
+        """Test two queries on first use and none while the profile is fresh."""
+        monkeypatch.setattr("src.config.MOCK_MODE", False)
+        cursor = Mock()
+        cursor.fetchall.return_value = [
+            {
+                "TABLE_SCHEMA": "GOLD",
+                "TABLE_NAME": "SALES",
+                "COLUMN_NAME": c["name"],
+                "DATA_TYPE": c["type"],
+            }
+            for c in COLUMNS
+        ]
+        cursor.fetchone.return_value = PROFILE_ROW
+        mock_get_conn.return_value.cursor.return_value = cursor
+
+        first = profile_view("sales", schema="gold")
+        second = profile_view("SALES", schema="GOLD")
+
+        assert first["success"] and not first["data"]["cached"]
+        assert second["data"]["cached"]
+        assert cursor.execute.call_count == 2
+        assert second["data"]["columns"][0]["top_values"][1]["value"] == "WEST"
+
+        profile_view("SALES", schema="GOLD", refresh=True)
+        assert cursor.execute.call_count == 4
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_unknown_view(self, mock_get_conn, monkeypatch):
+        """Test the error for a view without columns in the catalog."""
+        monkeypatch.setattr("src.config.MOCK_MODE", False)
+        mock_get_conn.return_value.cursor.return_value.fetchall.return_value = []
+
+        result = profile_view("NOPE", schema="GOLD")
+
+        assert not result["success"]
+        assert "GOLD.NOPE not found" in result["error"]
+
+    def test_invalid_name(self):
+        """Test that view names are restricted to plain identifiers."""
+        assert not profile_view("sales; DROP TABLE x")["success"]
+
+    def test_mock_mode(self, monkeypatch):
+        """Test the exact profile of the mock sample rows."""
+        monkeypatch.setattr("src.config.MOCK_MODE", True)
+
+        result = profile_view("daily_sales_summary", top_k=2)
+
+        columns = {c["name"]: c for c in result["data"]["columns"]}
+        assert result["data"]["row_count"] == 5
+        assert columns["PRODUCT_CATEGORY"]["distinct_count"] == 5
+        assert len(columns["REVENUE"]["top_values"]) == 2
@@ -0,0 +1,250 @@
+"""Unit tests for the persistent query result cache."""
+
+import os
+import sys
+import time
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import query_cache
+from src.query_cache import QueryCache, cache_key
+from src.result_store import get_result_store
+from src.sql_utils import canonicalize_sql
+from src.tools.snowflake_tools import fetch_result_rows, query_snowflake
+from tests.helpers import live_mode  # noqa: F401
+
+ROWS = [{"CATEGORY": "Electronics", "REVENUE": Decimal("10.50")}]
+CONTEXT = {"database": "DB", "schema": "GOLD", "role": "ANALYST"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    store = QueryCache(tmp_path / "queries", ttl_seconds=60, max_bytes=10**6)
+    yield store
+    store.close()
+
+
+class TestCacheKey:
+    """Test cases for cache keys."""
+
+    def test_formatting_does_not_change_the_key(self):
+        """Test that case, whitespace and comments are canonicalized away."""
+        first = cache_key("select a from t where x = 'A' limit 10;", CONTEXT)
+        second = cache_key("SELECT a\n  FROM t -- c\nWHERE x = 'A' LIMIT 10", CONTEXT)
+
+        assert first == second
+
+    def test_literals_and_context_change_the_key(self):
+        """Test that different literal values or roles never share entries."""
+        key = cache_key("SELECT a FROM t WHERE x = 'A'", CONTEXT)
+
+        assert key != cache_key("SELECT a FROM t WHERE x = 'a'", CONTEXT)
+        assert key != cache_key(
+            "SELECT a FROM t WHERE x = 'A'", {**CONTEXT, "role": "ADMIN"}
+        )
+
+    def test_quoted_identifiers_keep_their_case(self):
+        """Test canonicalization of quoted identifiers."""
+        assert canonicalize_sql('select "Mixed" from t') == 'SELECT "Mixed" FROM t'
+
+    def test_case_sensitive_text_is_kept(self):
+        """Test that VARIANT paths and $$ strings are not upper-cased."""
+        sql = "select v:customerId, v:from.Id::string from t where s = $$a -- b$$;"
+
+        assert canonicalize_sql(sql) == (
+            "SELECT v:customerId, v:from.Id::string FROM t WHERE s = $$a -- b$$"
+        )
+
+
+class TestQueryCache:
+    """Test cases for QueryCache."""
+
+    def test_round_trip_across_instances(self, cache, tmp_path):
+        """Test that another process (instance) sees stored results."""
+        cache.put("k", ROWS, ["CATEGORY", "REVENUE"], "SELECT 1", query_id="qid")
+
+        other = QueryCache(tmp_path / "queries", ttl_seconds=60)
+        hit = other.get("k")
+        other.close()
+
+        assert hit["rows"] == ROWS
+        assert hit["columns"] == ["CATEGORY", "REVENUE"]
+        assert hit["query_id"] == "qid"
+
+    def test_ttl_expiry(self, cache):
+        """Test that expired entries are misses and are removed."""
+        cache.put("k", ROWS, ["CATEGORY"], "SELECT 1")
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+        assert not (cache.directory / "k.pkl").exists()
+
+    def test_size_bound_evicts_least_recently_used(self, cache):
+        """Test LRU eviction once the size budget is exceeded."""
+        rows = [{"V": "x" * 1000}]
+        cache.put("a", rows, ["V"], "q")
+        cache.max_bytes = 2 * cache.stats()["size_bytes"]
+        cache.put("b", rows, ["V"], "q")
+        cache.get("a")
+        cache.put("c", rows, ["V"], "q")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_missing_payload_is_a_miss(self, cache):
+        """Test recovery when another process removed the payload file."""
+        cache.put("k", ROWS, ["CATEGORY"], "SELECT 1")
+        (cache.directory / "k.pkl").unlink()
+
+        assert cache.get("k") is None
+
+    def test_nondeterministic_queries_are_not_stored(self, cache):
+        """Test that clock, random and sequence functions skip the cache."""
+        for i, sql in enumerate(
+            [
+                "SELECT * FROM t WHERE d = CURRENT_DATE",
+                "SELECT current_timestamp()",
+                "SELECT uuid_string(), v FROM t",
+                "SELECT SEQ4() FROM TABLE(GENERATOR(ROWCOUNT => 5))",
+                "SELECT * FROM t ORDER BY RANDOM() LIMIT 10",
+            ]
+        ):
+            cache.put(f"k{i}", ROWS, ["CATEGORY"], sql)
+        cache.put("literal", ROWS, ["CATEGORY"], "SELECT 'random()', \"SEQ4\" FROM t")
+
+        assert cache.stats()["entries"] == 1
+        assert cache.get("literal") is not None
+
+
+class TestQuerySnowflakeCaching:
+    """Test cases for the cache in the query_snowflake path."""
+
+    @pytest.fixture(autouse=True)
+    def cache_enabled(self, live_mode, cache, monkeypatch):
+        monkeypatch.setattr(query_cache, "QUERY_CACHE_ENABLED", True)
+        monkeypatch.setattr(query_cache, "_cache", cache)
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_second_call_is_served_from_cache(self, mock_get_conn):
+        """Test that a repeated query does not reach Snowflake again."""
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = ROWS
+        mock_cursor.description = [("CATEGORY",), ("REVENUE",)]
+        mock_cursor.sfqid = "01b2"
+        mock_get_conn.return_value.cursor.return_value = mock_cursor
+
+        first = query_snowflake("SELECT category, revenue FROM sales")
+        second = query_snowflake("select category, revenue from sales")
+
+        assert mock_get_conn.call_count == 1
+        assert not first["data"]["cached"]
+        assert second["data"]["cached"]
+        assert second["data"]["rows"] == ROWS
+        assert second["data"]["result_id"] != first["data"]["result_id"]
+        assert "cache_age_seconds" not in first["data"]
+        assert 0 <= second["data"]["cache_age_seconds"] < 60
+
+    @patch("src.tools.snowflake_tools.preflight")
+    @patch("src.tools.snowflake_tools.query_cache.lookup")
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_use_cache_false_runs_the_query(
+        self, mock_get_conn, mock_lookup, mock_preflight, monkeypatch
+    ):
+        """Test the per-call bypass and that a miss is looked up only once."""
+        monkeypatch.setattr("src.tools.snowflake_tools.COST_PREFLIGHT_ENABLED", True)
+        mock_preflight.return_value = {"estimate": None}
+        mock_lookup.return_value = None
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = ROWS
+        mock_cursor.description = [("CATEGORY",), ("REVENUE",)]
+        mock_cursor.sfqid = "01b2"
+        mock_get_conn.return_value.cursor.return_value = mock_cursor
+
+        query_snowflake("SELECT category, revenue FROM sales")
+        assert mock_lookup.call_count == 1
+
+        mock_lookup.return_value = {
+            "rows": ROWS,
+            "columns": ["CATEGORY", "REVENUE"],
+            "query_id": "01b2",
+            "created_at": 0,
+        }
+        fresh = query_snowflake("SELECT category, revenue FROM sales", use_cache=False)
+
+        assert mock_lookup.call_count == 1
+        assert mock_get_conn.call_count == 2
+        assert not fresh["data"]["cached"]
+
+
+@pytest.mark.usefixtures("live_mode")
+class TestResultCacheReuse:
+    """Test cases for Snowflake result cache friendly execution."""
+
+    @staticmethod
+    def _cursor(mock_get_conn, rows):
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = rows
+        mock_cursor.description = [(name,) for name in rows[0]]
+        mock_cursor.sfqid = "01b2-0000"
+        mock_get_conn.return_value.cursor.return_value = mock_cursor
+        return mock_cursor
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_query_text_does_not_depend_on_limit(self, mock_get_conn):
+        """Test that different limits send the same canonical text."""
+        mock_cursor = self._cursor(mock_get_conn, [{"N": i} for i in range(50)])
+
+        small = query_snowflake("select n\nfrom t;", limit=5)
+        large = query_snowflake("SELECT n FROM t", limit=500)
+
+        sent = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        assert sent == ["SELECT n FROM t LIMIT 1000"] * 2
+        assert small["data"]["row_count"] == 5
+        assert small["data"]["total_rows"] == 50
+        assert small["data"]["has_more"]
+        assert large["data"]["row_count"] == 50
+        assert not large["data"]["truncated"]
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_fetch_cap_reports_truncation(self, mock_get_conn):
+        """Test that hitting the server's cap is flagged, unlike the caller's LIMIT."""
+        mock_cursor = self._cursor(mock_get_conn, [{"N": i} for i in range(1000)])
+
+        capped = query_snowflake("SELECT n FROM t", limit=1000)
+        limited = query_snowflake("SELECT n FROM t LIMIT 1000", limit=1000)
+        nested = query_snowflake(
+            "SELECT n, 'LIMIT' AS s FROM (SELECT n FROM t LIMIT 5000)", limit=1000
+        )
+
+        assert capped["data"]["truncated"] and capped["data"]["has_more"]
+        assert not limited["data"]["truncated"]
+        assert not limited["data"]["has_more"]
+        assert nested["data"]["truncated"]
+        sent = mock_cursor.execute.call_args_list[-1].args[0]
+        assert sent.endswith(") LIMIT 1000")
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_dropped_result_is_repaged_with_result_scan(self, mock_get_conn):
+        """Test that result_fetch re-reads a dropped result by query id."""
+        rows = [{"N": i} for i in range(20)]
+        mock_cursor = self._cursor(mock_get_conn, rows)
+        result_id = query_snowflake("SELECT n FROM t")["data"]["result_id"]
+        store = get_result_store()
+        store._remove(result_id)
+
+        page = fetch_result_rows(result_id, offset=10, limit=5)
+
+        assert mock_cursor.execute.call_args.args[0] == (
+            "SELECT * FROM TABLE(RESULT_SCAN('01b2-0000'))"
+        )
+        assert page["success"]
+        assert page["data"]["rows"] == rows[10:15]
+        assert store.get(result_id)["query_id"] == "01b2-0000"
@@ -0,0 +1,138 @@
+"""Unit tests for the server-side result store."""
+
+import os
+import shutil
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.compact_rows import CompactRows
+from src.result_store import ResultStore
+
+ROWS = [{"region": f"R{i}", "sales": i * 1000} for i in range(200)]
+COLUMNS = ["region", "sales"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(
+        ttl_seconds=60,
+        max_memory_bytes=10 * 1024 * 1024,
+        max_disk_bytes=10 * 1024 * 1024,
+        spill_dir=tmp_path,
+    )
+
+
+class TestResultStore:
+    """Test cases for ResultStore."""
+
+    def test_put_and_get(self, store):
+        """Test that a stored result is returned by its handle."""
+        result_id = store.put(ROWS, COLUMNS, "SELECT * FROM sales", query_id="01ab")
+
+        stored = store.get(result_id)
+
+        assert result_id.startswith("res_")
+        assert stored["rows"] == ROWS
+        assert stored["columns"] == COLUMNS
+        assert stored["query_id"] == "01ab"
+        assert store.get("res_missing") is None
+
+    def test_rows_are_stored_compactly(self, store):
+        """Test that rows are packed and their measured size is accounted."""
+        result_id = store.put(ROWS, COLUMNS)
+
+        stored = store.get(result_id)
+
+        assert isinstance(stored["rows"], CompactRows)
+        assert stored["size_bytes"] == stored["rows"].nbytes()
+        assert store.stats()["memory_bytes"] == stored["size_bytes"]
+
+    def test_expired_results_are_dropped(self, store):
+        """Test TTL expiry."""
+        with patch("src.result_store.time.time", return_value=1000.0):
+            result_id = store.put(ROWS, COLUMNS)
+        with patch("src.result_store.time.time", return_value=1061.0):
+            assert store.get(result_id) is None
+        assert store.stats()["entries"] == 0
+
+    def test_spills_least_recently_used_to_disk(self, store):
+        """Test that results over the memory budget move to disk and back."""
+        store.max_memory_bytes = 1
+        first = store.put(ROWS, COLUMNS)
+        second = store.put(ROWS, COLUMNS)
+
+        assert store.stats()["spilled"] == 1
+        assert (store.spill_dir / f"{first}.pkl").exists()
+
+        assert store.get(first)["rows"] == ROWS
+        # Loading the first result spills the second one instead
+        assert (store.spill_dir / f"{second}.pkl").exists()
+        assert store.stats()["in_memory"] == 1
+
+    def test_spill_directory_is_per_process_and_removed_at_exit(self, store, tmp_path):
+        """Test that each store spills into its own directory, removed at exit."""
+        store.max_memory_bytes = 1
+        with patch("src.result_store.atexit.register") as register:
+            store.put(ROWS, COLUMNS)
+            store.put(ROWS, COLUMNS)
+
+        assert store.spill_dir.parent == tmp_path
+        assert str(os.getpid()) in store.spill_dir.name
+        register.assert_called_once_with(
+            shutil.rmtree, store.spill_dir, ignore_errors=True
+        )
+
+    def test_stale_spill_directories_are_swept(self, store, tmp_path):
+        """Test that a new store removes spill files of processes that are gone."""
+        store.max_memory_bytes = 1
+        store.put(ROWS, COLUMNS)
+        store.put(ROWS, COLUMNS)
+        stale = tmp_path / "proc_999999_dead"
+        stale.mkdir()
+        (stale / "res_0000.pkl").write_bytes(b"left behind")
+
+        ResultStore(spill_dir=tmp_path)
+
+        assert not stale.exists()
+        # The live store's directory is kept
+        assert len(list(store.spill_dir.glob("*.pkl"))) == 1
+
+    def test_disk_budget_drops_oldest(self, store):
+        """Test that spilled results are discarded past the disk budget."""
+        store.max_memory_bytes = 1
+        store.max_disk_bytes = 1
+        first = store.put(ROWS, COLUMNS)
+        second = store.put(ROWS, COLUMNS)
+
+        assert store.get(first) is None
+        assert store.get(second)["rows"] == ROWS
+
+    def test_delete(self, store):
+        """Test explicit deletion."""
+        result_id = store.put(ROWS, COLUMNS)
+
+        assert store.delete(result_id) is True
+        assert store.delete(result_id) is False
+        assert store.get(result_id) is None
+
+    def test_dropped_results_remember_their_query_id(self, store):
+        """Test that expired results keep their query id for RESULT_SCAN."""
+        with patch("src.result_store.time.time", return_value=1000.0):
+            with_id = store.put(ROWS, COLUMNS, "SELECT 1", query_id="01ab")
+            without_id = store.put(ROWS, COLUMNS)
+        with patch("src.result_store.time.time", return_value=1061.0):
+            assert store.get(with_id) is None
+            info = store.forgotten(with_id)
+            assert store.forgotten(without_id) is None
+
+        assert info["query_id"] == "01ab"
+        assert info["columns"] == COLUMNS
+
+        assert store.put(ROWS, COLUMNS, result_id=with_id) == with_id
+        assert store.forgotten(with_id) is None
+        assert store.get(with_id)["rows"] == ROWS
@@ -0,0 +1,207 @@
+"""Unit tests for the schema search index."""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import schema_index
+from src.schema_index import (
+    SchemaIndex,
+    fetch_catalog_columns,
+    fetch_catalog_views,
+    search_schema,
+)
+
+SALES_COLUMNS = [
+    {"name": "TRANSACTION_DATE", "type": "DATE"},
+    {
+        "name": "PRODUCT_CATEGORY",
+        "type": "VARCHAR(255)",
+        "comment": "Merchandise group",
+    },
+    {"name": "TOTAL_REVENUE", "type": "NUMBER(38,2)"},
+]
+AFFINITY_COLUMNS = [
+    {"name": "CUSTOMER_ID", "type": "NUMBER(38,0)"},
+    {"name": "MONTH", "type": "DATE"},
+]
+
+
+@pytest.fixture
+def index():
+    index = SchemaIndex()
+    index.add_view({"schema": "GOLD", "name": "DAILY_SALES_SUMMARY"}, SALES_COLUMNS)
+    index.add_view(
+        {"schema": "GOLD", "name": "CUSTOMER_PRODUCT_AFFINITY_MONTHLY"},
+        AFFINITY_COLUMNS,
+    )
+    return index
+
+
+class TestSchemaIndex:
+    """Test cases for SchemaIndex search."""
+
+    def test_exact_column_name_ranks_first(self, index):
+        """Test that a full column name is the top match."""
+        assert index.search("total_revenue")[0]["column"] == "TOTAL_REVENUE"
+
+    def test_typos_and_prefixes(self, index):
+        """Test fuzzy matching of misspelled and partial words."""
+        assert index.search("reveneu")[0]["column"] == "TOTAL_REVENUE"
+        assert index.search("categ")[0]["column"] == "PRODUCT_CATEGORY"
+
+    def test_comment_and_kind_filter(self, index):
+        """Test matching comments and restricting to views."""
+        assert index.search("merchandise")[0]["column"] == "PRODUCT_CATEGORY"
+        views = index.search("customer", kind="view")
+        assert [m["view"] for m in views] == ["CUSTOMER_PRODUCT_AFFINITY_MONTHLY"]
+
+    def test_multiple_words_combine(self, index):
+        """Test that words matching the view and the column add up."""
+        top = index.search("sales revenue")[0]
+        assert (top["view"], top["column"]) == ("DAILY_SALES_SUMMARY", "TOTAL_REVENUE")
+
+    def test_search_is_fast(self, index):
+        """Test that a warm search takes well under a millisecond."""
+        for i in range(200):
+            index.add_view(
+                {"schema": "GOLD", "name": f"VIEW_{i}"},
+                [{"name": f"METRIC_{j}_{i}", "type": "NUMBER"} for j in range(20)],
+            )
+        started = time.perf_counter()
+        for _ in range(100):
+            index.search("revenue")
+        assert (time.perf_counter() - started) / 100 < 0.001
+
+    def test_sync_is_incremental(self, index):
+        """Test that only new or altered views are re-read and dropped ones removed."""
+        index._versions[("GOLD", "DAILY_SALES_SUMMARY")] = "v1"
+        fetch = Mock(return_value={("GOLD", "NEW_VIEW"): [{"name": "NEW_COLUMN"}]})
+
+        changes = index.sync(
+            {
+                ("GOLD", "DAILY_SALES_SUMMARY"): {"version": "v1"},
+                ("GOLD", "NEW_VIEW"): {},
+            },
+            fetch,
+        )
+
+        fetch.assert_called_once_with([("GOLD", "NEW_VIEW")])
+        assert changes == {"added": 1, "updated": 0, "removed": 1}
+        assert index.search("affinity") == []
+        assert index.search("new_column")[0]["view"] == "NEW_VIEW"
+        assert index.stats()["columns"] == 4
+
+    def test_columns_are_fetched_outside_the_lock(self, index):
+        """Test that searches from other threads run during the catalog fetch."""
+        searched = []
+
+        def fetch(keys):
+            searcher = threading.Thread(
+                target=lambda: searched.append(index.search("revenue"))
+            )
+            searcher.start()
+            searcher.join(timeout=5)
+            return {}
+
+        index.sync({("GOLD", "DAILY_SALES_SUMMARY"): {"version": "v2"}}, fetch)
+
+        assert searched and searched[0][0]["column"] == "TOTAL_REVENUE"
+
+    def test_schema_scoped_sync_keeps_other_schemas(self, index):
+        """Test that syncing one schema's catalog leaves other schemas indexed."""
+        index.add_view({"schema": "SILVER", "name": "RAW_ORDERS"}, [])
+
+        changes = index.sync({}, Mock(), schema="GOLD")
+
+        assert changes == {"added": 0, "updated": 0, "removed": 2}
+        assert [m["view"] for m in index.search("orders")] == ["RAW_ORDERS"]
+        assert index.synced_at is None
+
+
+class TestCatalog:
+    """Test cases for reading INFORMATION_SCHEMA."""
+
+    def test_fetch_columns(self):
+        """Test one query for the columns of several views."""
+        cursor = Mock()
+        view = {"TABLE_SCHEMA": "GOLD", "TABLE_NAME": "V"}
+        cursor.fetchall.return_value = [
+            {
+                **view,
+                "COLUMN_NAME": "NAME",
+                "DATA_TYPE": "TEXT",
+                "CHARACTER_MAXIMUM_LENGTH": 255,
+                "IS_NULLABLE": "YES",
+            },
+            {
+                **view,
+                "COLUMN_NAME": "AMOUNT",
+                "DATA_TYPE": "NUMBER",
+                "NUMERIC_PRECISION": 38,
+                "NUMERIC_SCALE": 2,
+            },
+        ]
+
+        columns = fetch_catalog_columns(cursor, "GOLD", ["V", "O'BRIEN"])
+
+        sql = cursor.execute.call_args.args[0]
+        assert "TABLE_NAME IN ('V', 'O''BRIEN')" in sql
+        types = [c["type"] for c in columns[("GOLD", "V")]]
+        assert types == ["TEXT(255)", "NUMBER(38,2)"]
+        assert columns[("GOLD", "V")][0]["null"]
+
+    def test_whole_database(self):
+        """Test that the default scope is every schema but INFORMATION_SCHEMA."""
+        cursor = Mock()
+        cursor.fetchall.return_value = []
+
+        fetch_catalog_views(cursor)
+        sql = cursor.execute.call_args.args[0]
+        assert "TABLE_SCHEMA <> 'INFORMATION_SCHEMA'" in sql
+
+        keys = [("GOLD", "A"), ("SILVER", "B"), ("GOLD", "C")]
+        fetch_catalog_columns(cursor, keys=keys)
+        sql = cursor.execute.call_args.args[0]
+        assert "(TABLE_SCHEMA = 'GOLD' AND TABLE_NAME IN ('A', 'C'))" in sql
+        assert "OR (TABLE_SCHEMA = 'SILVER' AND TABLE_NAME IN ('B'))" in sql
+
+
+class TestSearchSchema:
+    """Test cases for the search_schema tool function."""
+
+    def test_mock_mode(self, monkeypatch):
+        """Test searching the mock catalog."""
+        monkeypatch.setattr("src.config.MOCK_MODE", True)
+        monkeypatch.setattr(schema_index, "_index", SchemaIndex())
+
+        result = search_schema("revenue")
+
+        assert result["success"]
+        assert result["data"]["matches"][0]["column"] == "TOTAL_REVENUE"
+        assert result["data"]["index"]["views"] == 2
+
+    def test_validation(self):
+        """Test rejected arguments."""
+        assert not search_schema("  ")["success"]
+        assert not search_schema("x", kind="table")["success"]
+
+    def test_catalog_failure_without_index(self, monkeypatch):
+        """Test the error when the catalog cannot be read and nothing is cached."""
+        monkeypatch.setattr("src.config.MOCK_MODE", False)
+        monkeypatch.setattr(schema_index, "_index", SchemaIndex())
+        with patch(
+            "src.tools.snowflake_tools.get_snowflake_connection",
+            side_effect=RuntimeError("down"),
+        ):
+            result = search_schema("revenue")
+
+        assert not result["success"]
+        assert "down" in result["error"]
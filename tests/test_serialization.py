@@ -0,0 +1,106 @@
+"""Unit tests for response serialization."""
+
+import inspect
+import json
+import os
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serialization import benchmark, dumps, json_response
+
+
+def to_jsonable(value):
+    return json.loads(dumps(value))
+
+
+class TestSerializer:
+    """Test cases for encoding Snowflake values."""
+
+    def test_decimal_keeps_its_numeric_type(self):
+        """Test that scale-0 decimals become integers and others floats."""
+        encoded = to_jsonable([Decimal("42"), Decimal("10.50"), Decimal("NaN")])
+
+        assert encoded == [42, 10.5, None]
+        assert isinstance(encoded[0], int)
+
+    def test_temporal_values_are_iso_8601(self):
+        """Test dates, times and timestamps with and without a time zone."""
+        tz = timezone(timedelta(hours=-7))
+        encoded = to_jsonable(
+            {
+                "day": date(2025, 7, 1),
+                "at": time(11, 53, 42),
+                "created_on": datetime(2025, 7, 1, 11, 53, 42, tzinfo=tz),
+            }
+        )
+
+        assert encoded == {
+            "day": "2025-07-01",
+            "at": "11:53:42",
+            "created_on": "2025-07-01T11:53:42-07:00",
+        }
+
+    def test_binary_keys_and_sets(self):
+        """Test hex binary, stringified keys and sets as lists."""
+        encoded = to_jsonable({1: b"\x00\xff", "tags": {"x"}})
+
+        assert encoded["1"] == "00ff"
+        assert encoded["tags"] == ["x"]
+        assert dumps({"n": None}) == b'{"n":null}'
+
+    def test_integers_beyond_64_bits(self):
+        """Test NUMBER(38,0) values that orjson cannot encode."""
+        big = 2**70
+
+        assert to_jsonable({"x": big, "d": Decimal(big)}) == {"x": big, "d": big}
+
+
+class TestJsonResponse:
+    """Test cases for the tool decorator."""
+
+    def test_encodes_response_once_and_keeps_signature(self):
+        """Test that the wrapped tool returns a pre-encoded result."""
+
+        def tool(view_name: str, limit: int = 10) -> dict:
+            return {"success": True, "data": {"total": Decimal("3.25")}}
+
+        wrapped = json_response(tool)
+        result = wrapped("SALES")
+
+        assert result.content[0].text == '{"success":true,"data":{"total":3.25}}'
+        assert result.structured_content == {"success": True, "data": {"total": 3.25}}
+        assert inspect.signature(wrapped) == inspect.signature(tool)
+        assert wrapped.__name__ == "tool"
+
+    def test_big_integers_stay_exact(self):
+        """Test that integers beyond 64 bits are not decoded as floats."""
+        result = json_response(lambda: {"id": Decimal(2**70)})()
+
+        assert result.structured_content == {"id": 2**70}
+
+    def test_unencodable_response_becomes_error(self):
+        """Test that an encoding failure is reported instead of raised."""
+        looped = {}
+        looped["self"] = looped
+
+        result = json_response(lambda: looped)()
+
+        assert result.structured_content["success"] is False
+        assert "encode" in result.structured_content["error"]
+
+
+class TestBenchmark:
+    """Test cases for the serializer benchmark."""
+
+    def test_benchmark_report(self):
+        """Test the benchmark report on a small result."""
+        report = benchmark(n_cells=100, repeat=1)
+
+        assert report["cells"] == 100
+        assert set(report["ms"]) == {"json_default_str", "serializer"}
+        assert isinstance(report["sample"]["TOTAL_QUANTITY_SOLD"], int)
+        assert report["sample"]["CREATED_ON"] == "2025-07-01T11:53:43.699000-07:00"
@@ -0,0 +1,148 @@
+"""Unit tests for the immutable settings object and reloading."""
+
+import dataclasses
+import os
+import sys
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.config import Settings
+
+FULL_ENV = {
+    "SNOWFLAKE_ACCOUNT": "acct",
+    "SNOWFLAKE_USER": "user",
+    "SNOWFLAKE_PASSWORD": "pw",
+    "SNOWFLAKE_WAREHOUSE": "WH",
+    "SNOWFLAKE_DATABASE": "DB",
+    "SNOWFLAKE_ROLE": "ROLE",
+}
+
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """Point the config module at a temporary .env with no inherited variables."""
+    env_file = tmp_path / ".env"
+    env_file.write_text("")
+    for name in list(os.environ):
+        if name.startswith("SNOWFLAKE_") or name == "FORCE_MOCK_MODE":
+            monkeypatch.delenv(name)
+    monkeypatch.setattr(config, "ENV_FILE", env_file)
+    monkeypatch.setattr(config, "_DOTENV_KEYS", frozenset())
+    monkeypatch.setattr(config, "_settings", config.get_settings())
+    monkeypatch.setattr(config, "MOCK_MODE", config.MOCK_MODE)
+    monkeypatch.setattr(config, "_reload_callbacks", [])
+    return env_file
+
+
+class TestSettingsFromEnv:
+    """Test cases for parsing and validation."""
+
+    def test_complete_environment(self):
+        """Test that a complete environment enables live mode."""
+        settings = Settings.from_env(FULL_ENV)
+
+        assert not settings.mock_mode
+        assert settings.schema == "GOLD"
+        assert settings.warehouse_routes == {"metadata": "WH", "small": "WH", "heavy": "WH"}
+        assert settings.connection_params()["password"] == "pw"
+
+    def test_missing_credentials_enable_mock_mode(self):
+        """Test that missing variables are reported and switch to mock mode."""
+        env = {k: v for k, v in FULL_ENV.items() if k != "SNOWFLAKE_PASSWORD"}
+        settings = Settings.from_env(env)
+
+        assert settings.mock_mode
+        assert settings.missing == ("SNOWFLAKE_PASSWORD",)
+        assert settings.connection_params() == {}
+
+    def test_key_pair_needs_no_password(self):
+        """Test the per-authenticator credential requirement."""
+        env = {k: v for k, v in FULL_ENV.items() if k != "SNOWFLAKE_PASSWORD"}
+        env.update(SNOWFLAKE_AUTHENTICATOR="snowflake_jwt", SNOWFLAKE_PRIVATE_KEY_PATH="k.p8")
+
+        assert not Settings.from_env(env).mock_mode
+
+    def test_force_mock_mode(self):
+        """Test FORCE_MOCK_MODE with otherwise complete settings."""
+        assert Settings.from_env({**FULL_ENV, "FORCE_MOCK_MODE": "true"}).mock_mode
+
+    def test_settings_are_immutable(self):
+        """Test that settings cannot be changed in place."""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            Settings.from_env(FULL_ENV).account = "other"
+
+
+class TestReload:
+    """Test cases for reload_settings and the legacy module names."""
+
+    def test_reload_swaps_settings_and_runs_callbacks(self, isolated_config):
+        """Test that an edited .env file is picked up on reload."""
+        isolated_config.write_text(
+            "\n".join(f"{k}={v}" for k, v in FULL_ENV.items()) + "\n"
+        )
+        seen = []
+        config.on_reload(seen.append)
+
+        settings = config.reload_settings()
+
+        assert config.get_settings() is settings
+        assert not config.MOCK_MODE
+        assert config.SNOWFLAKE_ACCOUNT == "acct"
+        assert seen == [settings]
+
+        # Unchanged settings do not trigger the callbacks again
+        config.reload_settings()
+        assert len(seen) == 1
+
+    def test_invalid_edit_keeps_previous_settings(self, isolated_config):
+        """Test that a bad value is logged instead of breaking the reload."""
+        before = config.get_settings()
+        isolated_config.write_text("SNOWFLAKE_TIMEOUT=30s\n")
+
+        assert config.reload_settings() is before
+        assert config.get_settings() is before
+
+    def test_process_environment_wins_over_file(self, isolated_config, monkeypatch):
+        """Test that variables set by the client override the .env file."""
+        isolated_config.write_text("SNOWFLAKE_WAREHOUSE=FILE_WH\n")
+        monkeypatch.setenv("SNOWFLAKE_WAREHOUSE", "CLIENT_WH")
+
+        assert config.reload_settings().warehouse == "CLIENT_WH"
+
+    def test_unknown_attribute(self):
+        """Test that only the known legacy names are resolved."""
+        with pytest.raises(AttributeError):
+            config.NOT_A_SETTING
+
+
+class TestRouteFingerprints:
+    """Test cases for validating fingerprint route overrides."""
+
+    def test_unknown_routes_are_dropped_and_reported(self):
+        """Test that only overrides naming a known route are kept."""
+        routes, errors = config._parse_route_fingerprints(
+            '{"abc": "heavy", "def": "haevy"}'
+        )
+
+        assert routes == {"abc": "heavy"}
+        assert len(errors) == 1 and "'haevy'" in errors[0]
+
+    def test_malformed_json(self):
+        """Test that a malformed value disables overrides instead of failing."""
+        assert config._parse_route_fingerprints("{oops")[0] == {}
+        assert config._parse_route_fingerprints('["heavy"]')[1] == (
+            "ROUTE_FINGERPRINTS must be a JSON object",
+        )
+
+    def test_validate_config_reports_bad_routes(self, isolated_config, monkeypatch):
+        """Test that validate_config returns the invalid overrides."""
+        isolated_config.write_text(
+            "\n".join(f"{k}={v}" for k, v in FULL_ENV.items()) + "\n"
+        )
+        monkeypatch.setattr(config, "ROUTE_FINGERPRINT_ERRORS", ("bad route",))
+
+        assert config.validate_config() == ["bad route"]
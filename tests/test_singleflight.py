@@ -0,0 +1,124 @@
+"""Unit tests for single-flight request coalescing."""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.singleflight import SingleFlight
+from src.tools.snowflake_tools import query_snowflake
+from src.workload import WorkloadStore
+from tests.helpers import live_mode  # noqa: F401
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Test that callers arriving while a call runs get its result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return "rows"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(flight.do, "q", work)
+            while flight.in_flight() == 0:
+                pass
+            followers = [pool.submit(flight.do, "q", work) for _ in range(3)]
+            time.sleep(0.2)
+            release.set()
+            results = [leader.result()] + [f.result() for f in followers]
+
+        assert len(calls) == 1
+        assert results[0] == ("rows", False)
+        assert all(result == ("rows", True) for result in results[1:])
+        assert flight.in_flight() == 0
+
+    def test_errors_reach_every_waiter(self):
+        """Test that a failed execution fails all coalesced callers."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def work():
+            release.wait(5)
+            raise RuntimeError("warehouse suspended")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "q", work)
+            while flight.in_flight() == 0:
+                pass
+            follower = pool.submit(flight.do, "q", work)
+            time.sleep(0.2)
+            release.set()
+            for future in (leader, follower):
+                with pytest.raises(RuntimeError, match="warehouse suspended"):
+                    future.result()
+
+    def test_sequential_calls_are_not_cached(self):
+        """Test that completed calls are forgotten."""
+        flight = SingleFlight()
+        counter = iter(range(10))
+
+        assert flight.do("q", lambda: next(counter)) == (0, False)
+        assert flight.do("q", lambda: next(counter)) == (1, False)
+
+
+@pytest.mark.usefixtures("live_mode")
+class TestQueryCoalescing:
+    """Test cases for coalescing in query_snowflake."""
+
+    @patch("src.tools.snowflake_tools.get_snowflake_connection")
+    def test_burst_runs_one_warehouse_query(
+        self, mock_get_conn, tmp_path, monkeypatch
+    ):
+        """Test that identical concurrent queries reach Snowflake once."""
+        store = WorkloadStore(tmp_path / "workload.sqlite3")
+        monkeypatch.setattr("src.workload.WORKLOAD_TRACKING_ENABLED", True)
+        monkeypatch.setattr("src.workload._store", store)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_execute(query):
+            started.set()
+            release.wait(5)
+
+        mock_cursor = Mock()
+        mock_cursor.execute.side_effect = slow_execute
+        mock_cursor.fetchall.return_value = [{"N": 1}]
+        mock_cursor.description = [("N",)]
+        mock_get_conn.return_value.cursor.return_value = mock_cursor
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            first = pool.submit(query_snowflake, "SELECT COUNT(*) AS n FROM sales")
+            started.wait(5)
+            others = [
+                pool.submit(query_snowflake, "select count(*) as n from sales")
+                for _ in range(2)
+            ]
+            # Give the followers time to reach the in-flight call
+            time.sleep(0.2)
+            release.set()
+            results = [first.result()] + [f.result() for f in others]
+
+        assert mock_cursor.execute.call_count == 1
+        assert all(r["success"] and r["data"]["rows"] == [{"N": 1}] for r in results)
+        # Each caller still gets its own handle
+        assert len({r["data"]["result_id"] for r in results}) == 3
+        # Every call is counted, the shared ones flagged as coalesced
+        [stats] = store.top()
+        assert stats["calls"] == 3
+        assert stats["coalesced_calls"] == 2
+        assert stats["mean_ms"] == stats["total_ms"]
+        store.close()
@@ -0,0 +1,93 @@
+"""Unit tests for SQL text helpers."""
+
+import os
+import sys
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sql_utils import has_limit, resolve_identifier, rewrite_approximate
+
+
+class TestRewriteApproximate:
+    """Test cases for approximate-mode query rewriting."""
+
+    def test_samples_single_view_aggregates(self):
+        """Test SAMPLE placement after the alias and scaling of SUM/COUNT."""
+        result = rewrite_approximate(
+            "SELECT product_category, SUM(total_revenue) AS revenue, COUNT(*) "
+            "FROM GOLD.DAILY_SALES_SUMMARY d GROUP BY 1 ORDER BY revenue DESC;",
+            10,
+        )
+
+        assert result["query"] == (
+            "SELECT product_category, (SUM(total_revenue) * 10.0) AS revenue, "
+            "(COUNT(*) * 10.0) FROM GOLD.DAILY_SALES_SUMMARY d SAMPLE (10) "
+            "GROUP BY 1 ORDER BY revenue DESC"
+        )
+        approximation = result["approximation"]
+        assert approximation["sampled"] is True
+        assert approximation["sampling_fraction"] == 0.1
+        assert "sampling" in approximation["error_bounds"]
+
+    def test_approx_functions(self):
+        """Test distinct count and percentile rewrites."""
+        result = rewrite_approximate(
+            "SELECT COUNT(DISTINCT customer_id), MEDIAN(price), "
+            "PERCENTILE_CONT(0.9) WITHIN GROUP (ORDER BY price) FROM sales",
+            100,
+        )
+
+        assert result["query"] == (
+            "SELECT APPROX_COUNT_DISTINCT(customer_id), APPROX_PERCENTILE(price, 0.5), "
+            "APPROX_PERCENTILE(price, 0.9) FROM sales"
+        )
+        assert result["approximation"]["sampled"] is False
+        assert result["approximation"]["approx_functions"] == [
+            "APPROX_COUNT_DISTINCT",
+            "APPROX_PERCENTILE",
+        ]
+
+    def test_string_literals_are_untouched(self):
+        """Test that keywords inside literals do not affect the rewrite."""
+        result = rewrite_approximate(
+            "SELECT COUNT(*) FROM sales WHERE note = 'from a join b COUNT(DISTINCT x)'",
+            50,
+        )
+
+        assert result["query"].endswith(
+            "FROM sales SAMPLE (50) WHERE note = 'from a join b COUNT(DISTINCT x)'"
+        )
+
+    def test_ineligible_queries_are_not_sampled(self):
+        """Test joins, subqueries and plain row listings."""
+        for query in (
+            "SELECT COUNT(*) FROM a JOIN b ON a.id = b.id",
+            "SELECT COUNT(*) FROM (SELECT * FROM a)",
+            "SELECT COUNT(*) FROM a, b",
+            "SELECT * FROM a LIMIT 10",
+        ):
+            result = rewrite_approximate(query, 10)
+            assert result["query"] == query
+            assert result["approximation"]["applied"] is False
+
+
+class TestHasLimit:
+    """Test cases for detecting the outer query's LIMIT."""
+
+    def test_only_the_outer_tail_counts(self):
+        """Test that LIMITs in subqueries and literals are ignored."""
+        assert has_limit("SELECT a FROM t ORDER BY a LIMIT 10;")
+        assert has_limit("select a from t limit 5 offset 10")
+        assert not has_limit("SELECT a FROM (SELECT a FROM t LIMIT 5)")
+        assert not has_limit("SELECT 'no LIMIT here' AS a FROM t")
+
+
+class TestResolveIdentifier:
+    """Test cases for Snowflake identifier case resolution."""
+
+    def test_unquoted_fold_and_quoted_keep_case(self):
+        """Test upper-casing of unquoted names and unescaping of quoted ones."""
+        assert resolve_identifier(" daily_sales ") == "DAILY_SALES"
+        assert resolve_identifier('"Daily Sales"') == "Daily Sales"
+        assert resolve_identifier('"say ""hi"""') == 'say "hi"'
@@ -0,0 +1,95 @@
+"""Unit tests for result summaries and response shaping."""
+
+import os
+import sys
+from decimal import Decimal
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.summary import estimate_distinct, shape_result_data, summarize_rows
+
+
+def make_data(count):
+    rows = [
+        {"ID": i, "REGION": f"R{i % 4}", "SALES": Decimal(i) if i % 10 else None}
+        for i in range(count)
+    ]
+    return {
+        "rows": rows,
+        "columns": ["ID", "REGION", "SALES"],
+        "row_count": count,
+        "result_id": "res_test",
+    }
+
+
+class TestSummaries:
+    """Test cases for column statistics."""
+
+    def test_column_statistics(self):
+        """Test min/max/mean/null count per column."""
+        data = make_data(20)
+
+        summary = summarize_rows(data["rows"], data["columns"])
+
+        assert summary["ID"] == {
+            "null_count": 0,
+            "distinct_estimate": 20,
+            "min": 0,
+            "max": 19,
+            "mean": 9.5,
+        }
+        assert summary["REGION"]["distinct_estimate"] == 4
+        assert summary["REGION"]["mean"] is None
+        assert summary["SALES"]["null_count"] == 2
+
+    def test_distinct_estimate_is_close_for_large_inputs(self):
+        """Test the KMV sketch once distinct values exceed its size."""
+        estimate = estimate_distinct(list(range(50000)) * 2)
+
+        assert abs(estimate - 50000) / 50000 < 0.15
+
+
+class TestShapeResultData:
+    """Test cases for shape_result_data."""
+
+    def test_small_results_are_untouched(self):
+        """Test that results within budget keep their rows."""
+        data = make_data(5)
+
+        assert shape_result_data(data) is data
+
+    def test_large_results_are_summarized(self, monkeypatch):
+        """Test the automatic summary past the row budget."""
+        monkeypatch.setattr("src.summary.RESPONSE_MAX_ROWS", 50)
+        monkeypatch.setattr("src.summary.RESPONSE_SAMPLE_ROWS", 3)
+
+        shaped = shape_result_data(make_data(100))
+
+        assert "rows" not in shaped
+        assert shaped["summarized"] is True
+        assert shaped["row_count"] == 100
+        assert shaped["result_id"] == "res_test"
+        assert len(shaped["sample_rows"]) == 3
+        assert set(shaped["summary"]) == {"ID", "REGION", "SALES"}
+
+    def test_byte_budget(self, monkeypatch):
+        """Test the automatic summary past the byte budget."""
+        monkeypatch.setattr("src.summary.RESPONSE_MAX_BYTES", 100)
+
+        assert shape_result_data(make_data(20))["summarized"] is True
+
+    def test_explicit_override(self):
+        """Test forcing or disabling the summary."""
+        assert shape_result_data(make_data(5), summarize=True)["summarized"] is True
+        assert "rows" in shape_result_data(make_data(5000), summarize=False)
+
+    def test_summary_covers_the_full_result(self):
+        """Test that the summary describes every row, not just the page."""
+        full = make_data(100)
+        page = dict(full, rows=full["rows"][:10])
+
+        shaped = shape_result_data(page, summarize=True, all_rows=full["rows"])
+
+        assert shaped["summary"]["ID"]["max"] == 99
+        assert shaped["summary"]["SALES"]["null_count"] == 10
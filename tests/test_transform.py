@@ -0,0 +1,176 @@
+"""Unit tests for local result transforms."""
+
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import result_store
+from src.result_store import ResultStore
+from src.transform import transform_result
+
+ROWS = [
+    {"DAY": date(2023, 12, 1), "CATEGORY": "Food", "REVENUE": Decimal("10.00")},
+    {"DAY": date(2023, 12, 1), "CATEGORY": "Home", "REVENUE": Decimal("40.00")},
+    {"DAY": date(2023, 12, 2), "CATEGORY": "Food", "REVENUE": Decimal("30.00")},
+    {"DAY": date(2023, 12, 2), "CATEGORY": "Garden", "REVENUE": None},
+    {"DAY": date(2023, 12, 3), "CATEGORY": "Home", "REVENUE": Decimal("5.00")},
+]
+COLUMNS = ["DAY", "CATEGORY", "REVENUE"]
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    """Use a fresh result store for each test."""
+    fresh = ResultStore(spill_dir=tmp_path)
+    monkeypatch.setattr(result_store, "_store", fresh)
+    return fresh
+
+
+@pytest.fixture
+def result_id(store):
+    return store.put(ROWS, COLUMNS, "SELECT * FROM DAILY_SALES_SUMMARY")
+
+
+class TestTransformResult:
+    """Test cases for transform_result."""
+
+    def test_filter_coerces_types(self, result_id):
+        """Test filters against Decimal and date columns."""
+        result = transform_result(
+            result_id,
+            [
+                {"op": "filter", "column": "REVENUE", "operator": ">", "value": 8},
+                {"op": "filter", "column": "DAY", "operator": "<=", "value": "2023-12-01"},
+            ],
+        )
+
+        assert result["success"] is True
+        assert [row["CATEGORY"] for row in result["data"]["rows"]] == ["Food", "Home"]
+
+    def test_group_by_then_top_n(self, result_id):
+        """Test grouping keeps the column name so it can be ranked on."""
+        result = transform_result(
+            result_id,
+            [
+                {"op": "group_by", "by": ["CATEGORY"], "aggregates": {"REVENUE": "sum"}},
+                {"op": "top_n", "n": 2, "by": "REVENUE"},
+            ],
+        )
+
+        assert result["data"]["columns"] == ["CATEGORY", "REVENUE"]
+        assert result["data"]["rows"] == [
+            {"CATEGORY": "Home", "REVENUE": Decimal("45.00")},
+            {"CATEGORY": "Food", "REVENUE": Decimal("40.00")},
+        ]
+
+    def test_group_by_multiple_aggregates(self, result_id):
+        """Test several aggregates and the default row count."""
+        result = transform_result(
+            result_id,
+            [
+                {
+                    "op": "group_by",
+                    "by": "CATEGORY",
+                    "aggregates": {"REVENUE": ["avg", "count"], "*": "count"},
+                }
+            ],
+        )
+
+        garden = next(r for r in result["data"]["rows"] if r["CATEGORY"] == "Garden")
+        assert garden == {
+            "CATEGORY": "Garden",
+            "REVENUE_AVG": None,
+            "REVENUE_COUNT": 0,
+            "COUNT": 1,
+        }
+
+    def test_sort_puts_nulls_last(self, result_id):
+        """Test descending sort with a NULL value."""
+        result = transform_result(
+            result_id, [{"op": "sort", "by": "REVENUE", "descending": True}]
+        )
+
+        revenues = [row["REVENUE"] for row in result["data"]["rows"]]
+        assert revenues == [Decimal("40.00"), Decimal("30.00"), Decimal("10.00"),
+                            Decimal("5.00"), None]
+
+    def test_pivot(self, result_id):
+        """Test pivoting categories into columns."""
+        result = transform_result(
+            result_id,
+            [{"op": "pivot", "index": "DAY", "columns": "CATEGORY", "values": "REVENUE"}],
+        )
+
+        assert result["data"]["columns"] == ["DAY", "Food", "Home", "Garden"]
+        assert result["data"]["rows"][0] == {
+            "DAY": date(2023, 12, 1),
+            "Food": Decimal("10.00"),
+            "Home": Decimal("40.00"),
+            "Garden": None,
+        }
+
+    def test_output_is_stored_for_chaining(self, result_id, store):
+        """Test that the transformed result gets its own handle."""
+        result = transform_result(result_id, [{"op": "select", "columns": ["CATEGORY"]}])
+
+        chained = store.get(result["data"]["result_id"])
+        assert chained["columns"] == ["CATEGORY"]
+        assert result["data"]["source_result_id"] == result_id
+
+    def test_paging_fields(self, result_id):
+        """Test that transform output is paged like query results."""
+        result = transform_result(result_id, [{"op": "sort", "by": "DAY"}], limit=2)
+
+        assert result["data"]["row_count"] == 2
+        assert result["data"]["total_rows"] == 5
+        assert result["data"]["has_more"] is True
+
+    def test_dropped_result_is_restored(self, store, monkeypatch):
+        """Test that a dropped result is re-read with RESULT_SCAN first."""
+        monkeypatch.setattr("src.config.MOCK_MODE", False)
+        dropped = store.put(ROWS, COLUMNS, "SELECT * FROM t", query_id="01b2-0000")
+        store._remove(dropped)
+
+        with patch(
+            "src.tools.snowflake_tools._execute_query",
+            return_value=(ROWS, COLUMNS, "01b2-0001"),
+        ) as execute:
+            result = transform_result(
+                dropped, [{"op": "top_n", "n": 1, "by": "REVENUE"}]
+            )
+
+        assert "RESULT_SCAN('01b2-0000')" in execute.call_args.args[0]
+        assert result["success"] is True
+        assert result["data"]["rows"][0]["REVENUE"] == Decimal("40.00")
+
+    def test_errors(self, result_id):
+        """Test unknown results, ops and columns."""
+        assert transform_result("res_missing", [])["success"] is False
+
+        bad_op = transform_result(result_id, [{"op": "explode"}])
+        bad_column = transform_result(result_id, [{"op": "sort", "by": "PROFIT"}])
+
+        assert "unknown op" in bad_op["error"]
+        assert "PROFIT" in bad_column["error"]
+
+    def test_invalid_steps(self, result_id):
+        """Test that malformed pipelines fail with a transform error."""
+        not_a_step = transform_result(result_id, ["sort"])
+        star_sum = transform_result(
+            result_id,
+            [{"op": "group_by", "by": "CATEGORY", "aggregates": {"*": "sum"}}],
+        )
+        bad_aggregates = transform_result(
+            result_id, [{"op": "group_by", "by": "CATEGORY", "aggregates": ["sum"]}]
+        )
+
+        assert "Step 1" in not_a_step["error"]
+        assert "'*'" in star_sum["error"]
+        assert "aggregates" in bad_aggregates["error"]
@@ -0,0 +1,183 @@
+"""Unit tests for chart generation."""
+
+import gzip
+import json
+import os
+import struct
+import sys
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import visualize
+from src.visualize import generate_chart_html
+
+SAMPLE_DATA = [
+    {"category": "Electronics", "sales": 1500},
+    {"category": "Clothing", "sales": 1200},
+    {"category": "Food", "sales": 800},
+]
+
+
+@pytest.fixture(autouse=True)
+def charts_dir(tmp_path, monkeypatch):
+    """Redirect chart output to a temporary directory with an empty index."""
+    monkeypatch.setattr(visualize, "CHARTS_DIR", tmp_path)
+    monkeypatch.setattr(visualize, "_CHART_INDEX", {})
+    return tmp_path
+
+
+class TestChartDeduplication:
+    """Test cases for the content-addressed chart cache."""
+
+    def test_identical_request_reuses_chart(self, charts_dir):
+        """Test that a repeated request returns the existing chart."""
+        first = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+        second = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+
+        assert first["success"] is True
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["chart_id"] == first["chart_id"]
+        assert second["file_path"] == first["file_path"]
+        assert len(list(charts_dir.glob("*.html"))) == 1
+
+    def test_cached_chart_is_not_rewritten_or_reopened(self):
+        """Test that a cache hit skips the write and the browser."""
+        generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+
+        with patch("pathlib.Path.write_text") as mock_write, patch(
+            "src.visualize.webbrowser.open"
+        ) as mock_open:
+            result = generate_chart_html(
+                SAMPLE_DATA, "bar", "category", "sales", "Sales", open_browser=True
+            )
+
+        assert result["cached"] is True
+        mock_write.assert_not_called()
+        mock_open.assert_not_called()
+
+    def test_different_parameters_create_new_chart(self, charts_dir):
+        """Test that chart type and title are part of the key."""
+        bar = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+        pie = generate_chart_html(SAMPLE_DATA, "pie", "category", "sales", "Sales")
+        retitled = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Other")
+
+        assert len({bar["chart_id"], pie["chart_id"], retitled["chart_id"]}) == 3
+        assert len(list(charts_dir.glob("*.html"))) == 3
+
+    def test_chart_found_after_index_reset(self, monkeypatch):
+        """Test that charts written by an earlier process are still found."""
+        first = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+        monkeypatch.setattr(visualize, "_CHART_INDEX", {})
+
+        second = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+
+        assert second["cached"] is True
+        assert second["file_path"] == first["file_path"]
+
+    def test_deleted_chart_is_rewritten(self):
+        """Test that an indexed chart whose file was removed is written again."""
+        first = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+        os.remove(first["file_path"])
+
+        assert visualize.get_chart(first["chart_id"]) is None
+        second = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales", "Sales")
+
+        assert second["cached"] is False
+        assert os.path.exists(second["file_path"])
+
+    def test_chart_on_disk_without_its_sidecar_is_rewritten(
+        self, charts_dir, monkeypatch
+    ):
+        """Test that a page left on disk is only reused when its data file exists."""
+        first = generate_chart_html(
+            SAMPLE_DATA, "bar", "category", "sales", "Sales", data_format="json"
+        )
+        sidecar = charts_dir / f"chart_{first['chart_id']}.data.json.gz"
+        monkeypatch.setattr(visualize, "_CHART_INDEX", {})
+        found = visualize.get_chart(first["chart_id"])
+        assert found["data_file"] == str(sidecar.absolute())
+
+        monkeypatch.setattr(visualize, "_CHART_INDEX", {})
+        sidecar.unlink()
+
+        assert visualize.get_chart(first["chart_id"], "json") is None
+        second = generate_chart_html(
+            SAMPLE_DATA, "bar", "category", "sales", "Sales", data_format="json"
+        )
+        assert second["cached"] is False
+        assert sidecar.exists()
+
+
+class TestChartDataSidecar:
+    """Test cases for charts whose data is written to a sidecar file."""
+
+    def test_json_sidecar_is_gzipped_and_not_inlined(self, charts_dir):
+        """Test that the json format writes compressed data beside the page."""
+        result = generate_chart_html(
+            SAMPLE_DATA, "bar", "category", "sales", "Sales", data_format="json"
+        )
+
+        html = open(result["file_path"]).read()
+        sidecar = charts_dir / f"chart_{result['chart_id']}.data.json.gz"
+        payload = json.loads(gzip.decompress(sidecar.read_bytes()))
+
+        assert result["success"] is True
+        assert "Electronics" not in html
+        assert sidecar.name in html
+        assert payload == {
+            "labels": ["Electronics", "Clothing", "Food"],
+            "values": [1500, 1200, 800],
+        }
+
+    def test_json_sidecar_non_finite_values_are_null(self):
+        """Test that NaN and infinities are written as valid JSON nulls."""
+        encoded = visualize.encode_json_sidecar(
+            ["a", "b", "c", "d"], [float("nan"), float("inf"), Decimal("NaN"), 2]
+        )
+
+        payload = gzip.decompress(encoded).decode("utf-8")
+        assert "NaN" not in payload and "Infinity" not in payload
+        assert json.loads(payload)["values"] == [None, None, None, 2]
+
+    def test_binary_sidecar_layout(self, charts_dir):
+        """Test the header, label block and float64 value array."""
+        result = generate_chart_html(
+            SAMPLE_DATA, "line", "category", "sales", "Sales", data_format="binary"
+        )
+
+        raw = (charts_dir / f"chart_{result['chart_id']}.data.bin").read_bytes()
+        magic, count, labels_length, _ = struct.unpack_from("<4sIII", raw)
+        labels = json.loads(raw[16 : 16 + labels_length])
+        offset = 16 + labels_length + (-(16 + labels_length) % 8)
+
+        assert magic == b"CHRT"
+        assert offset % 8 == 0
+        assert labels == ["Electronics", "Clothing", "Food"]
+        assert struct.unpack_from(f"<{count}d", raw, offset) == (1500.0, 1200.0, 800.0)
+
+    def test_format_is_part_of_chart_key(self):
+        """Test that inline and sidecar versions are distinct charts."""
+        inline = generate_chart_html(SAMPLE_DATA, "bar", "category", "sales")
+        sidecar = generate_chart_html(
+            SAMPLE_DATA, "bar", "category", "sales", data_format="json"
+        )
+
+        assert inline["chart_id"] != sidecar["chart_id"]
+        assert visualize.chart_key(
+            "bar", "x", "y", "t|json", ["a"], [1]
+        ) != visualize.chart_key("bar", "x", "y", "t", ["a"], [1], "json")
+
+    def test_unknown_format_is_rejected(self):
+        """Test validation of the data_format option."""
+        result = generate_chart_html(
+            SAMPLE_DATA, "bar", "category", "sales", data_format="xml"
+        )
+
+        assert result["success"] is False
+        assert "data_format" in result["error"]
@@ -0,0 +1,90 @@
+"""Unit tests for query fingerprinting and workload statistics."""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sql_utils import fingerprint, normalize_sql
+from src.workload import WorkloadStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    workload = WorkloadStore(tmp_path / "workload.sqlite3")
+    yield workload
+    workload.close()
+
+
+class TestFingerprint:
+    """Test cases for literal-stripped fingerprints."""
+
+    def test_literals_and_formatting_are_ignored(self):
+        """Test that queries differing only in literals share a fingerprint."""
+        first = "select a from t where x = 'abc' and y in (1, 2, 3) limit 10; -- note"
+        second = "SELECT  a\nFROM t WHERE x='z' AND y IN ( 4 ) LIMIT 5"
+
+        assert normalize_sql(first) == "SELECT A FROM T WHERE X=? AND Y IN(?) LIMIT ?"
+        assert fingerprint(first) == fingerprint(second)
+
+    def test_different_shapes_differ(self):
+        """Test that structural changes produce a new fingerprint."""
+        assert fingerprint("SELECT a FROM t") != fingerprint("SELECT b FROM t")
+        assert fingerprint("SELECT col1 FROM t") != fingerprint("SELECT col2 FROM t")
+
+
+class TestWorkloadStore:
+    """Test cases for WorkloadStore."""
+
+    def test_accumulates_per_fingerprint(self, store):
+        """Test counts, latency and rows across executions."""
+        store.record("SELECT * FROM t WHERE id = 1", 100.0, rows=1, result_bytes=50)
+        store.record("SELECT * FROM t WHERE id = 2", 300.0, rows=1, result_bytes=50)
+        store.record("SELECT * FROM t WHERE id = 3", 50.0, error=True)
+
+        [stats] = store.top()
+
+        assert stats["calls"] == 3
+        assert stats["errors"] == 1
+        assert stats["total_ms"] == 450.0
+        assert stats["mean_ms"] == 150.0
+        assert stats["max_ms"] == 300.0
+        assert stats["total_rows"] == 2
+        assert stats["sample_sql"] == "SELECT * FROM t WHERE id = 3"
+
+    def test_ordering(self, store):
+        """Test ranking by total time versus call count."""
+        store.record("SELECT a FROM t", 1000.0)
+        for _ in range(3):
+            store.record("SELECT b FROM t", 10.0)
+
+        assert store.top(order_by="total_ms")[0]["normalized_sql"] == "SELECT A FROM T"
+        assert store.top(order_by="calls")[0]["normalized_sql"] == "SELECT B FROM T"
+        with pytest.raises(ValueError):
+            store.top(order_by="random()")
+
+    def test_cached_and_coalesced_calls(self, store):
+        """Test that calls served without execution count but do not skew latency."""
+        store.record("SELECT a FROM t", 100.0, rows=10)
+        store.record("SELECT a FROM t", 0.0, cached=True)
+        store.record("SELECT a FROM t", 0.0, coalesced=True)
+
+        [stats] = store.top()
+
+        assert stats["calls"] == 3
+        assert stats["cached_calls"] == 1
+        assert stats["coalesced_calls"] == 1
+        assert stats["mean_ms"] == 100.0
+        assert stats["total_rows"] == 10
+
+    def test_persists_across_instances(self, store, tmp_path):
+        """Test that statistics survive a restart."""
+        store.record("SELECT a FROM t", 5.0)
+        store.close()
+
+        reopened = WorkloadStore(tmp_path / "workload.sqlite3")
+        assert reopened.top()[0]["calls"] == 1
+        reopened.close()